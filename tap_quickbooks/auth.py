@@ -3,36 +3,109 @@
 from __future__ import annotations
 
 import base64
+import contextlib
+import datetime
+import hashlib
 import json
+import logging
+import os
 import sys
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, cast
 
-from singer_sdk.authenticators import OAuthAuthenticator, SingletonMeta
+import requests
+from singer_sdk.authenticators import OAuthAuthenticator
+
+from tap_quickbooks.realms import parse_realm_id
 
 if sys.version_info >= (3, 12):
     from typing import override
 else:
     from typing_extensions import override
 
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from singer_sdk.helpers.types import Auth
+
+AUTH_ENDPOINT = "https://oauth.platform.intuit.com/oauth2/v1/tokens/bearer"
+
+# Access tokens are refreshed this many seconds before they expire
+TOKEN_REFRESH_MARGIN = 300
+
+logger = logging.getLogger(__name__)
+
+
+class TokenCache:
+    """Access and refresh tokens of a realm, kept in a file shared by runs and processes.
+
+    Intuit rotates the refresh token on every refresh, invalidating the previous one,
+    so the latest token is read back (and written) under an exclusive file lock.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Initialize the token cache.
+
+        Args:
+            path: File to keep the tokens in.
+        """
+        self.path = path
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator[dict]:
+        """Lock the cache, for other threads and processes, while it is read and updated.
+
+        Yields:
+            The cached tokens, written back when the transaction ends.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+
+        with os.fdopen(fd, "r+", encoding="utf-8") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)  # released when the file is closed
+
+            try:
+                tokens = json.loads(f.read())
+            except ValueError:
+                tokens = {}  # new or corrupt cache file
+
+            original = dict(tokens)
+            yield tokens
+
+            if tokens != original:
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(tokens))
+
 
-# The SingletonMeta metaclass makes your streams reuse the same authenticator instance.
-# If this behaviour interferes with your use-case, you can remove the metaclass.
-class QuickBooksAuthenticator(OAuthAuthenticator, metaclass=SingletonMeta):
+class QuickBooksAuthenticator(OAuthAuthenticator):
     """Authenticator class for QuickBooks."""
 
     def __init__(
         self,
         *args,
         refresh_token=None,
+        token_cache: TokenCache | None = None,
         **kwargs,
     ) -> None:
         """Initialize the authenticator.
 
         Args:
             refresh_token: OAuth2 refresh token.
+            token_cache: Cache to share tokens through with other runs and processes.
         """
         super().__init__(*args, **kwargs)
         self._oauth_headers = self.oauth_request_headers
         self._refresh_token = refresh_token
+        self._configured_refresh_token = refresh_token
+        self._token_cache = token_cache
+        self._refresh_lock = threading.Lock()
 
     @property
     def oauth_request_headers(self) -> dict:
@@ -66,7 +139,114 @@ class QuickBooksAuthenticator(OAuthAuthenticator, metaclass=SingletonMeta):
             "refresh_token": self._refresh_token,
         }
 
-class ProxyQuickBooksAuthenticator(QuickBooksAuthenticator, metaclass=SingletonMeta):
+    @override
+    def is_token_valid(self) -> bool:
+        """Check if the access token is valid, and not about to expire.
+
+        Returns:
+            True if the token is valid for at least another ``TOKEN_REFRESH_MARGIN``
+            seconds (or half its lifetime, if shorter).
+        """
+        if self.last_refreshed is None:
+            return False
+
+        if not self.expires_in:
+            return True
+
+        now = datetime.datetime.now(datetime.timezone.utc)
+        margin = min(TOKEN_REFRESH_MARGIN, self.expires_in / 2)
+        return self.expires_in - margin > (now - self.last_refreshed).total_seconds()
+
+    @override
+    def authenticate_request(self, request: requests.PreparedRequest) -> requests.PreparedRequest:
+        """Authenticate a request, refreshing the access token once for all threads.
+
+        Args:
+            request: A :class:`requests.PreparedRequest` object.
+
+        Returns:
+            The authenticated request object.
+        """
+        if not self.is_token_valid():
+            with self._refresh_lock:
+                if not self.is_token_valid():
+                    self._refresh()
+
+        return super().authenticate_request(request)
+
+    @override
+    def update_access_token(self) -> None:
+        """Update the access token, keeping the rotated refresh token.
+
+        Raises:
+            RuntimeError: When OAuth login fails.
+        """
+        self.logger.info("Requesting new access token")
+        request_time = datetime.datetime.now(datetime.timezone.utc)
+        token_response = requests.post(
+            self.auth_endpoint,
+            headers=self._oauth_headers,
+            data=self.oauth_request_payload,
+            timeout=60,
+        )
+
+        try:
+            token_response.raise_for_status()
+        except requests.HTTPError as ex:
+            self.handle_error(content=ex.response.text, status_code=ex.response.status_code)
+            msg = f"Failed to update access token (status={ex.response.status_code})"
+            raise RuntimeError(msg) from ex
+
+        token_json = token_response.json()
+        self.access_token = token_json["access_token"]
+        self.refresh_token = token_json.get("refresh_token") or self._refresh_token
+        self._refresh_token = self.refresh_token
+        expiration = token_json.get("expires_in", self._default_expiration)
+        self.expires_in = int(expiration) if expiration else None
+        self.last_refreshed = request_time
+
+    def _refresh(self) -> None:
+        if self._token_cache is None:
+            self.update_access_token()
+            return
+
+        with self._token_cache.transaction() as tokens:
+            # Another process may have refreshed (and rotated the refresh token) already
+            self._load_tokens(tokens)
+
+            if self.is_token_valid():
+                return
+
+            # Raises if the refresh fails, so there is always a token to share
+            self.update_access_token()
+            last_refreshed = cast("datetime.datetime", self.last_refreshed)
+
+            tokens.update(
+                access_token=self.access_token,
+                refresh_token=self._refresh_token,
+                configured_refresh_token=self._configured_refresh_token,
+                last_refreshed=last_refreshed.timestamp(),
+                expires_in=self.expires_in,
+            )
+
+    def _load_tokens(self, tokens: dict) -> None:
+        # Tokens cached from a refresh token that is no longer configured are stale
+        if self._configured_refresh_token not in {
+            tokens.get("refresh_token"),
+            tokens.get("configured_refresh_token"),
+        }:
+            return
+
+        self._refresh_token = tokens["refresh_token"]
+        self.access_token = tokens.get("access_token")
+        self.expires_in = tokens.get("expires_in")
+        self.last_refreshed = datetime.datetime.fromtimestamp(
+            tokens["last_refreshed"],
+            tz=datetime.timezone.utc,
+        )
+
+
+class ProxyQuickBooksAuthenticator(QuickBooksAuthenticator):
     @override
     def __init__(self, refresh_token=None, proxy_auth=None, **kwargs):
         self._proxy_auth = proxy_auth
@@ -87,3 +267,110 @@ class ProxyQuickBooksAuthenticator(QuickBooksAuthenticator, metaclass=SingletonM
     @property
     def oauth_request_body(self):
         return json.dumps(super().oauth_request_body)
+
+
+class RealmAuthenticator(requests.auth.AuthBase):
+    """Authenticate each request with the authenticator of the realm it is for."""
+
+    def __init__(self, authenticators: dict[str, Auth]) -> None:
+        """Initialize the authenticator.
+
+        Args:
+            authenticators: The authenticator of each realm, by realm ID.
+        """
+        self.authenticators = authenticators
+
+    def __call__(self, r: requests.PreparedRequest) -> requests.PreparedRequest:
+        """Authenticate a request.
+
+        Args:
+            r: The request to authenticate.
+
+        Returns:
+            The authenticated request.
+
+        Raises:
+            ValueError: If the request is not for a configured realm.
+        """
+        realm_id = parse_realm_id(r.url)
+
+        if realm_id not in self.authenticators:
+            msg = f"No credentials configured for realm '{realm_id}'"
+            raise ValueError(msg)
+
+        return self.authenticators[realm_id](r)
+
+
+def create_authenticator(
+    realm_id: str,
+    oauth_credentials: dict,
+    token_cache_dir: str | None = None,
+) -> QuickBooksAuthenticator:
+    """Return a new authenticator for a realm.
+
+    Args:
+        realm_id: QuickBooks company/realm ID.
+        oauth_credentials: OAuth credentials of the realm.
+        token_cache_dir: Directory to cache tokens in, if any.
+
+    Returns:
+        The authenticator for the realm.
+
+    Raises:
+        ValueError: If the credentials are insufficient to establish an authenticator.
+    """
+    return _create_authenticator(
+        oauth_credentials,
+        _get_token_cache(realm_id, oauth_credentials, token_cache_dir),
+    )
+
+
+def _get_token_cache(
+    realm_id: str,
+    oauth_credentials: dict,
+    token_cache_dir: str | None,
+) -> TokenCache | None:
+    if not token_cache_dir:
+        return None
+
+    if fcntl is None:
+        logger.warning("File locking is not supported, not caching tokens")
+        return None
+
+    # Keyed by realm and client, so realms or apps sharing the directory never collide
+    client = oauth_credentials.get("client_id") or oauth_credentials.get("refresh_proxy_url")
+    digest = hashlib.sha256(f"{realm_id}:{client}".encode()).hexdigest()[:16]
+
+    return TokenCache(Path(token_cache_dir).expanduser() / f"{digest}.json")
+
+
+def _create_authenticator(
+    oauth_credentials: dict,
+    token_cache: TokenCache | None = None,
+) -> QuickBooksAuthenticator:
+    client_id = oauth_credentials.get("client_id")
+    client_secret = oauth_credentials.get("client_secret")
+
+    if client_id and client_secret:
+        return QuickBooksAuthenticator(
+            client_id=client_id,
+            client_secret=client_secret,
+            refresh_token=oauth_credentials["refresh_token"],
+            token_cache=token_cache,
+            auth_endpoint=AUTH_ENDPOINT,
+            oauth_scopes="",  # QuickBooks doesn't use scopes
+        )
+
+    # proxy oauth
+    refresh_proxy_url = oauth_credentials.get("refresh_proxy_url")
+
+    if refresh_proxy_url:
+        return ProxyQuickBooksAuthenticator(
+            refresh_token=oauth_credentials["refresh_token"],
+            proxy_auth=oauth_credentials.get("refresh_proxy_url_auth"),
+            token_cache=token_cache,
+            auth_endpoint=refresh_proxy_url,
+        )
+
+    msg = "Insufficient config to establish an authenticator. Must be one of {'oauth_credentials.client_id', 'oauth_credentials.client_secret', 'oauth_credentials.refresh_token'} or {'oauth_credentials.refresh_proxy_url', 'oauth_credentials.refresh_token'}."
+    raise ValueError(msg)
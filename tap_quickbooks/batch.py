@@ -0,0 +1,122 @@
+"""Batch API support for small reference streams."""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import TYPE_CHECKING
+
+from tap_quickbooks.client import MINOR_VERSION, get_response_payload
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from singer_sdk.helpers.types import Context
+
+    from tap_quickbooks.client import QuickBooksStream
+
+# https://developer.intuit.com/app/developer/qbo/docs/api/accounting/all-entities/batch
+BATCH_MAX_ITEMS = 30
+BATCH_MAX_RESULTS = 1000
+
+logger = logging.getLogger(__name__)
+
+
+class BatchQuery:
+    """Query all batched streams with as few ``/batch`` requests as possible.
+
+    Streams whose batch item faulted, or whose results filled a whole page, fall
+    back to querying as usual.
+    """
+
+    def __init__(
+        self,
+        streams: Iterable[QuickBooksStream],
+        context: Context | None = None,
+    ) -> None:
+        """Initialize the batch query.
+
+        Args:
+            streams: The streams to query.
+            context: The realm partition context, when syncing several realms.
+        """
+        self._streams = list(streams)
+        self._context = context
+        self._lock = threading.Lock()
+        self._results: dict[str, list[dict]] | None = None
+
+    def get_records(self, stream: QuickBooksStream) -> list[dict] | None:
+        """Return the queried records for a stream.
+
+        Records for every stream are fetched on the first call.
+
+        Args:
+            stream: The stream to return records for.
+
+        Returns:
+            The queried records, or ``None`` if the stream must be queried on its own.
+        """
+        with self._lock:
+            if self._results is None:
+                self._results = self._fetch_results(stream)
+
+        return self._results.get(stream.name)
+
+    def _fetch_results(self, requesting_stream: QuickBooksStream) -> dict[str, list[dict]]:
+        queries = {
+            stream.name: stream.build_query(
+                stream.get_bookmark_timestamp(self._context),
+                max_results=BATCH_MAX_RESULTS,
+            )
+            for stream in self._streams
+            if stream.selected and stream.supports_batch
+        }
+        names = list(queries)
+        results: dict[str, list[dict]] = {}
+        company_url = requesting_stream.get_company_url(
+            requesting_stream.get_realm_id(self._context)
+        )
+
+        decorated_request = requesting_stream.request_decorator(
+            requesting_stream._request  # noqa: SLF001
+        )
+
+        for i in range(0, len(names), BATCH_MAX_ITEMS):
+            items = [
+                {"bId": name, "Query": queries[name]} for name in names[i : i + BATCH_MAX_ITEMS]
+            ]
+            request = requesting_stream.build_prepared_request(
+                method="POST",
+                url=f"{company_url}/batch",
+                params={"minorversion": MINOR_VERSION},
+                headers=requesting_stream.http_headers,
+                json={"BatchItemRequest": items},
+            )
+            response = decorated_request(request, self._context)
+
+            for item in get_response_payload(response).get("BatchItemResponse", []):
+                name = item.get("bId")
+
+                if name not in queries:
+                    continue
+
+                if "Fault" in item:
+                    logger.warning(
+                        "Batch query for stream '%s' failed, querying instead: %s",
+                        name,
+                        item["Fault"],
+                    )
+                    continue
+
+                records = item.get("QueryResponse", {}).get(name, [])
+
+                if len(records) >= BATCH_MAX_RESULTS:
+                    logger.info(
+                        "Batch query for stream '%s' filled a whole page, querying instead",
+                        name,
+                    )
+                    continue
+
+                results[name] = records
+
+        return results
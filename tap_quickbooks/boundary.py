@@ -0,0 +1,108 @@
+"""Index of the records synced at the bookmark timestamp, to skip them on the next sync."""
+
+from __future__ import annotations
+
+import datetime
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+# Number of records at the bookmark timestamp kept in state, by default
+DEFAULT_BOUNDARY_INDEX_SIZE = 1000
+
+# Key of the index in stream (or partition) state
+BOUNDARY_INDEX_KEY = "boundary_index"
+
+
+class BoundaryIndex:
+    """Versions of the records last updated at a timestamp.
+
+    Incremental queries select records updated at or after the bookmark, so the
+    records updated at the bookmark timestamp are fetched again by every sync. A
+    record version is identified by its ``Id`` and ``SyncToken``, so the versions
+    synced at the bookmark can be skipped, while records updated again since are
+    not. The index holds up to ``max_size`` versions: records beyond it are
+    emitted again, as they would be without the index.
+    """
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_BOUNDARY_INDEX_SIZE,
+        timestamp: datetime.datetime | None = None,
+        versions: Iterable[tuple[str, str]] = (),
+    ) -> None:
+        """Initialize the index.
+
+        Args:
+            max_size: Number of record versions to keep.
+            timestamp: The timestamp the records were last updated at.
+            versions: The ``Id`` and ``SyncToken`` of each record.
+        """
+        self.max_size = max_size
+        self.timestamp = timestamp
+        self.versions = set(versions)
+
+    @classmethod
+    def from_state(cls, value: dict | None, max_size: int) -> BoundaryIndex:
+        """Return the index kept in state.
+
+        Args:
+            value: The index state value, if any.
+            max_size: Number of record versions to keep.
+
+        Returns:
+            The index, empty if there was none.
+        """
+        if not value:
+            return cls(max_size)
+
+        return cls(
+            max_size,
+            datetime.datetime.fromisoformat(value["timestamp"]),
+            ((record_id, sync_token) for record_id, sync_token in value["records"]),
+        )
+
+    def to_state(self) -> dict | None:
+        """Return the index to keep in state.
+
+        Returns:
+            The index state value, or ``None`` if the index is empty.
+        """
+        if self.timestamp is None:
+            return None
+
+        return {
+            "timestamp": self.timestamp.isoformat(),
+            "records": [list(version) for version in sorted(self.versions)],
+        }
+
+    def __contains__(self, item: tuple[datetime.datetime, str, str]) -> bool:
+        """Whether a version of a record, updated at a timestamp, is in the index.
+
+        Args:
+            item: The timestamp, ``Id`` and ``SyncToken`` of the record.
+
+        Returns:
+            True if the record was updated at the index timestamp, and its version
+            is in the index.
+        """
+        timestamp, record_id, sync_token = item
+        return timestamp == self.timestamp and (record_id, sync_token) in self.versions
+
+    def add(self, timestamp: datetime.datetime, record_id: str, sync_token: str) -> None:
+        """Add a record version, if it was updated at or after the index timestamp.
+
+        Args:
+            timestamp: The timestamp the record was last updated at.
+            record_id: The ``Id`` of the record.
+            sync_token: The ``SyncToken`` of the record.
+        """
+        if self.timestamp is None or timestamp > self.timestamp:
+            self.timestamp = timestamp
+            self.versions = set()
+        elif timestamp < self.timestamp:
+            return
+
+        if len(self.versions) < self.max_size:
+            self.versions.add((record_id, sync_token))
@@ -0,0 +1,145 @@
+"""Response cache for full-table streams, shared by runs."""
+
+from __future__ import annotations
+
+import datetime
+import hashlib
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+if TYPE_CHECKING:
+    import os
+    from collections.abc import Iterable
+
+# Seconds cached responses are served for, by default
+DEFAULT_RESPONSE_CACHE_TTL = 3600
+
+
+class ResponseCache:
+    """Bodies of successful query responses, kept in a directory shared by runs.
+
+    Full-table streams (e.g. ``CompanyInfo`` or ``TaxRate``) are downloaded in full
+    on every run, though they rarely change, so frequent runs within ``ttl`` seconds
+    of a request are served its cached response instead of sending it again.
+    Responses are keyed by stream and request URL, which holds the realm ID and the
+    query, so a change of realm, start date or selected properties is never served
+    a stale response. The query includes the page size, so cached streams do not
+    adapt it.
+    """
+
+    def __init__(self, directory: Path, ttl: float = DEFAULT_RESPONSE_CACHE_TTL) -> None:
+        """Initialize the response cache.
+
+        Args:
+            directory: Directory to keep the responses in.
+            ttl: Seconds a cached response is served for.
+        """
+        self.directory = directory
+        self.ttl = ttl
+
+    def get(
+        self,
+        stream_name: str,
+        prepared_request: requests.PreparedRequest,
+    ) -> requests.Response | None:
+        """Return the cached response to a request.
+
+        Args:
+            stream_name: The stream sending the request.
+            prepared_request: The request.
+
+        Returns:
+            A response with the cached body, or ``None`` if the request was not
+            cached or its response has expired.
+        """
+        path = self._get_path(stream_name, prepared_request)
+
+        try:
+            if time.time() - path.stat().st_mtime >= self.ttl:
+                return None
+
+            content = path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.headers = CaseInsensitiveDict({"Content-Type": "application/json"})
+        response._content = content  # noqa: SLF001
+        response.encoding = "utf-8"
+        response.url = prepared_request.url or ""
+        response.request = prepared_request
+        response.elapsed = datetime.timedelta(0)
+
+        return response
+
+    def put(
+        self,
+        stream_name: str,
+        prepared_request: requests.PreparedRequest,
+        response: requests.Response,
+    ) -> None:
+        """Cache the response to a request.
+
+        The file is replaced atomically, so concurrent runs never read a partial
+        response.
+
+        Args:
+            stream_name: The stream that sent the request.
+            prepared_request: The request.
+            response: The successful response.
+        """
+        path = self._get_path(stream_name, prepared_request)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        with tempfile.NamedTemporaryFile("wb", dir=self.directory, delete=False) as f:
+            f.write(response.content)
+
+        Path(f.name).replace(path)
+
+    def _get_path(self, stream_name: str, prepared_request: requests.PreparedRequest) -> Path:
+        key = f"{stream_name}\n{prepared_request.method}\n{prepared_request.url}"
+        digest = hashlib.sha256(key.encode()).hexdigest()[:32]
+
+        return self.directory / f"{digest}.json"
+
+
+def get_response_cache(
+    directory: str | os.PathLike[str],
+    ttl: float = DEFAULT_RESPONSE_CACHE_TTL,
+) -> ResponseCache:
+    """Return a response cache.
+
+    Args:
+        directory: Directory to keep the responses in.
+        ttl: Seconds a cached response is served for.
+
+    Returns:
+        The response cache.
+    """
+    return ResponseCache(Path(directory).expanduser(), ttl)
+
+
+def get_content_hash(records: Iterable[dict]) -> str:
+    """Return a hash of the content of records, to tell whether they changed.
+
+    Args:
+        records: The records, as returned by the API.
+
+    Returns:
+        The SHA-256 hex digest of the records.
+    """
+    digest = hashlib.sha256()
+
+    for record in records:
+        digest.update(json.dumps(record, sort_keys=True, default=str).encode())
+        digest.update(b"\n")
+
+    return digest.hexdigest()
@@ -2,18 +2,45 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import datetime
 import decimal
+import itertools
 import sys
+import time
 from functools import cached_property
-from typing import TYPE_CHECKING, Any, ClassVar
+from typing import TYPE_CHECKING, Any, ClassVar, NamedTuple, cast
 
+import requests
 from singer_sdk import SchemaDirectory, StreamSchema
-from singer_sdk.helpers.jsonpath import extract_jsonpath
-from singer_sdk.pagination import BaseOffsetPaginator
+from singer_sdk.exceptions import RetriableAPIError
+from singer_sdk.helpers._state import get_state_if_exists
+from singer_sdk.helpers._typing import TypeConformanceLevel
+from singer_sdk.pagination import BaseAPIPaginator, BaseOffsetPaginator
 from singer_sdk.streams import RESTStream
+from singer_sdk.streams.core import REPLICATION_FULL_TABLE, REPLICATION_INCREMENTAL
 
 from tap_quickbooks import schemas
-from tap_quickbooks.auth import ProxyQuickBooksAuthenticator, QuickBooksAuthenticator
+from tap_quickbooks.auth import RealmAuthenticator
+from tap_quickbooks.boundary import BOUNDARY_INDEX_KEY, DEFAULT_BOUNDARY_INDEX_SIZE, BoundaryIndex
+from tap_quickbooks.cache import DEFAULT_RESPONSE_CACHE_TTL, get_content_hash, get_response_cache
+from tap_quickbooks.columnar import DEFAULT_ROW_GROUP_SIZE, ParquetBatchWriter
+from tap_quickbooks.conform import compile_conformer
+from tap_quickbooks.decoding import get_decoder
+from tap_quickbooks.metrics import Metric, StreamProfile, log_metric
+from tap_quickbooks.pagesize import (
+    MAX_PAGE_SIZE,
+    AdaptivePageSize,
+    get_requested_page_size,
+    is_query_request,
+)
+from tap_quickbooks.partitions import PartitionPrefetcher, get_partition_key, get_windows
+from tap_quickbooks.pipeline import prefetch
+from tap_quickbooks.planning import PagePlanner, PlannedPage
+from tap_quickbooks.ratelimit import ThrottledAPIError, get_throttle_seconds
+from tap_quickbooks.realms import get_realm_credentials, parse_realm_id
+from tap_quickbooks.reconcile import ID_CHECK_BATCH_SIZE, IdSet, get_id_snapshots
 
 if sys.version_info >= (3, 12):
     from typing import override
@@ -21,26 +48,139 @@ else:
     from typing_extensions import override
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable
+    from collections.abc import AsyncIterator, Generator, Iterable, Iterator
 
-    import requests
-    from singer_sdk.helpers.types import Auth, Context
+    from backoff.types import Details
+    from singer_sdk.helpers._batch import BaseBatchFileEncoding, BatchConfig
+    from singer_sdk.helpers.types import Auth, Context, Record
+
+    from tap_quickbooks.cache import ResponseCache
+    from tap_quickbooks.conform import Conformer
+    from tap_quickbooks.decoding import Decoder
+    from tap_quickbooks.ratelimit import RequestBudget
+    from tap_quickbooks.reconcile import IdSnapshots
+    from tap_quickbooks.tap import TapQuickBooks
+    from tap_quickbooks.transport import EventLoop
 
 
 SCHEMAS_DIR = SchemaDirectory(schemas)
 
+MINOR_VERSION = "65"  # QuickBooks API minor version
+
+# Properties the tap adds to records, or XML attributes QuickBooks always returns,
+# which cannot be selected in a query
+UNSELECTABLE_PROPERTIES = frozenset({"status", "realm_id", "domain", "sparse"})
+
+# Attribute used to memoise the decoded body on a ``requests.Response``
+_PAYLOAD_ATTR = "_tap_quickbooks_payload"
+
+# Attribute used to attach the stream's decoder to a ``requests.PreparedRequest``
+_DECODER_ATTR = "_tap_quickbooks_decoder"
+
+# Attribute used to attach the stream's profile to a ``requests.PreparedRequest``
+_PROFILE_ATTR = "_tap_quickbooks_profile"
+
+# Failures retried by ``request_decorator``, and so by ``async_request``
+_RETRIABLE_EXCEPTIONS = (
+    ConnectionResetError,
+    RetriableAPIError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.ChunkedEncodingError,
+    requests.exceptions.ContentDecodingError,
+)
+
+
+def get_response_payload(response: requests.Response) -> dict:
+    """Return the decoded JSON body of a response.
+
+    The body is decoded once, by the decoder of the stream that sent the request
+    (or with ``decimal.Decimal`` floats), and cached on the response object, so the
+    paginator and the record parser share the same payload.
+
+    Args:
+        response: HTTP response object.
+
+    Returns:
+        The decoded response body.
+    """
+    payload = getattr(response, _PAYLOAD_ATTR, None)
+
+    if payload is None:
+        decode = getattr(response.request, _DECODER_ATTR, None)
+        profile = getattr(response.request, _PROFILE_ATTR, None)
+
+        with profile.span("decode") if profile else contextlib.nullcontext():
+            payload = (
+                decode(response.content) if decode else response.json(parse_float=decimal.Decimal)
+            )
+
+        setattr(response, _PAYLOAD_ATTR, payload)
+
+    return payload
+
+
+def parse_timestamp(value: str) -> datetime.datetime:
+    """Parse a QuickBooks ISO 8601 timestamp.
+
+    Args:
+        value: Timestamp string, e.g. ``2015-06-09T13:45:32-07:00``.
+
+    Returns:
+        A timezone-aware datetime (naive timestamps are assumed to be UTC).
+    """
+    parsed = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=datetime.timezone.utc)
+
+    return parsed
+
+
+def _get_nested_value(record: dict, key: str) -> Any:  # noqa: ANN401
+    # Flattened properties (e.g. ``MetaData.LastUpdatedTime``) are nested in records
+    # as returned by the API
+    value: Any = record
+
+    for name in key.split("."):
+        if not isinstance(value, dict):
+            return None
+
+        value = value.get(name)
+
+    return value
+
 
 class QuickBooksPaginator(BaseOffsetPaginator):
     """QuickBooks offset-based paginator."""
 
-    def __init__(self, start_value: int = 1, page_size: int = 100) -> None:
+    def __init__(
+        self,
+        start_value: int = 1,
+        page_size: int = 100,
+        entity: str | None = None,
+    ) -> None:
         """Initialize paginator.
 
         Args:
             start_value: Starting offset (QuickBooks uses 1-based indexing).
-            page_size: Number of records per page.
+            page_size: Number of records per page, if a response does not say.
+            entity: Entity name the records are keyed under in ``QueryResponse``.
         """
         super().__init__(start_value, page_size)
+        self._entity = entity
+
+    @override
+    def get_next(self, response: requests.Response) -> int | None:
+        """Get the offset of the next page.
+
+        Args:
+            response: HTTP response object.
+
+        Returns:
+            The next page offset.
+        """
+        return self._value + (get_requested_page_size(response) or self._page_size)
 
     def has_more(self, response: requests.Response) -> bool:
         """Check if there are more pages.
@@ -51,196 +191,1516 @@ class QuickBooksPaginator(BaseOffsetPaginator):
         Returns:
             True if more pages exist.
         """
-        data = response.json()
-        query_response = data.get("QueryResponse", {})
+        query_response = get_response_payload(response).get("QueryResponse", {})
+        page_size = get_requested_page_size(response) or self._page_size
+
+        if self._entity:
+            return len(query_response.get(self._entity, ())) >= page_size
 
         # Check if we got any records
         # The response keys vary by entity type, so we check all possible keys
         for key in query_response:
-            if (
-                isinstance(query_response[key], list)
-                and len(query_response[key]) >= self._page_size
-            ):
+            if isinstance(query_response[key], list) and len(query_response[key]) >= page_size:
                 return True
 
         return False
 
 
-class QuickBooksStream(RESTStream):
-    """QuickBooks stream class."""
+class KeysetToken(NamedTuple):
+    """Position of the last record seen by keyset pagination."""
+
+    last_updated_time: str
+    # Number of records already seen that share ``last_updated_time``
+    offset: int
+
+
+class QuickBooksKeysetPaginator(BaseAPIPaginator[KeysetToken | None]):
+    """QuickBooks keyset paginator.
+
+    Resumes from the last ``MetaData.LastUpdatedTime`` seen instead of a deep
+    ``STARTPOSITION``. The query language has no ``OR``, so records sharing that
+    timestamp are skipped with a (small) offset rather than an ``Id`` comparison.
+    """
+
+    def __init__(self, page_size: int = 100, entity: str | None = None) -> None:
+        """Initialize paginator.
+
+        Args:
+            page_size: Number of records per page, if a response does not say.
+            entity: Entity name the records are keyed under in ``QueryResponse``.
+        """
+        super().__init__(None)
+        self._page_size = page_size
+        self._entity = entity
+
+    def _get_records(self, response: requests.Response) -> list[dict]:
+        query_response = get_response_payload(response).get("QueryResponse", {})
+        return query_response.get(self._entity, [])
+
+    @override
+    def has_more(self, response: requests.Response) -> bool:
+        """Check if there are more pages.
+
+        Args:
+            response: HTTP response object.
+
+        Returns:
+            True if more pages exist.
+        """
+        page_size = get_requested_page_size(response) or self._page_size
+        return len(self._get_records(response)) >= page_size
+
+    @override
+    def get_next(self, response: requests.Response) -> KeysetToken | None:
+        """Get the position of the last record in the response.
 
-    # QuickBooks returns records under QueryResponse.<EntityName>
-    # This will be overridden per stream
-    records_jsonpath = "$.QueryResponse.*[*]"
+        Args:
+            response: HTTP response object.
+
+        Returns:
+            The next keyset token.
+        """
+        records = self._get_records(response)
+        last_updated_time = records[-1]["MetaData"]["LastUpdatedTime"]
+
+        offset = sum(
+            1 for record in records if record["MetaData"]["LastUpdatedTime"] == last_updated_time
+        )
+
+        # The whole page shares the previous timestamp, so skip past it as well
+        if self._value and self._value.last_updated_time == last_updated_time:
+            offset += self._value.offset
 
-    # Page size for QuickBooks API (max 1000)
-    page_size = 100
+        return KeysetToken(last_updated_time, offset)
+
+
+class QuickBooksStream(RESTStream):
+    """QuickBooks stream class."""
 
     schema: ClassVar[StreamSchema] = StreamSchema(SCHEMAS_DIR)
 
+    # Records are conformed by the stream's conformer in ``post_process``, so the SDK
+    # only checks their (already pruned) properties against the catalog selection
+    TYPE_CONFORMANCE_LEVEL = TypeConformanceLevel.NONE
+
     # Most QuickBooks objects use this replication key
     replication_key: str | None = "MetaData.LastUpdatedTime"
 
+    # Whether the entity is supported by the Change Data Capture endpoint
+    cdc_enabled = True
+
+    # Whether the stream is a small lookup table that can be fetched via the Batch API
+    batched = False
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the stream.
+
+        Args:
+            args: Stream positional arguments.
+            kwargs: Stream keyword arguments.
+        """
+        super().__init__(*args, **kwargs)
+
+        # Time spent in each step of the hot path, logged at the end of the sync
+        self.profile = StreamProfile()
+
+        # Record IDs are only unique within a company
+        if self.multi_realm and self.primary_keys:
+            self.primary_keys = ("realm_id", *self.primary_keys)
+
+    @property
+    def multi_realm(self) -> bool:
+        """Whether the tap syncs several realms, as partitions of each stream.
+
+        Returns:
+            True if ``realms`` is set in config.
+        """
+        return bool(self.config.get("realms"))
+
     @override
     @property
     def url_base(self) -> str:
         """Return the API URL root, configurable via tap settings."""
-        realm_id = self.config["realm_id"]
+        # Filled in from the realm partition context when syncing several realms
+        realm_id = "{realm_id}" if self.multi_realm else self.config["realm_id"]
+
+        return self.get_company_url(realm_id)
+
+    def get_company_url(self, realm_id: str) -> str:
+        """Return the API URL root of a realm.
 
-        if self.config.get("sandbox", False):
+        Args:
+            realm_id: QuickBooks company/realm ID.
+
+        Returns:
+            The API URL root.
+        """
+        if self.config.get("api_url"):
+            base = self.config["api_url"].rstrip("/")
+        elif self.config.get("sandbox", False):
             base = "https://sandbox-quickbooks.api.intuit.com"
         else:
             base = "https://quickbooks.api.intuit.com"
 
         return f"{base}/v3/company/{realm_id}"
 
+    def get_realm_id(self, context: Context | None) -> str:
+        """Return the realm a stream context belongs to.
+
+        Args:
+            context: The stream context.
+
+        Returns:
+            The realm ID.
+        """
+        if context and "realm_id" in context:
+            return context["realm_id"]
+
+        return self.config["realm_id"]
+
     @override
     @cached_property
     def authenticator(self) -> Auth:
         """Return a new authenticator object.
 
         Returns:
-            An authenticator instance.
+            An authenticator instance, or one picking the authenticator of each
+            request's realm when syncing several realms.
         """
-        oauth_credentials: dict = self.config.get("oauth_credentials", {})
-        client_id = oauth_credentials.get("client_id")
-        client_secret = oauth_credentials.get("client_secret")
+        tap = cast("TapQuickBooks", self._tap)
+        realm_ids = list(get_realm_credentials(self.config))
 
-        if client_id and client_secret:
-            return QuickBooksAuthenticator(
-                client_id=client_id,
-                client_secret=client_secret,
-                refresh_token=oauth_credentials["refresh_token"],
-                auth_endpoint="https://oauth.platform.intuit.com/oauth2/v1/tokens/bearer",
-                oauth_scopes="",  # QuickBooks doesn't use scopes
-            )
+        if not self.multi_realm:
+            return tap.get_authenticator(realm_ids[0])
 
-        # proxy oauth
-        refresh_proxy_url = oauth_credentials.get("refresh_proxy_url")
+        return RealmAuthenticator(
+            {realm_id: tap.get_authenticator(realm_id) for realm_id in realm_ids}
+        )
 
-        if refresh_proxy_url:
-            return ProxyQuickBooksAuthenticator(
-                refresh_token=oauth_credentials["refresh_token"],
-                proxy_auth=oauth_credentials.get("refresh_proxy_url_auth"),
-                auth_endpoint=refresh_proxy_url,
-            )
+    @override
+    @property
+    def requests_session(self) -> requests.Session:
+        """Return the HTTP session shared by all streams of the tap.
 
-        msg = "Insufficient config to establish an authenticator. Must be one of {'oauth_credentials.client_id', 'oauth_credentials.client_secret', 'oauth_credentials.refresh_token'} or {'oauth_credentials.refresh_proxy_url', 'oauth_credentials.refresh_token'}."
-        raise ValueError(msg)
+        Returns:
+            A keep-alive session, pooling connections to the QuickBooks API.
+        """
+        tap = cast("TapQuickBooks", self._tap)
+        return tap.requests_session
 
     @property
-    @override
-    def http_headers(self) -> dict:
-        """Return the http headers needed.
+    def event_loop(self) -> EventLoop | None:
+        """Return the event loop requests are sent from.
 
         Returns:
-            A dictionary of HTTP headers.
+            The tap's event loop, or ``None`` unless ``http_engine`` is ``asyncio``.
         """
-        headers = {}
-        if "user_agent" in self.config:
-            headers["User-Agent"] = self.config.get("user_agent")
+        tap = cast("TapQuickBooks", self._tap)
+        return tap.event_loop
 
-        headers["Accept"] = "application/json"
-        headers["Content-Type"] = "application/json"
+    @cached_property
+    def decoder(self) -> Decoder:
+        """Return the function decoding response bodies.
 
-        return headers
+        Returns:
+            A decoder for the configured library and numeric precision.
+        """
+        return get_decoder(
+            self.config.get("json_decoder", "auto"),
+            self.config.get("numeric_precision", "decimal"),
+        )
 
-    @override
-    def get_new_paginator(self) -> BaseOffsetPaginator:
-        """Create a new pagination helper instance.
+    def get_request_budget(self, realm_id: str | None) -> RequestBudget:
+        """Return the request budget shared by all streams of a realm.
+
+        Args:
+            realm_id: QuickBooks company/realm ID, defaults to the configured realm.
 
         Returns:
-            A pagination helper instance.
+            A request budget instance.
         """
-        return QuickBooksPaginator(start_value=1, page_size=self.page_size)
+        tap = cast("TapQuickBooks", self._tap)
+        return tap.get_request_budget(realm_id or self.config["realm_id"])
 
-    @override
-    def get_url_params(
-        self,
-        context: Context | None,
-        next_page_token: Any | None,
-    ) -> dict[str, Any]:
-        """Return a dictionary of values to be used in URL parameterization.
+    @property
+    def supports_cdc(self) -> bool:
+        """Whether changes for this stream should be fetched via Change Data Capture.
 
-        Args:
-            context: The stream context.
-            next_page_token: The next page index or value.
+        Returns:
+            True if CDC is enabled in config and supported by the entity.
+        """
+        return (
+            bool(self.config.get("use_cdc", False))
+            and self.cdc_enabled
+            and self.replication_key == "MetaData.LastUpdatedTime"
+            and not self.partition_field
+        )
+
+    @property
+    def realm_contexts(self) -> list[dict] | None:
+        """Return a partition context for each realm, when syncing several realms.
 
         Returns:
-            A dictionary of URL query parameters.
+            A list of realm contexts, or ``None`` when syncing a single realm.
         """
-        params: dict = {}
+        if not self.multi_realm:
+            return None
 
-        # Build the SQL-like query for QuickBooks
-        query_parts = []
+        tap = cast("TapQuickBooks", self._tap)
+        return [context for context in tap.realm_contexts.values() if context]
 
-        # Add replication key filter for incremental sync
-        start_date = self.get_starting_timestamp(context)
-        if start_date:
-            query_parts.append(f"{self.replication_key} >= '{start_date.isoformat()}'")
+    @property
+    def partition_field(self) -> str | None:
+        """Return the field incremental syncs of this stream are windowed on.
 
-        # Build the WHERE clause
-        where_clause = " AND ".join(query_parts) if query_parts else ""
+        Entities without the configured field (e.g. ``TxnDate`` on lists) are windowed
+        on their replication key instead. Batched reference streams are not windowed.
 
-        # Build the full query
-        query = f"SELECT * FROM {self.name}"  # noqa: S608
-        if where_clause:
-            query += f" WHERE {where_clause}"
+        Returns:
+            The window field, or ``None`` if the stream is not windowed.
+        """
+        field = self.config.get("partition_by")
 
-        # Add ordering for incremental streams
-        if self.replication_key:
-            query += f" ORDERBY {self.replication_key}"
+        if not field or self.batched or self.replication_key != "MetaData.LastUpdatedTime":
+            return None
 
-        # Add pagination
-        if next_page_token:
-            query += f" STARTPOSITION {next_page_token} MAXRESULTS {self.page_size}"
-        else:
-            query += f" MAXRESULTS {self.page_size}"
+        return field if field in self.schema["properties"] else self.replication_key
 
-        params["query"] = query
-        params["minorversion"] = "65"  # QuickBooks API minor version
+    @property
+    def date_windows(self) -> list[dict] | None:
+        """Return the date windows incremental syncs of this stream are split into.
 
-        return params
+        Returns:
+            A list of window contexts, or ``None`` if the stream is not windowed.
+        """
+        if not self.partition_field:
+            return None
 
-    @override
-    def parse_response(self, response: requests.Response) -> Iterable[dict]:
-        """Parse the response and return an iterator of result records.
+        return self.get_date_windows(self.config.get("partition_window_months", 1))
+
+    def get_date_windows(self, months: int) -> list[dict]:
+        """Return calendar-aligned date windows from the start date to today.
 
         Args:
-            response: The HTTP ``requests.Response`` object.
+            months: Length of each window in months.
 
-        Yields:
-            Each record from the source.
+        Returns:
+            A list of window contexts.
         """
-        yield from extract_jsonpath(
-            self.records_jsonpath,
-            input=response.json(parse_float=decimal.Decimal),
-        )
+        start = parse_timestamp(self.config["start_date"]).date()
+        end = datetime.datetime.now(datetime.timezone.utc).date()
+
+        return get_windows(start, end, months)
 
     @override
-    def post_process(
-        self,
-        row: dict,
-        context: Context | None = None,
-    ) -> dict | None:
-        """As needed, append or transform raw data to match expected structure.
+    @cached_property
+    def partitions(self) -> list[dict] | None:
+        """Return the realms and date windows of the stream.
 
-        Args:
-            row: An individual record from the stream.
-            context: The stream context.
+        Partitions are computed once, so they stay the same for the whole sync.
 
         Returns:
-            The updated record dictionary, or ``None`` to skip the record.
+            A list of realm and/or window contexts, or the partitions in state.
         """
-        # Skip non-dict rows (e.g., pagination metadata)
-        if not isinstance(row, dict):
+        realms = self.realm_contexts
+        windows = self.date_windows
+
+        if not windows:
+            return realms or super().partitions
+
+        if not realms:
+            return self._skip_closed_windows(windows)
+
+        return self._skip_closed_windows(
+            [{**realm, **window} for realm in realms for window in windows]
+        )
+
+    @cached_property
+    def partition_prefetcher(self) -> PartitionPrefetcher | None:
+        """Return the prefetcher fetching the realms and windows of this stream concurrently.
+
+        Returns:
+            A prefetcher instance, or ``None`` if partitions are fetched one at a time.
+        """
+        max_workers = self.config.get("max_concurrent_partitions", 1)
+
+        if not (self.date_windows or self.multi_realm) or max_workers <= 1:
+            return None
+
+        return PartitionPrefetcher(self, max_workers)
+
+    @cached_property
+    def page_planner(self) -> PagePlanner | None:
+        """Return the planner fetching the pages of full-table syncs concurrently.
+
+        Returns:
+            A planner instance, or ``None`` if pages are fetched one at a time.
+        """
+        max_workers = self.config.get("max_concurrent_pages", 1)
+
+        if self.replication_method != REPLICATION_FULL_TABLE or max_workers <= 1:
+            return None
+
+        return PagePlanner(self, max_workers)
+
+    @cached_property
+    def response_cache(self) -> ResponseCache | None:
+        """Return the cache serving the responses of full-table syncs across runs.
+
+        Returns:
+            A response cache, or ``None`` if ``response_cache_dir`` is not set or the
+            stream has a replication key.
+        """
+        cache_dir = self.config.get("response_cache_dir")
+
+        # Streams forced to full table still change, so only those without a
+        # replication key are cached
+        if self.replication_key is not None or not cache_dir:
+            return None
+
+        return get_response_cache(
+            cache_dir,
+            self.config.get("response_cache_ttl", DEFAULT_RESPONSE_CACHE_TTL),
+        )
+
+    @property
+    def skip_unchanged(self) -> bool:
+        """Whether to skip emitting records identical to those of the last sync.
+
+        Full-table streams are only skipped without ``ACTIVATE_VERSION`` messages,
+        which would deactivate the records of the last sync.
+
+        Returns:
+            True if ``skip_unchanged_streams`` is enabled and the stream is cached.
+        """
+        return (
+            bool(self.config.get("skip_unchanged_streams", False))
+            and self.response_cache is not None
+            and not self.emit_activate_version_messages
+        )
+
+    @cached_property
+    def id_snapshots(self) -> IdSnapshots | None:
+        """Return the snapshots of record IDs hard deletes are reconciled against.
+
+        Only streams with a ``status`` property can emit delete markers.
+
+        Returns:
+            The ID snapshots, or ``None`` if the stream is not in ``reconcile_deletes``
+            or ``reconcile_deletes_dir`` is not set.
+        """
+        snapshots_dir = self.config.get("reconcile_deletes_dir")
+
+        if not snapshots_dir or self.name not in self.config.get("reconcile_deletes", ()):
+            return None
+
+        if "status" not in self.schema["properties"]:
+            self.logger.warning(
+                "Stream '%s' has no 'status' property, so its deletes cannot be reconciled",
+                self.name,
+            )
             return None
 
-        # Flatten nested MetaData fields for easier access
-        if "MetaData" in row:
-            metadata = row["MetaData"]
-            if isinstance(metadata, dict):
-                row["MetaData.LastUpdatedTime"] = metadata.get("LastUpdatedTime")
-                row["MetaData.CreateTime"] = metadata.get("CreateTime")
+        return get_id_snapshots(snapshots_dir)
+
+    @cached_property
+    def page_sizer(self) -> AdaptivePageSize:
+        """Return the page size of this stream.
+
+        Returns:
+            An adaptive page size instance.
+        """
+        # Cached responses are keyed by their query, page size included, so pages of
+        # cached streams keep a fixed size for later runs to find them
+        return AdaptivePageSize(
+            self.config.get("page_size", MAX_PAGE_SIZE),
+            adaptive=self.config.get("adaptive_page_size", True) and self.response_cache is None,
+        )
+
+    @property
+    def page_size(self) -> int:
+        """Return the number of records requested for the current page.
+
+        Returns:
+            The page size (max 1000).
+        """
+        return self.page_sizer.current
+
+    @property
+    def keyset_pagination(self) -> bool:
+        """Whether this stream pages by last update time instead of offset.
+
+        Returns:
+            True if keyset pagination is enabled in config and the stream is incremental.
+        """
+        return bool(self.config.get("keyset_pagination", False)) and (
+            self.replication_key == "MetaData.LastUpdatedTime"
+        )
+
+    @property
+    def supports_batch(self) -> bool:
+        """Whether this stream should be queried via the Batch API.
+
+        Streams fetched via Change Data Capture are not batched.
+
+        Returns:
+            True if the Batch API is enabled in config and the stream is batched.
+        """
+        return (
+            bool(self.config.get("use_batch_api", False)) and self.batched and not self.supports_cdc
+        )
 
-        return row
+    @property
+    @override
+    def http_headers(self) -> dict:
+        """Return the http headers needed.
+
+        Returns:
+            A dictionary of HTTP headers.
+        """
+        headers = {}
+        if "user_agent" in self.config:
+            headers["User-Agent"] = self.config.get("user_agent")
+
+        headers["Accept"] = "application/json"
+        headers["Accept-Encoding"] = "gzip"
+        headers["Content-Type"] = "application/json"
+
+        return headers
+
+    @override
+    def _request(
+        self,
+        prepared_request: requests.PreparedRequest,
+        context: Context | None,
+    ) -> requests.Response:
+        paged = is_query_request(prepared_request) and self.page_planner is None
+        setattr(prepared_request, _DECODER_ATTR, self.decoder)
+        setattr(prepared_request, _PROFILE_ATTR, self.profile)
+
+        if cached_response := self._get_cached_response(prepared_request):
+            return cached_response
+
+        with self.get_request_budget(parse_realm_id(prepared_request.url)):
+            try:
+                with self.profile.span("request"):
+                    response = super()._request(prepared_request, context)
+            except requests.exceptions.Timeout:
+                if paged and self.page_sizer.timed_out(prepared_request):
+                    self._log_page_size()
+                raise
+
+        self.profile.increment(Metric.RESPONSE_BYTES, len(response.content))
+        self._cache_response(prepared_request, response)
+
+        if paged:
+            self.page_sizer.observe(response)
+
+        return response
+
+    async def _async_request(
+        self,
+        prepared_request: requests.PreparedRequest,
+        context: Context | None,
+    ) -> requests.Response:
+        event_loop = cast("EventLoop", self.event_loop)
+        paged = is_query_request(prepared_request) and self.page_planner is None
+        setattr(prepared_request, _DECODER_ATTR, self.decoder)
+        setattr(prepared_request, _PROFILE_ATTR, self.profile)
+
+        if cached_response := self._get_cached_response(prepared_request):
+            return cached_response
+
+        # A token refresh (about once an hour) briefly blocks the loop
+        authenticated_request = self.authenticator(prepared_request)
+
+        async with self.get_request_budget(parse_realm_id(prepared_request.url)):
+            try:
+                with self.profile.span("request"):
+                    response = await event_loop.transport.send(authenticated_request, self.timeout)
+            except requests.exceptions.Timeout:
+                if paged and self.page_sizer.timed_out(prepared_request):
+                    self._log_page_size()
+                raise
+
+        self.profile.increment(Metric.RESPONSE_BYTES, len(response.content))
+
+        self._write_request_duration_log(
+            endpoint=self.path,
+            response=response,
+            context=context,
+            extra_tags={"url": authenticated_request.path_url}
+            if self._LOG_REQUEST_METRIC_URLS
+            else None,
+        )
+        self.validate_response(response)
+        self._cache_response(prepared_request, response)
+
+        if paged:
+            self.page_sizer.observe(response)
+
+        return response
+
+    def _get_cached_response(
+        self,
+        prepared_request: requests.PreparedRequest,
+    ) -> requests.Response | None:
+        if not self.response_cache or prepared_request.method != "GET":
+            return None
+
+        response = self.response_cache.get(self.name, prepared_request)
+
+        if response:
+            self.profile.increment(Metric.CACHE_HIT_COUNT)
+
+        return response
+
+    def _cache_response(
+        self,
+        prepared_request: requests.PreparedRequest,
+        response: requests.Response,
+    ) -> None:
+        if self.response_cache and prepared_request.method == "GET":
+            self.response_cache.put(self.name, prepared_request, response)
+
+    async def async_request(
+        self,
+        prepared_request: requests.PreparedRequest,
+        context: Context | None,
+    ) -> requests.Response:
+        """Send a request from the event loop, retrying failures like ``request_decorator``.
+
+        Args:
+            prepared_request: The prepared request.
+            context: The stream context.
+
+        Returns:
+            The response.
+        """
+        waits = self.backoff_wait_generator()
+        waits.send(None)
+        max_tries = self.backoff_max_tries()
+        started = time.monotonic()
+        tries = 0
+
+        while True:
+            tries += 1
+
+            try:
+                return await self._async_request(prepared_request, context)
+            except _RETRIABLE_EXCEPTIONS as e:
+                if tries >= max_tries:
+                    raise
+
+                wait = self.backoff_jitter(waits.send(e))
+                self.backoff_handler(
+                    {
+                        "target": self._async_request,
+                        "args": (prepared_request, context),
+                        "kwargs": {},
+                        "tries": tries,
+                        "elapsed": time.monotonic() - started,
+                        "wait": wait,
+                        "exception": e,
+                    }
+                )
+                await asyncio.sleep(wait)
+
+    @override
+    def validate_response(self, response: requests.Response) -> None:
+        """Validate HTTP response, pausing the realm's request budget when throttled.
+
+        Args:
+            response: A :class:`requests.Response` object.
+
+        Raises:
+            ThrottledAPIError: If the request was throttled.
+        """
+        throttle_seconds = get_throttle_seconds(response, get_response_payload)
+
+        if throttle_seconds is not None:
+            realm_id = parse_realm_id(response.url)
+            self.get_request_budget(realm_id).pause(throttle_seconds)
+            self.log(
+                "Requests for realm '%s' throttled, pausing for %0.1f seconds",
+                realm_id,
+                throttle_seconds,
+            )
+            raise ThrottledAPIError(self.response_error_message(response), response)
+
+        super().validate_response(response)
+
+    @override
+    def backoff_handler(self, details: Details) -> None:
+        """Log and count a retry.
+
+        Args:
+            details: The backoff invocation details.
+        """
+        super().backoff_handler(details)
+        self.profile.increment(Metric.RETRY_COUNT)
+
+    @override
+    def update_sync_costs(
+        self,
+        request: requests.PreparedRequest,
+        response: requests.Response,
+        context: Context | None,
+    ) -> dict[str, int]:
+        """Update the sync costs, and count a page of records received.
+
+        Args:
+            request: The request sent.
+            response: The response received.
+            context: The stream context.
+
+        Returns:
+            The sync costs so far.
+        """
+        self.profile.increment(Metric.PAGE_COUNT)
+        return super().update_sync_costs(request, response, context)
+
+    @override
+    def backoff_wait_generator(self) -> Generator[float, Any, None]:
+        """Return the wait generator used by the backoff decorator on request failure.
+
+        Throttled requests are retried straight away, as the paused request budget
+        already holds them back for as long as QuickBooks asked.
+
+        Yields:
+            Time in seconds to wait until the next request.
+        """
+        waits = super().backoff_wait_generator()
+        next(waits)  # advance past the initial send, as backoff does
+        exception = yield  # type: ignore[misc]
+
+        while True:
+            wait = 0.0 if isinstance(exception, ThrottledAPIError) else next(waits)
+            exception = yield wait
+
+    def _log_page_size(self) -> None:
+        self.log(
+            "Page size for stream '%s' is now %d (%s)",
+            self.name,
+            self.page_sizer.current,
+            self.page_sizer.reason,
+        )
+        log_metric(self, Metric.PAGE_SIZE, self.page_sizer.current, reason=self.page_sizer.reason)
+
+    @override
+    def finalize_state_progress_markers(self, state: dict | None = None) -> None:
+        """Finalize the state of the stream, and finish the sync after the last stream.
+
+        Args:
+            state: State object to promote progress markers with.
+        """
+        super().finalize_state_progress_markers(state)
+
+        if state is None:
+            tap = cast("TapQuickBooks", self._tap)
+            tap.stream_synced(self)
+
+    @override
+    def get_new_paginator(self) -> BaseAPIPaginator:
+        """Create a new pagination helper instance.
+
+        Returns:
+            A pagination helper instance.
+        """
+        if self.keyset_pagination:
+            return QuickBooksKeysetPaginator(page_size=self.page_size, entity=self.name)
+
+        return QuickBooksPaginator(start_value=1, page_size=self.page_size, entity=self.name)
+
+    @override
+    def get_url_params(
+        self,
+        context: Context | None,
+        next_page_token: Any | None,
+    ) -> dict[str, Any]:
+        """Return a dictionary of values to be used in URL parameterization.
+
+        Args:
+            context: The stream context.
+            next_page_token: The next page index or value.
+
+        Returns:
+            A dictionary of URL query parameters.
+        """
+        params: dict = {}
+
+        # Planned pages keep the size they were planned with
+        if not isinstance(next_page_token, PlannedPage):
+            page_size = self.page_sizer.current
+            max_results = self.page_sizer.next_page_size()
+
+            if next_page_token is None or max_results != page_size:
+                self._log_page_size()
+
+        start_date, filters = self.get_window_bounds(context)
+
+        if isinstance(next_page_token, PlannedPage):
+            params["query"] = self.build_query(
+                start_date,
+                start_position=next_page_token.start_position,
+                max_results=next_page_token.max_results,
+                filters=filters,
+                order_by_id=True,
+            )
+        elif isinstance(next_page_token, KeysetToken):
+            params["query"] = self.build_query(
+                parse_timestamp(next_page_token.last_updated_time),
+                start_position=next_page_token.offset + 1,
+                max_results=max_results,
+                filters=filters,
+            )
+        else:
+            params["query"] = self.build_query(
+                start_date,
+                start_position=next_page_token,
+                max_results=max_results,
+                filters=filters,
+            )
+
+        params["minorversion"] = MINOR_VERSION
+
+        return params
+
+    def build_query(
+        self,
+        start_date: datetime.datetime | None,
+        start_position: int | None = None,
+        max_results: int | None = None,
+        filters: list[str] | None = None,
+        *,
+        order_by_id: bool = False,
+    ) -> str:
+        """Build the SQL-like query for QuickBooks.
+
+        Args:
+            start_date: Only select records updated at or after this time.
+            start_position: 1-based offset of the first record to select.
+            max_results: Number of records to select, defaults to the page size.
+            filters: Additional conditions the records must match.
+            order_by_id: Whether to order records by ``Id`` (after the replication key).
+
+        Returns:
+            The query string.
+        """
+        # Build the full query, selecting only the fields the catalog needs
+        fields = self.get_query_fields()
+        projection = ", ".join(fields) if fields else "*"
+        query = f"SELECT {projection} FROM {self.name}"  # noqa: S608
+        query += self.build_where_clause(start_date, filters)
+
+        # Order incremental streams, breaking timestamp ties deterministically so
+        # keyset and planned page offsets are stable
+        order_by = [self.replication_key] if self.replication_key else []
+
+        if order_by_id or (order_by and self.keyset_pagination):
+            order_by.append("Id")
+
+        if order_by:
+            query += f" ORDERBY {', '.join(order_by)}"
+
+        # Add pagination
+        max_results = max_results or self.page_size
+        if start_position:
+            query += f" STARTPOSITION {start_position} MAXRESULTS {max_results}"
+        else:
+            query += f" MAXRESULTS {max_results}"
+
+        return query
+
+    def build_count_query(
+        self,
+        start_date: datetime.datetime | None,
+        filters: list[str] | None = None,
+    ) -> str:
+        """Build the query counting the records ``build_query`` selects.
+
+        Args:
+            start_date: Only count records updated at or after this time.
+            filters: Additional conditions the records must match.
+
+        Returns:
+            The query string.
+        """
+        where_clause = self.build_where_clause(start_date, filters)
+        return f"SELECT COUNT(*) FROM {self.name}{where_clause}"  # noqa: S608
+
+    def build_where_clause(
+        self,
+        start_date: datetime.datetime | None,
+        filters: list[str] | None = None,
+    ) -> str:
+        """Build the ``WHERE`` clause of a query.
+
+        Args:
+            start_date: Only select records updated at or after this time.
+            filters: Additional conditions the records must match.
+
+        Returns:
+            The clause, with a leading space, or an empty string if there are no
+            conditions.
+        """
+        query_parts = []
+
+        # Add replication key filter for incremental sync
+        if start_date and self.replication_key:
+            query_parts.append(f"{self.replication_key} >= '{start_date.isoformat()}'")
+
+        query_parts.extend(filters or ())
+
+        return f" WHERE {' AND '.join(query_parts)}" if query_parts else ""
+
+    def build_id_query(
+        self,
+        start_position: int | None = None,
+        max_results: int = MAX_PAGE_SIZE,
+        ids: Iterable[str] = (),
+    ) -> str:
+        """Build the query selecting only the ``Id`` of every record, ordered by ``Id``.
+
+        Inactive list records (e.g. customers) are hidden from queries by default, so
+        are selected explicitly to not be taken for deleted records.
+
+        Args:
+            start_position: 1-based offset of the first record to select.
+            max_results: Number of records to select.
+            ids: Only select records with these IDs.
+
+        Returns:
+            The query string.
+        """
+        filters = []
+
+        if "Active" in self.schema["properties"]:
+            filters.append("Active IN (true, false)")
+
+        if ids:
+            quoted_ids = ", ".join(f"'{record_id}'" for record_id in ids)
+            filters.append(f"Id IN ({quoted_ids})")
+
+        query = f"SELECT Id FROM {self.name}"  # noqa: S608
+        query += self.build_where_clause(None, filters)
+        query += " ORDERBY Id"
+
+        if start_position:
+            query += f" STARTPOSITION {start_position}"
+
+        return f"{query} MAXRESULTS {max_results}"
+
+    def count_records(self, context: Context | None) -> int:
+        """Count the records a sync of the stream selects.
+
+        Args:
+            context: The stream context.
+
+        Returns:
+            The number of records.
+        """
+        start_date, filters = self.get_window_bounds(context)
+        query_response = self._send_query(context, self.build_count_query(start_date, filters))
+
+        return int(query_response.get("totalCount", 0))
+
+    def request_ids(self, context: Context | None) -> IdSet:
+        """Request the ``Id`` of every record of the stream, in the realm of a context.
+
+        Args:
+            context: The stream context.
+
+        Returns:
+            The IDs.
+        """
+        ids: list[str] = []
+        start_position = 1
+
+        while True:
+            query = self.build_id_query(start_position, MAX_PAGE_SIZE)
+            records = self._send_query(context, query).get(self.name, ())
+            ids.extend(str(record["Id"]) for record in records)
+
+            if len(records) < MAX_PAGE_SIZE:
+                return IdSet(ids)
+
+            start_position += MAX_PAGE_SIZE
+
+    def request_existing_ids(self, context: Context | None, ids: list[str]) -> set[str]:
+        """Request which of the given record IDs still exist.
+
+        Args:
+            context: The stream context.
+            ids: The record IDs.
+
+        Returns:
+            The IDs of the records that exist.
+        """
+        existing: set[str] = set()
+
+        for i in range(0, len(ids), ID_CHECK_BATCH_SIZE):
+            batch = ids[i : i + ID_CHECK_BATCH_SIZE]
+            records = self._send_query(context, self.build_id_query(ids=batch)).get(self.name, ())
+            existing.update(str(record["Id"]) for record in records)
+
+        return existing
+
+    def _send_query(self, context: Context | None, query: str) -> dict:
+        prepared_request = self.build_prepared_request(
+            method="GET",
+            url=self.get_url(context),
+            params={"query": query, "minorversion": MINOR_VERSION},
+            headers=self.http_headers,
+        )
+
+        if self.event_loop:
+            future = self.event_loop.submit(self.async_request(prepared_request, context))
+            response = future.result()
+        else:
+            response = self.request_decorator(self._request)(prepared_request, context)
+
+        return get_response_payload(response).get("QueryResponse", {})
+
+    def request_page(self, context: Context | None, page: PlannedPage) -> list[dict]:
+        """Request a planned page of records.
+
+        Args:
+            context: The stream context.
+            page: The page to request.
+
+        Returns:
+            The records of the page.
+        """
+        prepared_request = self.prepare_request(context, next_page_token=page)
+        response = self.request_decorator(self._request)(prepared_request, context)
+        self.update_sync_costs(prepared_request, response, context)
+
+        with self.profile.span("extract"):
+            return list(self.parse_response(response))
+
+    async def async_request_page(self, context: Context | None, page: PlannedPage) -> list[dict]:
+        """Request a planned page of records from the event loop.
+
+        Args:
+            context: The stream context.
+            page: The page to request.
+
+        Returns:
+            The records of the page.
+        """
+        prepared_request = self.prepare_request(context, next_page_token=page)
+        response = await self.async_request(prepared_request, context)
+        self.update_sync_costs(prepared_request, response, context)
+
+        with self.profile.span("extract"):
+            return list(self.parse_response(response))
+
+    def request_pages(self, context: Context | None) -> Iterator[list[dict]]:
+        """Request the pages of records, like ``request_records``.
+
+        Args:
+            context: The stream context.
+
+        Yields:
+            The records of each page.
+        """
+        paginator = self.get_new_paginator()
+        decorated_request = self.request_decorator(self._request)
+
+        with self.get_http_request_counter() as request_counter:
+            request_counter.with_context(context)
+
+            while not paginator.finished:
+                prepared_request = self.prepare_request(
+                    context,
+                    next_page_token=paginator.current_value,
+                )
+                response = decorated_request(prepared_request, context)
+                request_counter.increment()
+                self.update_sync_costs(prepared_request, response, context)
+
+                with self.profile.span("extract"):
+                    records = list(self.parse_response(response))
+
+                if records:
+                    yield records
+                elif not paginator.continue_if_empty(response):
+                    break
+
+                paginator.advance(response)
+
+    async def async_request_pages(self, context: Context | None) -> AsyncIterator[list[dict]]:
+        """Request the pages of records from the event loop, like ``request_records``.
+
+        Args:
+            context: The stream context.
+
+        Yields:
+            The records of each page.
+        """
+        paginator = self.get_new_paginator()
+
+        with self.get_http_request_counter() as request_counter:
+            request_counter.with_context(context)
+
+            while not paginator.finished:
+                prepared_request = self.prepare_request(
+                    context,
+                    next_page_token=paginator.current_value,
+                )
+                response = await self.async_request(prepared_request, context)
+                request_counter.increment()
+                self.update_sync_costs(prepared_request, response, context)
+
+                with self.profile.span("extract"):
+                    records = list(self.parse_response(response))
+
+                if records:
+                    yield records
+                elif not paginator.continue_if_empty(response):
+                    break
+
+                paginator.advance(response)
+
+    def get_query_fields(self) -> list[str] | None:
+        """Return the entity fields to select, based on catalog property selection.
+
+        Primary keys and the replication key are always selected. Flattened
+        properties (e.g. ``MetaData.LastUpdatedTime``) select their parent field.
+
+        Returns:
+            The fields to select, or ``None`` to select all fields.
+        """
+        properties = self.schema["properties"]
+        selected = [name for name in properties if self.mask.get(("properties", name), True)]
+
+        if len(selected) == len(properties):
+            return None
+
+        required = [*self.primary_keys, self.replication_key]
+        fields: dict[str, None] = {}
+
+        for name in [*selected, *required]:
+            if name and name not in UNSELECTABLE_PROPERTIES:
+                fields[name.split(".", 1)[0]] = None
+
+        return list(fields)
+
+    def get_window_bounds(
+        self,
+        context: Context | None,
+    ) -> tuple[datetime.datetime | None, list[str]]:
+        """Return the starting timestamp and window conditions of a query.
+
+        Args:
+            context: The stream context.
+
+        Returns:
+            The starting timestamp and any additional query conditions.
+        """
+        # Streams and windows may be prefetched before the SDK starts syncing them
+        start_date = self.get_bookmark_timestamp(context)
+
+        if not context or "window_start" not in context:
+            return start_date, []
+
+        window_start, window_end = context["window_start"], context["window_end"]
+
+        if self.partition_field != self.replication_key:
+            return start_date, [
+                f"{self.partition_field} >= '{window_start}'",
+                f"{self.partition_field} < '{window_end}'",
+            ]
+
+        window_start_date = parse_timestamp(window_start)
+        window_end_date = parse_timestamp(window_end)
+
+        if not start_date or start_date < window_start_date:
+            start_date = window_start_date
+
+        return start_date, [f"{self.replication_key} < '{window_end_date.isoformat()}'"]
+
+    def get_bookmark_timestamp(
+        self,
+        context: Context | None = None,
+    ) -> datetime.datetime | None:
+        """Resolve the starting timestamp before the stream has started syncing.
+
+        Shared fetchers (CDC, batch, stream and window prefetch) request data for
+        streams or partitions that have not synced yet, so resolve it from the bookmark
+        and start date the same way the SDK will.
+
+        Args:
+            context: The stream context.
+
+        Returns:
+            The starting timestamp, or ``None`` if the stream is synced in full, or
+            there is neither a bookmark nor a start date.
+        """
+        if not self.replication_key or self.replication_method == REPLICATION_FULL_TABLE:
+            return None
+
+        # Read without creating the state of the context, which only the SDK writes
+        state = get_state_if_exists(self.tap_state, self.name, context) or {}
+        values = [self.config.get("start_date")]
+
+        if state.get("replication_key") == self.replication_key:
+            values.append(state.get("replication_key_value"))
+
+        timestamps = [parse_timestamp(value) for value in values if value]
+
+        return max(timestamps, default=None)
+
+    @override
+    def get_records(self, context: Context | None) -> Iterable[dict[str, Any]]:
+        """Return a generator of record-type dictionary objects.
+
+        Args:
+            context: The stream context.
+
+        Yields:
+            Each record from the source.
+        """
+        records = self._get_records(context)
+
+        if self.skip_unchanged:
+            records = self._skip_if_unchanged(records, context)
+        elif self.replication_method == REPLICATION_INCREMENTAL and self.config.get(
+            "boundary_index_size", DEFAULT_BOUNDARY_INDEX_SIZE
+        ):
+            records = self._skip_if_synced(records, context)
+
+        yield from records
+
+        # The IDs of a realm are compared once all of its partitions have synced
+        if self.id_snapshots and self._is_last_realm_partition(context):
+            yield from self._reconcile_deletes(self.id_snapshots, context)
+
+    def _skip_if_synced(
+        self,
+        records: Iterable[dict],
+        context: Context | None,
+    ) -> Iterable[dict]:
+        replication_key = cast("str", self.replication_key)
+        max_size = self.config.get("boundary_index_size", DEFAULT_BOUNDARY_INDEX_SIZE)
+
+        state = self.get_context_state(context)
+        bookmark = state.get("replication_key_value")
+        synced = BoundaryIndex.from_state(state.get(BOUNDARY_INDEX_KEY), max_size)
+
+        # Only trust an index of the sync that set the bookmark, e.g. not once the
+        # bookmark has been reset
+        if synced.timestamp and (
+            state.get("replication_key") != replication_key
+            or not bookmark
+            or parse_timestamp(bookmark) != synced.timestamp
+        ):
+            synced = BoundaryIndex(max_size)
+
+        seen = BoundaryIndex(max_size)
+        skipped = 0
+
+        for record in records:
+            value = _get_nested_value(record, replication_key)
+            record_id, sync_token = record.get("Id"), record.get("SyncToken")
+
+            if not value or record_id is None or sync_token is None:
+                yield record
+                continue
+
+            timestamp = parse_timestamp(value)
+            seen.add(timestamp, record_id, sync_token)
+
+            if (timestamp, record_id, sync_token) in synced:
+                skipped += 1
+                continue
+
+            yield record
+
+        if skipped:
+            self.log(
+                "Skipped %d records of stream '%s' already synced at %s",
+                skipped,
+                self.name,
+                synced.timestamp,
+            )
+
+        # The records at the new bookmark have all been seen once the sync completes
+        if seen.timestamp:
+            state[BOUNDARY_INDEX_KEY] = seen.to_state()
+
+    def _skip_if_unchanged(
+        self,
+        records: Iterable[dict],
+        context: Context | None,
+    ) -> Iterable[dict]:
+        # The hash is kept in state, so it is only trusted once the records of the
+        # last sync have been loaded
+        records = list(records)
+        content_hash = get_content_hash(records)
+
+        state = self.get_context_state(context)
+
+        if state.get("content_hash") == content_hash:
+            self.log("Skipping stream '%s', unchanged since the last sync", self.name)
+            return
+
+        yield from records
+
+        state["content_hash"] = content_hash
+
+    def _is_last_realm_partition(self, context: Context | None) -> bool:
+        if not self.partitions:
+            return True
+
+        realm_id = self.get_realm_id(context)
+        partitions = [p for p in self.partitions if self.get_realm_id(p) == realm_id]
+
+        return not partitions or context == partitions[-1]
+
+    def _reconcile_deletes(
+        self,
+        id_snapshots: IdSnapshots,
+        context: Context | None,
+    ) -> Iterable[dict]:
+        realm_id = self.get_realm_id(context)
+
+        # The snapshot of the last sync is named in state, so it is only compared
+        # against once the records of that sync have been loaded
+        digests = self.stream_state.setdefault("id_snapshots", {})
+        previous_digest = digests.get(realm_id)
+
+        ids = self.request_ids(context)
+        previous_ids = previous_digest and id_snapshots.load(realm_id, self.name, previous_digest)
+        deleted: list[str] = []
+
+        if previous_ids:
+            missing = previous_ids.difference(ids)
+
+            # Offsets shift as records are deleted mid-sync, so IDs may be missed
+            existing = self.request_existing_ids(context, missing) if missing else set()
+
+            if existing:
+                ids = IdSet([*ids, *existing])
+
+            deleted = [record_id for record_id in missing if record_id not in existing]
+
+        digest = id_snapshots.save(realm_id, self.name, ids)
+
+        if deleted:
+            self.log(
+                "Reconciled %d deleted records of stream '%s' against %d IDs",
+                len(deleted),
+                self.name,
+                len(ids),
+            )
+
+        # Stamped with the bookmark, so deletes never move it
+        timestamp = self.get_bookmark_timestamp(context)
+
+        for record_id in deleted:
+            record: dict[str, Any] = {"Id": record_id, "status": "Deleted"}
+
+            if self.replication_key:
+                record["MetaData"] = {"LastUpdatedTime": timestamp and timestamp.isoformat()}
+
+            yield record
+
+        digests[realm_id] = digest
+
+        id_snapshots.prune(realm_id, self.name, (previous_digest, digest))
+
+    def _skip_closed_windows(self, partitions: list[dict]) -> list[dict]:
+        # Records move to the window of their last update, so windows on the
+        # replication key that ended before a later bookmark of their realm were
+        # synced after they ended, and can never hold new records
+        if self.partition_field != self.replication_key:
+            return partitions
+
+        synced = {
+            get_partition_key(partition["context"]): partition
+            for partition in self.stream_state.get("partitions", ())
+        }
+
+        bookmarks: dict[str, datetime.datetime] = {}
+
+        for partition in synced.values():
+            value = partition.get("replication_key_value")
+
+            if value and partition.get("replication_key") == self.replication_key:
+                realm_id = self.get_realm_id(partition["context"])
+                bookmark = parse_timestamp(value)
+                bookmarks[realm_id] = max(bookmark, bookmarks.get(realm_id, bookmark))
+
+        open_partitions = [
+            partition
+            for partition in partitions
+            if get_partition_key(partition) not in synced
+            or self.get_realm_id(partition) not in bookmarks
+            or parse_timestamp(partition["window_end"]) > bookmarks[self.get_realm_id(partition)]
+        ]
+
+        if skipped := len(partitions) - len(open_partitions):
+            self.log("Skipping %d closed windows of stream '%s'", skipped, self.name)
+
+        return open_partitions
+
+    def _get_records(self, context: Context | None) -> Iterable[dict[str, Any]]:
+        tap = cast("TapQuickBooks", self._tap)
+
+        if tap.stream_prefetcher and (records := tap.stream_prefetcher.get_records(self)):
+            yield from records
+            return
+
+        yield from self.fetch_records(context)
+
+    def fetch_records(self, context: Context | None) -> Iterable[dict[str, Any]]:
+        """Fetch the records of the stream from the source.
+
+        Streams may be fetched on worker threads ahead of their sync, so only read
+        state, through ``get_bookmark_timestamp``.
+
+        Args:
+            context: The stream context.
+
+        Yields:
+            Each record from the source.
+        """
+        tap = cast("TapQuickBooks", self._tap)
+        records: Iterable[dict] | None = None
+
+        realm_id = self.get_realm_id(context)
+
+        if self.supports_cdc:
+            records = tap.change_data_capture[realm_id].get_records(self)
+        elif self.supports_batch:
+            records = tap.batch_query[realm_id].get_records(self)
+        elif context and self.partition_prefetcher:
+            records = self.partition_prefetcher.get_records(context)
+
+        if records is not None:
+            yield from records
+            return
+
+        prefetch_pages = self.config.get("prefetch_pages", 0)
+
+        # Planned pages are submitted to the loop by the planner instead
+        if self.event_loop and not self.page_planner:
+            async_pages = self.async_request_pages(context)
+            yield from self.event_loop.iterate(async_pages, max(1, prefetch_pages))
+            return
+
+        if prefetch_pages > 0 and not self.page_planner:
+            pages = prefetch(self.request_pages(context), prefetch_pages, f"{self.name}-pipeline")
+            yield from itertools.chain.from_iterable(pages)
+            return
+
+        yield from super().get_records(context)
+
+    @override
+    def request_records(self, context: Context | None) -> Iterable[dict]:
+        """Request records, fetching the planned pages of full-table syncs concurrently.
+
+        Args:
+            context: The stream context.
+
+        Yields:
+            Each record from the source.
+        """
+        if self.page_planner:
+            yield from self.page_planner.get_records(context)
+            return
+
+        # Requests and decoding are timed as their own spans within extraction
+        yield from self.profile.iterate("extract", super().request_records(context))
+
+    @override
+    def parse_response(self, response: requests.Response) -> Iterable[dict]:
+        """Parse the response and return an iterator of result records.
+
+        Args:
+            response: The HTTP ``requests.Response`` object.
+
+        Yields:
+            Each record from the source.
+        """
+        # QuickBooks returns records under QueryResponse.<EntityName>
+        query_response = get_response_payload(response).get("QueryResponse", {})
+        yield from query_response.get(self.name, ())
+
+    @override
+    def post_process(
+        self,
+        row: dict,
+        context: Context | None = None,
+    ) -> dict | None:
+        """As needed, append or transform raw data to match expected structure.
+
+        Args:
+            row: An individual record from the stream.
+            context: The stream context.
+
+        Returns:
+            The updated record dictionary, or ``None`` to skip the record.
+        """
+        # Skip non-dict rows (e.g., pagination metadata)
+        if not isinstance(row, dict):
+            return None
+
+        with self.profile.span("post_process"):
+            # Records carry the realm they came from only when several realms are synced
+            if self.multi_realm:
+                row["realm_id"] = self.get_realm_id(context)
+
+            # Flatten MetaData fields, prune deselected properties and conform types
+            return self.conform_record(row)
+
+    @override
+    def get_batches(
+        self,
+        batch_config: BatchConfig,
+        context: Context | None = None,
+    ) -> Iterable[tuple[BaseBatchFileEncoding, list[str]]]:
+        """Write the records to batch files.
+
+        Parquet files are written from the stream schema by the tap's columnar
+        writer, other encodings by the SDK.
+
+        Args:
+            batch_config: Batch config for this stream.
+            context: The stream context.
+
+        Yields:
+            A tuple of (encoding, manifest) for each batch.
+        """
+        if batch_config.encoding.format != "parquet":
+            yield from super().get_batches(batch_config, context)
+            return
+
+        writer = ParquetBatchWriter(
+            self,
+            batch_config,
+            row_group_size=self.config.get("batch_row_group_size", DEFAULT_ROW_GROUP_SIZE),
+            spool_dir=self.config.get("batch_spool_dir"),
+        )
+        records = self._sync_records(context, write_messages=False)
+
+        for manifest in writer.get_batches(records):
+            yield batch_config.encoding, manifest
+
+    @cached_property
+    def conform_record(self) -> Conformer:
+        """Return the record conformer of the stream.
+
+        Built on first use, once the catalog selection is known.
+
+        Returns:
+            A function returning the conformed record of a raw record.
+        """
+        return compile_conformer(self.name, self.schema, self.mask, self.logger)
+
+    @override
+    def _write_record_message(self, record: Record) -> None:
+        with self.profile.span("emit"):
+            super()._write_record_message(record)
@@ -0,0 +1,332 @@
+"""Columnar BATCH output, writing records as Arrow record batches to Parquet files."""
+
+from __future__ import annotations
+
+import contextlib
+import decimal
+import itertools
+import logging
+import shutil
+import tempfile
+import typing as t
+import urllib.parse
+import uuid
+
+from singer_sdk.singerlib.json import serialize_json
+
+from tap_quickbooks.decoding import MONEY_PROPERTY_PATTERN
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None  # type: ignore[assignment]
+    pq = None  # type: ignore[assignment]
+
+if t.TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator, Mapping
+
+    from singer_sdk.helpers._batch import BatchConfig
+    from singer_sdk.helpers._catalog import SelectionMask
+
+    from tap_quickbooks.client import QuickBooksStream
+
+    Converter = Callable[[t.Any], t.Any]
+
+# Number of records converted and written at a time, as one Parquet row group
+DEFAULT_ROW_GROUP_SIZE = 10_000
+
+# Type of exact numbers: 28 integer and 10 fractional digits
+DECIMAL_PRECISION = 38
+DECIMAL_SCALE = 10
+
+_DECIMAL_QUANTUM = decimal.Decimal(1).scaleb(-DECIMAL_SCALE)
+
+# Arrow types of the JSON schema types that map to one
+_SCALAR_TYPES: dict[str, Callable[[], pa.DataType]] = (
+    {"string": pa.string, "boolean": pa.bool_, "integer": pa.int64} if pa else {}
+)
+
+logger = logging.getLogger(__name__)
+
+
+def get_arrow_schema(
+    schema: dict,
+    mask: SelectionMask | None = None,
+    numeric_precision: str = "decimal",
+) -> pa.Schema:
+    """Return the Arrow schema of the selected properties of a stream.
+
+    Objects become structs, numbers become decimals or floats (following
+    ``numeric_precision``, as the records were decoded), timestamps are kept as
+    strings, and arrays without an item schema are stored as JSON strings.
+
+    Args:
+        schema: The stream schema.
+        mask: The catalog selection mask of the stream.
+        numeric_precision: How numbers were decoded, one of ``NUMERIC_PRECISIONS``.
+
+    Returns:
+        The Arrow schema.
+    """
+    return _ColumnarSchema(schema, mask or {}, numeric_precision).schema
+
+
+class _ColumnarSchema:
+    """Arrow schema of a stream, and the conversion of its records' values."""
+
+    def __init__(
+        self,
+        schema: dict,
+        mask: Mapping[tuple[str, ...], bool],
+        numeric_precision: str,
+        *,
+        round_decimals: bool = False,
+    ) -> None:
+        self.mask = mask
+        self.numeric_precision = numeric_precision
+        self.round_decimals = round_decimals
+        fields, converters = self.get_fields(schema, ())
+        self.schema = pa.schema(fields)
+        self.convert_record = _convert_object(converters) if converters else None
+
+    def get_fields(
+        self,
+        schema: dict,
+        breadcrumb: tuple[str, ...],
+    ) -> tuple[list[pa.Field], dict[str, Converter]]:
+        fields = []
+        converters = {}
+
+        for name, property_schema in schema.get("properties", {}).items():
+            property_breadcrumb = (*breadcrumb, "properties", name)
+
+            if not self.mask.get(property_breadcrumb, True):
+                continue
+
+            data_type, converter = self.get_type(name, property_schema, property_breadcrumb)
+            fields.append(pa.field(name, data_type))
+
+            if converter:
+                converters[name] = converter
+
+        return fields, converters
+
+    def get_type(
+        self,
+        name: str,
+        schema: dict,
+        breadcrumb: tuple[str, ...],
+    ) -> tuple[pa.DataType, Converter | None]:
+        schema_types = schema.get("type", [])
+        types = {schema_types} if isinstance(schema_types, str) else set(schema_types)
+        types.discard("null")
+
+        if types == {"object"} and "properties" in schema:
+            fields, converters = self.get_fields(schema, breadcrumb)
+            return pa.struct(fields), _convert_object(converters) if converters else None
+
+        if types == {"array"} and isinstance(schema.get("items"), dict):
+            item_type, converter = self.get_type(name, schema["items"], (*breadcrumb, "items"))
+            return pa.list_(item_type), _convert_array(converter) if converter else None
+
+        if types == {"number"}:
+            return self.get_number_type(name)
+
+        if len(types) == 1 and (data_type := _SCALAR_TYPES.get(types.pop())):
+            return data_type(), None
+
+        # Untyped arrays and objects, or unions of types
+        return pa.string(), _convert_json
+
+    def get_number_type(self, name: str) -> tuple[pa.DataType, Converter | None]:
+        if self.numeric_precision == "decimal" or (
+            self.numeric_precision == "money" and MONEY_PROPERTY_PATTERN.search(name)
+        ):
+            data_type = pa.decimal128(DECIMAL_PRECISION, DECIMAL_SCALE)
+            return data_type, _round_decimal if self.round_decimals else None
+
+        return pa.float64(), None
+
+
+def _round_decimal(value: t.Any) -> t.Any:  # noqa: ANN401
+    if not isinstance(value, decimal.Decimal):
+        return value
+
+    exponent = value.as_tuple().exponent
+
+    if isinstance(exponent, int) and exponent < -DECIMAL_SCALE:
+        return value.quantize(_DECIMAL_QUANTUM)
+
+    return value
+
+
+def _convert_json(value: t.Any) -> t.Any:  # noqa: ANN401
+    return None if value is None else serialize_json(value)
+
+
+def _convert_object(converters: dict[str, Converter]) -> Converter:
+    def convert(value: t.Any) -> t.Any:  # noqa: ANN401
+        if not isinstance(value, dict):
+            return value
+
+        value = value.copy()
+
+        for name, converter in converters.items():
+            if name in value:
+                value[name] = converter(value[name])
+
+        return value
+
+    return convert
+
+
+def _convert_array(converter: Converter) -> Converter:
+    def convert(value: t.Any) -> t.Any:  # noqa: ANN401
+        return [converter(item) for item in value] if isinstance(value, list) else value
+
+    return convert
+
+
+class ParquetBatchWriter:
+    """Write the records of a stream to Parquet files, for BATCH messages.
+
+    Records are converted to Arrow record batches of ``row_group_size`` records,
+    each written as a row group, so memory stays bounded by one row group however
+    many records a file holds (``batch_size`` in ``batch_config``). Files are
+    written in place on local storage. Files for remote storage (e.g. S3) are
+    spooled to a local temporary file first, then uploaded once complete, so
+    loaders never see a partial file.
+    """
+
+    def __init__(
+        self,
+        stream: QuickBooksStream,
+        batch_config: BatchConfig,
+        *,
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+        spool_dir: str | None = None,
+    ) -> None:
+        """Initialize the writer.
+
+        Args:
+            stream: The stream, whose selected properties are written as decoded
+                (following its ``numeric_precision``).
+            batch_config: The batch configuration.
+            row_group_size: Number of records per row group.
+            spool_dir: Directory to spool files for remote storage in, defaults to the
+                system temporary directory.
+
+        Raises:
+            ImportError: If pyarrow is not installed.
+        """
+        if pa is None:
+            msg = "Parquet batches require pyarrow, install tap-quickbooks[parquet]"
+            raise ImportError(msg)
+
+        self.tap_name = stream.tap_name
+        self.stream_name = stream.name
+        self.batch_config = batch_config
+        self.row_group_size = row_group_size
+        self.spool_dir = spool_dir
+        self._stream = stream
+        self._columnar_schema = self._get_columnar_schema()
+
+    @property
+    def schema(self) -> pa.Schema:
+        """Return the Arrow schema of the files."""
+        return self._columnar_schema.schema
+
+    def get_batches(self, records: Iterable[dict]) -> Iterator[list[str]]:
+        """Write records to Parquet files.
+
+        Args:
+            records: The records to write.
+
+        Yields:
+            A manifest of the URL of each file, once written.
+        """
+        storage = self.batch_config.storage
+        batch_size = self.batch_config.batch_size
+        compression = self.batch_config.encoding.compression or "snappy"
+        sync_id = f"{self.tap_name}--{self.stream_name}-{uuid.uuid4()}"
+        iterator = iter(records)
+
+        for index in itertools.count(1):
+            rows = list(itertools.islice(iterator, min(self.row_group_size, batch_size)))
+
+            if not rows:
+                return
+
+            filename = f"{storage.prefix or ''}{sync_id}={index}.parquet"
+
+            with (
+                self._open(filename) as f,
+                pq.ParquetWriter(f, self.schema, compression=compression) as writer,
+            ):
+                written = 0
+
+                while rows:
+                    writer.write_batch(self.to_record_batch(rows))
+                    written += len(rows)
+                    size = min(self.row_group_size, batch_size - written)
+                    rows = list(itertools.islice(iterator, size))
+
+            yield [storage.get_url(filename)]
+
+    def to_record_batch(self, records: list[dict]) -> pa.RecordBatch:
+        """Convert records to an Arrow record batch.
+
+        Args:
+            records: The records.
+
+        Returns:
+            The record batch.
+        """
+        try:
+            return self._to_record_batch(records, self._columnar_schema)
+        except pa.ArrowInvalid:
+            if self._columnar_schema.round_decimals:
+                raise
+
+            # A decimal has more fractional digits than the column holds, so round
+            # this and later batches
+            logger.warning(
+                "Rounding numbers of stream '%s' to %d decimal places",
+                self.stream_name,
+                DECIMAL_SCALE,
+            )
+            self._columnar_schema = self._get_columnar_schema(round_decimals=True)
+            return self._to_record_batch(records, self._columnar_schema)
+
+    def _get_columnar_schema(self, *, round_decimals: bool = False) -> _ColumnarSchema:
+        return _ColumnarSchema(
+            self._stream.schema,
+            self._stream.mask,
+            self._stream.config.get("numeric_precision", "decimal"),
+            round_decimals=round_decimals,
+        )
+
+    @staticmethod
+    def _to_record_batch(records: list[dict], schema: _ColumnarSchema) -> pa.RecordBatch:
+        if schema.convert_record:
+            records = [schema.convert_record(record) for record in records]
+
+        return pa.RecordBatch.from_pylist(records, schema=schema.schema)
+
+    @contextlib.contextmanager
+    def _open(self, filename: str) -> Iterator[t.IO[bytes]]:
+        storage = self.batch_config.storage
+
+        if urllib.parse.urlparse(storage.root).scheme in {"", "file"}:
+            with storage.open(filename, "wb") as f:
+                yield f
+            return
+
+        with tempfile.TemporaryFile(dir=self.spool_dir) as spool:
+            yield spool
+
+            spool.seek(0)
+
+            with storage.open(filename, "wb") as f:
+                shutil.copyfileobj(spool, f)
@@ -0,0 +1,98 @@
+"""Helpers for fetching streams concurrently."""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import typing as t
+
+from tap_quickbooks.pipeline import PrefetchBuffer
+
+if t.TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from tap_quickbooks.client import QuickBooksStream
+
+# Number of records buffered per prefetched stream
+STREAM_QUEUE_SIZE = 1000
+
+logger = logging.getLogger(__name__)
+
+
+class StreamPrefetcher:
+    """Fetch the records of upcoming streams on worker threads.
+
+    The SDK syncs streams one after another, emitting their records and writing
+    their state from the main thread. The prefetcher fetches up to ``max_workers``
+    streams ahead into bounded queues, so streams download in parallel while their
+    records are still emitted, and bookmarked, by the SDK in stream order.
+
+    Workers only hand back records, and only read the bookmarks of the streams they
+    fetch, so the SDK alone writes state, from the main thread.
+    """
+
+    def __init__(self, streams: Iterable[QuickBooksStream], max_workers: int) -> None:
+        """Initialize the prefetcher.
+
+        Args:
+            streams: The selected streams, in the order the SDK syncs them.
+            max_workers: Number of streams to fetch at once.
+        """
+        self._streams = list(streams)
+        self._max_workers = max_workers
+        self._lock = threading.Lock()
+        self._started = False
+        self._records: dict[str, Iterator[dict]] = {}
+
+    def get_records(self, stream: QuickBooksStream) -> Iterator[dict] | None:
+        """Return the records of a stream, starting to fetch every stream on the first call.
+
+        Args:
+            stream: The stream being synced.
+
+        Returns:
+            The records of the stream, or ``None`` if it is not prefetched (e.g.
+            partitioned streams, whose partitions are fetched ahead on their own).
+        """
+        with self._lock:
+            if not self._started:
+                self._start()
+                self._started = True
+
+        return self._records.pop(stream.name, None)
+
+    def _start(self) -> None:
+        streams: queue.Queue[tuple[QuickBooksStream, PrefetchBuffer[dict]]] = queue.Queue()
+
+        for stream in self._streams:
+            if stream.partitions:
+                continue
+
+            buffer: PrefetchBuffer[dict] = PrefetchBuffer(STREAM_QUEUE_SIZE)
+            self._records[stream.name] = buffer.drain()
+            streams.put((stream, buffer))
+
+        logger.info(
+            "Fetching %d streams with %d workers",
+            len(self._records),
+            self._max_workers,
+        )
+
+        # Daemon workers, so a failed sync is not kept alive by blocked prefetches
+        for i in range(self._max_workers):
+            threading.Thread(
+                target=self._work,
+                args=(streams,),
+                name=f"stream-prefetch-{i}",
+                daemon=True,
+            ).start()
+
+    def _work(self, streams: queue.Queue[tuple[QuickBooksStream, PrefetchBuffer[dict]]]) -> None:
+        while True:
+            try:
+                stream, buffer = streams.get_nowait()
+            except queue.Empty:
+                return
+
+            buffer.fill(stream.fetch_records(None))
@@ -0,0 +1,201 @@
+"""Record conformers, built once per stream from its schema and catalog selection."""
+
+from __future__ import annotations
+
+import decimal
+import logging
+import math
+import typing as t
+
+if t.TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from singer_sdk.helpers._catalog import SelectionMask
+
+    Conformer = Callable[[dict], dict]
+    ValueConformer = Callable[[t.Any], t.Any]
+
+
+class _Compiler:
+    """Build a conformer from closures, one per object schema.
+
+    Each object conformer builds the output object in a single pass over the
+    selected properties of its schema: flattened properties (e.g.
+    ``MetaData.CreateTime``) are read from their parent object, numbers and
+    booleans are coerced like the SDK does, and properties missing from the schema
+    or deselected in the catalog are left out. Nested objects and arrays of objects
+    are conformed by their own closure, so no intermediate copy of a record is made.
+    """
+
+    def __init__(self, stream_name: str, mask: SelectionMask, logger: logging.Logger) -> None:
+        self.stream_name = stream_name
+        self.mask = mask
+        self.logger = logger
+        self.warned: set[tuple[str, ...]] = set()
+
+    def warn_unmapped(self, path: str | None, properties: set[str]) -> None:
+        names = tuple(sorted(name if path is None else f"{path}.{name}" for name in properties))
+
+        if names not in self.warned:
+            self.warned.add(names)
+            self.logger.warning(
+                "Properties %s were present in the '%s' stream but not found in catalog "
+                "schema. Ignoring.",
+                names,
+                self.stream_name,
+            )
+
+    def compile_object(
+        self,
+        schema: dict,
+        breadcrumb: tuple[str, ...],
+        path: str | None,
+    ) -> Conformer:
+        properties = schema.get("properties", {})
+        known = frozenset(properties) | _flattened_parents(properties)
+
+        # (name, parent, child, conform) of each selected property, where parent and
+        # child are set for flattened properties and conform is None for no coercion
+        fields: list[tuple[str, str | None, str, ValueConformer | None]] = []
+
+        for name, property_schema in properties.items():
+            property_breadcrumb = (*breadcrumb, "properties", name)
+
+            if not self.mask.get(property_breadcrumb, True):
+                continue
+
+            property_path = name if path is None else f"{path}.{name}"
+            conform = self.compile_value(property_schema, property_breadcrumb, property_path)
+            parent, _, child = name.partition(".")
+
+            if child and parent in properties:
+                fields.append((name, parent, child, conform))
+            else:
+                fields.append((name, None, name, conform))
+
+        if schema.get("additionalProperties"):
+            return _object_conformer(fields, known, _copy_unmapped)
+
+        return _object_conformer(
+            fields,
+            known,
+            lambda _row, _record, unmapped: self.warn_unmapped(path, unmapped),
+        )
+
+    def compile_value(
+        self,
+        schema: dict,
+        breadcrumb: tuple[str, ...],
+        path: str,
+    ) -> ValueConformer | None:
+        types = _get_types(schema)
+
+        if "object" in types and "properties" in schema:
+            conform_object = self.compile_object(schema, breadcrumb, path)
+            return lambda value: conform_object(value) if isinstance(value, dict) else value
+
+        if "array" in types and isinstance(schema.get("items"), dict):
+            item = self.compile_value(schema["items"], (*breadcrumb, "items"), path)
+
+            if item is None:
+                return None
+
+            return lambda value: [item(v) for v in value] if isinstance(value, list) else value
+
+        if "number" in types:
+            return _conform_number
+
+        if types in ({"boolean"}, {"boolean", "null"}):
+            return _conform_boolean
+
+        return None
+
+
+def compile_conformer(
+    stream_name: str,
+    schema: dict,
+    mask: SelectionMask,
+    logger: logging.Logger | None = None,
+) -> Conformer:
+    """Build a function conforming raw records of a stream to its schema.
+
+    The function returns a new record holding the selected properties of the raw
+    record, equivalent to the SDK's deselected property pruning and recursive type
+    conformance of decoded JSON values, but without walking the schema per record.
+
+    Args:
+        stream_name: The stream name, for unmapped property warnings.
+        schema: The stream schema.
+        mask: The catalog selection mask of the stream.
+        logger: Logger for unmapped property warnings.
+
+    Returns:
+        The conformer.
+    """
+    compiler = _Compiler(stream_name, mask, logger or logging.getLogger(__name__))
+    return compiler.compile_object(schema, (), None)
+
+
+def _object_conformer(
+    fields: list[tuple[str, str | None, str, ValueConformer | None]],
+    known: frozenset[str],
+    on_unmapped: Callable[[dict, dict, set[str]], None],
+) -> Conformer:
+    def conform_object(row: dict) -> dict:
+        record = {}
+
+        for name, parent, child, conform in fields:
+            if parent is not None:
+                parent_value = row.get(parent)
+
+                if not isinstance(parent_value, dict):
+                    continue
+
+                value = parent_value.get(child)
+            elif name in row:
+                value = row[name]
+            else:
+                continue
+
+            record[name] = value if conform is None else conform(value)
+
+        if unmapped := row.keys() - known:
+            on_unmapped(row, record, unmapped)
+
+        return record
+
+    return conform_object
+
+
+def _copy_unmapped(row: dict, record: dict, unmapped: set[str]) -> None:
+    for name in unmapped:
+        record[name] = row[name]
+
+
+def _get_types(schema: dict) -> set[str]:
+    schema_types = schema.get("type", [])
+    types = {schema_types} if isinstance(schema_types, str) else set(schema_types)
+
+    for option in schema.get("anyOf", ()):
+        types |= _get_types(option)
+
+    return types
+
+
+def _flattened_parents(properties: dict) -> frozenset[str]:
+    return frozenset(
+        name.partition(".")[0]
+        for name in properties
+        if "." in name and name.partition(".")[0] in properties
+    )
+
+
+def _conform_number(value: t.Any) -> t.Any:  # noqa: ANN401
+    if isinstance(value, (float, decimal.Decimal)) and (math.isnan(value) or math.isinf(value)):
+        return None
+
+    return value
+
+
+def _conform_boolean(value: t.Any) -> bool | None:  # noqa: ANN401
+    return None if value is None else value != 0
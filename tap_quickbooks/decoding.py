@@ -0,0 +1,152 @@
+"""Decoding of QuickBooks JSON responses, with a choice of decoder and numeric precision."""
+
+from __future__ import annotations
+
+import decimal
+import functools
+import importlib
+import json
+import logging
+import re
+import typing as t
+
+if t.TYPE_CHECKING:
+    from collections.abc import Callable
+
+    Decoder = Callable[[bytes], t.Any]
+
+JSON_DECODERS = ("auto", "json", "orjson", "msgspec")
+
+# decimal: every number with a fraction is a ``decimal.Decimal``
+# money: only money properties are, other numbers are native floats
+# float: every number with a fraction is a native float
+NUMERIC_PRECISIONS = ("decimal", "money", "float")
+
+# Properties holding amounts of money (or rates applied to them), at any depth
+MONEY_PROPERTY_PATTERN = re.compile(
+    r"(Amt|Amount|Balance|BalanceWithJobs|BalanceWithSubAccounts|Credit|Deposit|Price|Cost"
+    r"|Rate|Tax|Total)$"
+)
+
+logger = logging.getLogger(__name__)
+
+
+def get_decoder(name: str = "auto", numeric_precision: str = "decimal") -> Decoder:
+    """Return a function decoding response bodies.
+
+    ``auto`` picks the fastest installed library able to provide the precision:
+    msgspec, then orjson (which has no ``decimal.Decimal`` support), then the
+    standard library. A library that is not installed, or cannot provide the
+    precision, falls back to the standard library with a warning.
+
+    Args:
+        name: The decoder library, one of ``JSON_DECODERS``.
+        numeric_precision: How numbers are decoded, one of ``NUMERIC_PRECISIONS``.
+
+    Returns:
+        A function decoding a JSON document, raising ``ValueError`` if it is invalid.
+
+    Raises:
+        ValueError: If the decoder or numeric precision is unknown.
+    """
+    if name not in JSON_DECODERS:
+        msg = f"Unknown JSON decoder '{name}', must be one of {JSON_DECODERS}"
+        raise ValueError(msg)
+
+    if numeric_precision not in NUMERIC_PRECISIONS:
+        msg = (
+            f"Unknown numeric precision '{numeric_precision}', must be one of {NUMERIC_PRECISIONS}"
+        )
+        raise ValueError(msg)
+
+    exact = numeric_precision == "decimal"
+    candidates = [name] if name != "auto" else ["msgspec", "orjson"]
+    decode = None
+
+    for candidate in candidates:
+        if candidate == "orjson" and exact:
+            if name != "auto":
+                logger.warning("orjson cannot decode numbers as decimals, using json instead")
+            continue
+
+        decode = _load_decoder(candidate, exact=exact, warn=name != "auto")
+
+        if decode:
+            break
+
+    if decode is None:
+        decode = _json_decoder(exact=exact)
+
+    if numeric_precision == "money":
+        return lambda content: to_money_decimals(decode(content))
+
+    return decode
+
+
+def to_money_decimals(payload: t.Any) -> t.Any:  # noqa: ANN401
+    """Convert the floats of money properties to ``decimal.Decimal``, in place.
+
+    Floats are converted through their shortest round-tripping representation, so
+    amounts of up to 15 significant digits keep the exact value sent by QuickBooks.
+
+    Args:
+        payload: A decoded JSON document.
+
+    Returns:
+        The document.
+    """
+    stack = [payload]
+
+    while stack:
+        value = stack.pop()
+
+        if isinstance(value, list):
+            stack.extend(item for item in value if isinstance(item, (dict, list)))
+            continue
+
+        if not isinstance(value, dict):
+            continue
+
+        for key, item in value.items():
+            if isinstance(item, float) and MONEY_PROPERTY_PATTERN.search(key):
+                value[key] = decimal.Decimal(repr(item))
+            elif isinstance(item, (dict, list)):
+                stack.append(item)
+
+    return payload
+
+
+def _load_decoder(name: str, *, exact: bool, warn: bool) -> Decoder | None:
+    if name == "json":
+        return _json_decoder(exact=exact)
+
+    try:
+        module = importlib.import_module(name)
+    except ImportError:
+        if warn:
+            logger.warning("%s is not installed, using json instead", name)
+        return None
+
+    if name == "orjson":
+        return module.loads
+
+    return _msgspec_decoder(module, exact=exact)
+
+
+def _json_decoder(*, exact: bool) -> Decoder:
+    if exact:
+        return functools.partial(json.loads, parse_float=decimal.Decimal)
+
+    return json.loads
+
+
+def _msgspec_decoder(msgspec: t.Any, *, exact: bool) -> Decoder:  # noqa: ANN401
+    decoder = msgspec.json.Decoder(float_hook=decimal.Decimal if exact else None)
+
+    def decode(content: bytes) -> t.Any:  # noqa: ANN401
+        try:
+            return decoder.decode(content)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+    return decode
@@ -0,0 +1,342 @@
+"""QuickBooks-specific Singer metrics."""
+
+from __future__ import annotations
+
+import contextvars
+import enum
+import json
+import tempfile
+import threading
+import time
+import typing as t
+from pathlib import Path
+
+from singer_sdk import metrics
+
+if t.TYPE_CHECKING:
+    import os
+    from collections.abc import Iterable, Iterator
+
+    from singer_sdk import Tap
+    from singer_sdk.streams import Stream
+
+    _T = t.TypeVar("_T")
+
+# Steps of a stream's hot path, in the order a record passes through them
+SPANS = ("request", "decode", "extract", "post_process", "emit")
+
+METRICS_FORMATS = ("json", "prometheus")
+
+_PROMETHEUS_PREFIX = "tap_quickbooks"
+
+
+class Metric(str, enum.Enum):
+    """QuickBooks-specific metric types."""
+
+    PAGE_SIZE = "page_size"
+    HTTP_CONNECTIONS = "http_connections"
+    SPAN_DURATION = "span_duration"
+    RESPONSE_BYTES = "response_bytes"
+    PAGE_COUNT = "page_count"
+    RETRY_COUNT = "retry_count"
+    CACHE_HIT_COUNT = "cache_hit_count"
+
+
+def log_metric(
+    stream: Stream,
+    metric: Metric,
+    value: t.Any,  # noqa: ANN401
+    metric_type: str = "gauge",
+    **tags: t.Any,
+) -> None:
+    """Log a single measurement for a stream.
+
+    Args:
+        stream: The stream the measurement belongs to.
+        metric: The metric type.
+        value: The measured value.
+        metric_type: The kind of measurement, e.g. ``gauge`` or ``timer``.
+        tags: Additional tags for the measurement.
+    """
+    point = metrics.Point(
+        metric_type,
+        t.cast("metrics.Metric", metric),
+        value,
+        {metrics.Tag.STREAM: stream.name, **tags},
+    )
+    metrics.log(stream.metrics_logger, point=point)
+
+
+def log_tap_metric(
+    tap: Tap,
+    metric: Metric,
+    value: t.Any,  # noqa: ANN401
+    metric_type: str = "gauge",
+    **tags: t.Any,
+) -> None:
+    """Log a single measurement shared by all streams of a tap.
+
+    Args:
+        tap: The tap the measurement belongs to.
+        metric: The metric type.
+        value: The measured value.
+        metric_type: The kind of measurement, e.g. ``gauge`` or ``counter``.
+        tags: Additional tags for the measurement.
+    """
+    point = metrics.Point(metric_type, t.cast("metrics.Metric", metric), value, tags)
+    metrics.log(tap.metrics_logger, point=point)
+
+
+class _Frame:
+    """A span in progress, and the time spent in the spans started within it."""
+
+    __slots__ = ("nested", "parent")
+
+    def __init__(self, parent: _Frame | None) -> None:
+        self.parent = parent
+        self.nested = 0.0
+
+
+# Innermost span in progress, per thread and per asyncio task
+_current_frame: contextvars.ContextVar[_Frame | None] = contextvars.ContextVar(
+    "tap_quickbooks_span",
+    default=None,
+)
+
+
+class _Totals:
+    """Measurements of one thread, so the hot path never waits for a lock."""
+
+    __slots__ = ("counters", "counts", "durations")
+
+    def __init__(self) -> None:
+        self.durations = dict.fromkeys(SPANS, 0.0)
+        self.counts = dict.fromkeys(SPANS, 0)
+        self.counters: dict[str, int] = {}
+
+
+class _Span:
+    __slots__ = ("frame", "name", "profile", "started", "token")
+
+    def __init__(self, profile: StreamProfile, name: str) -> None:
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.frame = _Frame(_current_frame.get())
+        self.token = _current_frame.set(self.frame)
+        self.started = time.perf_counter()
+
+    def __exit__(self, *args: object) -> None:
+        elapsed = time.perf_counter() - self.started
+        _current_frame.reset(self.token)
+
+        if self.frame.parent:
+            self.frame.parent.nested += elapsed
+
+        self.profile.add_duration(self.name, elapsed - self.frame.nested)
+
+
+class StreamProfile:
+    """Time spent by a stream in each step of its hot path, and its traffic.
+
+    Spans nest: the time of a span excludes the spans started within it (e.g. a
+    page requested and decoded while extracting records), so the durations of a
+    stream add up to the time it was busy rather than counting waits twice. Spans
+    and counters may be recorded from any thread or asyncio task.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the profile."""
+        self._local = threading.local()
+        self._totals: list[_Totals] = []
+        self._lock = threading.Lock()
+
+    def span(self, name: str) -> t.ContextManager[None]:
+        """Time a step of the hot path.
+
+        Args:
+            name: The step, one of ``SPANS``.
+
+        Returns:
+            A context manager timing its block.
+        """
+        return _Span(self, name)
+
+    def iterate(self, name: str, iterable: Iterable[_T]) -> Iterator[_T]:
+        """Time the production of each item of an iterable, as a step of the hot path.
+
+        Args:
+            name: The step, one of ``SPANS``.
+            iterable: The items.
+
+        Yields:
+            Each item.
+        """
+        iterator = iter(iterable)
+        span = _Span(self, name)
+
+        while True:
+            with span:
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+
+            yield item
+
+    def add_duration(self, name: str, seconds: float) -> None:
+        """Add the time of a step of the hot path.
+
+        Args:
+            name: The step, one of ``SPANS``.
+            seconds: The time spent.
+        """
+        totals = self._get_totals()
+        totals.durations[name] += seconds
+        totals.counts[name] += 1
+
+    def increment(self, metric: Metric, value: int = 1) -> None:
+        """Increment a counter.
+
+        Args:
+            metric: The counter, e.g. ``Metric.PAGE_COUNT``.
+            value: The amount to add.
+        """
+        counters = self._get_totals().counters
+        counters[metric.value] = counters.get(metric.value, 0) + value
+
+    def as_dict(self) -> dict[str, t.Any]:
+        """Return the measurements so far.
+
+        Returns:
+            The seconds spent and the number of times in each step, and the counters.
+        """
+        summary: dict[str, t.Any] = {
+            "spans": {name: {"seconds": 0.0, "count": 0} for name in SPANS},
+            "counters": {
+                metric.value: 0
+                for metric in (
+                    Metric.RESPONSE_BYTES,
+                    Metric.PAGE_COUNT,
+                    Metric.RETRY_COUNT,
+                    Metric.CACHE_HIT_COUNT,
+                )
+            },
+        }
+
+        with self._lock:
+            totals = list(self._totals)
+
+        for thread_totals in totals:
+            for name in SPANS:
+                summary["spans"][name]["seconds"] += thread_totals.durations[name]
+                summary["spans"][name]["count"] += thread_totals.counts[name]
+
+            for name, value in thread_totals.counters.copy().items():
+                summary["counters"][name] = summary["counters"].get(name, 0) + value
+
+        return summary
+
+    def _get_totals(self) -> _Totals:
+        try:
+            return self._local.totals
+        except AttributeError:
+            totals = self._local.totals = _Totals()
+
+            with self._lock:
+                self._totals.append(totals)
+
+            return totals
+
+
+def log_profile(stream: Stream, profile: StreamProfile) -> None:
+    """Log the hot path measurements of a stream.
+
+    Args:
+        stream: The stream the measurements belong to.
+        profile: The measurements.
+    """
+    summary = profile.as_dict()
+
+    for name, span in summary["spans"].items():
+        if span["count"]:
+            log_metric(
+                stream,
+                Metric.SPAN_DURATION,
+                round(span["seconds"], 6),
+                metric_type="timer",
+                span=name,
+                count=span["count"],
+            )
+
+    for name, value in summary["counters"].items():
+        log_metric(stream, Metric(name), value, metric_type="counter")
+
+
+def write_profiles(
+    profiles: dict[str, StreamProfile],
+    path: str | os.PathLike[str],
+    metrics_format: str = "json",
+) -> None:
+    """Write a summary of the hot path measurements of streams to a file.
+
+    The file is replaced atomically, as the Prometheus node exporter textfile
+    collector expects.
+
+    Args:
+        profiles: The measurements, by stream name.
+        path: The file to write.
+        metrics_format: The file format, one of ``METRICS_FORMATS``.
+    """
+    summaries = {name: profile.as_dict() for name, profile in profiles.items()}
+
+    if metrics_format == "prometheus":
+        content = _format_prometheus(summaries)
+    else:
+        content = json.dumps({"streams": summaries}, indent=2) + "\n"
+
+    path = Path(path)
+
+    with tempfile.NamedTemporaryFile("w", dir=path.parent, delete=False) as f:
+        f.write(content)
+
+    Path(f.name).replace(path)
+
+
+def _format_prometheus(summaries: dict[str, dict[str, t.Any]]) -> str:
+    families: dict[str, tuple[str, list[str]]] = {
+        "span_seconds_total": ("Seconds spent in each step of the sync.", []),
+        "span_calls_total": ("Number of times each step of the sync ran.", []),
+        "response_bytes_total": ("Bytes of responses received.", []),
+        "pages_total": ("Pages of records received.", []),
+        "retries_total": ("Requests retried.", []),
+        "cache_hits_total": ("Responses served from the response cache.", []),
+    }
+    counters = {
+        Metric.RESPONSE_BYTES.value: "response_bytes_total",
+        Metric.PAGE_COUNT.value: "pages_total",
+        Metric.RETRY_COUNT.value: "retries_total",
+        Metric.CACHE_HIT_COUNT.value: "cache_hits_total",
+    }
+
+    for stream_name, summary in summaries.items():
+        stream = json.dumps(stream_name)
+
+        for name, span in summary["spans"].items():
+            labels = f'{{stream={stream},span="{name}"}}'
+            families["span_seconds_total"][1].append(f"{labels} {span['seconds']:.6f}")
+            families["span_calls_total"][1].append(f"{labels} {span['count']}")
+
+        for name, value in summary["counters"].items():
+            families[counters[name]][1].append(f"{{stream={stream}}} {value}")
+
+    lines = []
+
+    for family, (description, samples) in families.items():
+        name = f"{_PROMETHEUS_PREFIX}_{family}"
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} counter")
+        lines.extend(f"{name}{sample}" for sample in samples)
+
+    return "\n".join(lines) + "\n"
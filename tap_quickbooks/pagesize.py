@@ -0,0 +1,156 @@
+"""Adaptive page sizing for QuickBooks queries."""
+
+from __future__ import annotations
+
+import re
+import threading
+import typing as t
+from urllib.parse import parse_qs, urlencode, urlsplit, urlunsplit
+
+if t.TYPE_CHECKING:
+    import requests
+
+# QuickBooks returns at most 1000 records per query
+MAX_PAGE_SIZE = 1000
+MIN_PAGE_SIZE = 10
+
+# Responses slower than this shrink the page size, faster than this grow it back
+SLOW_RESPONSE_SECONDS = 20.0
+FAST_RESPONSE_SECONDS = 5.0
+
+# Responses larger than this shrink the page size
+MAX_RESPONSE_BYTES = 20 * 1024 * 1024
+
+_MAXRESULTS_PATTERN = re.compile(r"MAXRESULTS (\d+)$")
+
+
+class AdaptivePageSize:
+    """Page size that adapts to QuickBooks response times and sizes.
+
+    Observations adjust the size used for the *next* page only. Paginators read the
+    size of each page from its request (see :func:`get_requested_page_size`), so
+    pages already in flight are unaffected.
+    """
+
+    def __init__(self, maximum: int = MAX_PAGE_SIZE, *, adaptive: bool = True) -> None:
+        """Initialize the page size.
+
+        Args:
+            maximum: Page size to start with and grow back to.
+            adaptive: Whether the page size adapts to responses, or stays at ``maximum``.
+        """
+        self.maximum = min(maximum, MAX_PAGE_SIZE)
+        self.minimum = min(MIN_PAGE_SIZE, self.maximum)
+        self.adaptive = adaptive
+        self.current = self.maximum
+        self.reason = "initial"
+        self._next = self.maximum
+        self._lock = threading.Lock()
+
+    def next_page_size(self) -> int:
+        """Commit and return the page size for the next request.
+
+        Returns:
+            The page size.
+        """
+        with self._lock:
+            self.current = self._next
+            return self.current
+
+    def observe(self, response: requests.Response) -> bool:
+        """Adjust the next page size from a successful response.
+
+        Args:
+            response: HTTP response object.
+
+        Returns:
+            True if the page size changed.
+        """
+        elapsed = response.elapsed.total_seconds()
+
+        with self._lock:
+            if elapsed > SLOW_RESPONSE_SECONDS:
+                return self._shrink("slow response")
+
+            if len(response.content) > MAX_RESPONSE_BYTES:
+                return self._shrink("large response")
+
+            if elapsed < FAST_RESPONSE_SECONDS:
+                return self._grow("fast response")
+
+            return False
+
+    def timed_out(self, prepared_request: requests.PreparedRequest) -> bool:
+        """Shrink the page size after a timeout, resizing the request for its retry.
+
+        Args:
+            prepared_request: The request that timed out.
+
+        Returns:
+            True if the page size changed.
+        """
+        with self._lock:
+            if not self._shrink("timeout"):
+                return False
+
+            self.current = self._next
+
+        _resize_request(prepared_request, self.current)
+        return True
+
+    def _shrink(self, reason: str) -> bool:
+        return self._resize(max(self.minimum, self._next // 2), reason)
+
+    def _grow(self, reason: str) -> bool:
+        return self._resize(min(self.maximum, self._next * 2), reason)
+
+    def _resize(self, size: int, reason: str) -> bool:
+        if not self.adaptive or size == self._next:
+            return False
+
+        self._next = size
+        self.reason = reason
+        return True
+
+
+def is_query_request(prepared_request: requests.PreparedRequest) -> bool:
+    """Check whether a request is a paged ``/query`` request.
+
+    Args:
+        prepared_request: HTTP request object.
+
+    Returns:
+        True if the request query ends with ``MAXRESULTS``.
+    """
+    query = _get_query(prepared_request)
+    return query is not None and _MAXRESULTS_PATTERN.search(query) is not None
+
+
+def get_requested_page_size(response: requests.Response) -> int | None:
+    """Return the number of records a response's query asked for.
+
+    Args:
+        response: HTTP response object.
+
+    Returns:
+        The ``MAXRESULTS`` of the query, or ``None`` if it is not a paged query.
+    """
+    if response.request is None:
+        return None
+
+    query = _get_query(response.request)
+    match = query and _MAXRESULTS_PATTERN.search(query)
+
+    return int(match.group(1)) if match else None
+
+
+def _get_query(prepared_request: requests.PreparedRequest | requests.Request) -> str | None:
+    params = parse_qs(urlsplit(prepared_request.url or "").query)
+    return params.get("query", [None])[0]
+
+
+def _resize_request(prepared_request: requests.PreparedRequest, size: int) -> None:
+    url = urlsplit(prepared_request.url or "")
+    params = parse_qs(url.query)
+    params["query"] = [_MAXRESULTS_PATTERN.sub(f"MAXRESULTS {size}", params["query"][0])]
+    prepared_request.url = urlunsplit(url._replace(query=urlencode(params, doseq=True)))
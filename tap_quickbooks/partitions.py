@@ -0,0 +1,175 @@
+"""Realm and date-window partitioning of streams."""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import queue
+import threading
+from typing import TYPE_CHECKING
+
+from tap_quickbooks.pipeline import PrefetchBuffer
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from singer_sdk.helpers.types import Context
+
+    from tap_quickbooks.client import QuickBooksStream
+    from tap_quickbooks.transport import EventLoop
+
+# Number of records buffered per prefetched partition
+PARTITION_QUEUE_SIZE = 1000
+
+
+def add_months(value: datetime.date, months: int) -> datetime.date:
+    """Return the first day of the month ``months`` after that of ``value``.
+
+    Args:
+        value: Date to add months to.
+        months: Number of months to add.
+
+    Returns:
+        The first day of the resulting month.
+    """
+    month = value.month - 1 + months
+    return datetime.date(value.year + month // 12, month % 12 + 1, 1)
+
+
+def get_windows(
+    start: datetime.date,
+    end: datetime.date,
+    months: int = 1,
+) -> list[dict[str, str]]:
+    """Return calendar-aligned date windows covering ``start`` to ``end``.
+
+    Windows are aligned to the first of the month so their bounds (and therefore
+    their state partitions) stay the same from one run to the next.
+
+    Args:
+        start: Date the first window must contain.
+        end: Date the last window must contain.
+        months: Length of each window in months.
+
+    Returns:
+        A list of stream contexts with ``window_start`` and ``window_end`` dates.
+    """
+    windows = []
+    window_start = start.replace(day=1)
+
+    while window_start <= end:
+        window_end = add_months(window_start, months)
+        windows.append(
+            {
+                "window_start": window_start.isoformat(),
+                "window_end": window_end.isoformat(),
+            }
+        )
+        window_start = window_end
+
+    return windows
+
+
+class PartitionPrefetcher:
+    """Fetch the records of upcoming partitions (realms or windows) on worker threads.
+
+    The SDK syncs partitions one after another. The prefetcher fetches up to
+    ``max_workers`` partitions ahead into bounded queues, so partitions download in
+    parallel while records are still emitted (and bookmarked) in partition order.
+    A partition holds its worker's slot until its records have been emitted, so at
+    most ``max_workers`` partitions are buffered at once.
+
+    With the ``asyncio`` HTTP engine, partitions are fetched by coroutines on the
+    tap's event loop instead of worker threads.
+    """
+
+    def __init__(self, stream: QuickBooksStream, max_workers: int) -> None:
+        """Initialize the prefetcher.
+
+        Args:
+            stream: The partitioned stream.
+            max_workers: Number of partitions to fetch at once.
+        """
+        self._stream = stream
+        self._max_workers = max_workers
+        self._lock = threading.Lock()
+        self._started = False
+        self._slots = threading.Semaphore(max_workers)
+        self._records: dict[tuple, Iterator[dict]] = {}
+
+    def get_records(self, context: Context) -> Iterator[dict]:
+        """Return the records of a partition.
+
+        Args:
+            context: The partition context.
+
+        Yields:
+            Each record of the partition.
+        """
+        with self._lock:
+            if not self._started:
+                if event_loop := self._stream.event_loop:
+                    self._start_async(event_loop)
+                else:
+                    self._start()
+
+                self._started = True
+
+        yield from self._records.pop(get_partition_key(context))
+
+    def _start_async(self, event_loop: EventLoop) -> None:
+        semaphore = asyncio.Semaphore(self._max_workers)
+        max_queued = max(1, PARTITION_QUEUE_SIZE // self._stream.page_size)
+
+        for context in self._stream.partitions or []:
+            pages = self._stream.async_request_pages(context)
+            records = event_loop.iterate(pages, max_queued, semaphore)
+            self._records[get_partition_key(context)] = records
+
+    def _start(self) -> None:
+        partitions: queue.Queue[tuple[Context, PrefetchBuffer[dict]]] = queue.Queue()
+
+        for context in self._stream.partitions or []:
+            buffer: PrefetchBuffer[dict] = PrefetchBuffer(PARTITION_QUEUE_SIZE)
+            self._records[get_partition_key(context)] = self._drain(buffer)
+            partitions.put((context, buffer))
+
+        # Daemon workers, so a failed sync is not kept alive by blocked prefetches
+        for i in range(self._max_workers):
+            threading.Thread(
+                target=self._work,
+                args=(partitions,),
+                name=f"{self._stream.name}-partition-{i}",
+                daemon=True,
+            ).start()
+
+    def _work(self, partitions: queue.Queue[tuple[Context, PrefetchBuffer[dict]]]) -> None:
+        while True:
+            # Released once the records of the partition have been emitted
+            self._slots.acquire()
+
+            try:
+                context, buffer = partitions.get_nowait()
+            except queue.Empty:
+                self._slots.release()
+                return
+
+            buffer.fill(self._stream.request_records(context))
+
+    def _drain(self, buffer: PrefetchBuffer[dict]) -> Iterator[dict]:
+        try:
+            yield from buffer.drain()
+        finally:
+            self._slots.release()
+
+
+def get_partition_key(context: Context) -> tuple:
+    """Return a hashable key of a partition context.
+
+    Args:
+        context: The partition context.
+
+    Returns:
+        The sorted items of the context.
+    """
+    return tuple(sorted(context.items()))
@@ -0,0 +1,102 @@
+"""Fetching records on a background thread while earlier records are emitted."""
+
+from __future__ import annotations
+
+import queue
+import threading
+import typing as t
+
+if t.TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+_T = t.TypeVar("_T")
+
+# How often a producer blocked on a full queue checks whether it was stopped
+_POLL_SECONDS = 0.1
+
+_DONE = object()
+
+
+class PrefetchBuffer(t.Generic[_T]):
+    """Bounded queue handing items from a producer thread to the consumer, in order.
+
+    The producer blocks once ``max_queued`` items are waiting, so memory stays
+    bounded however fast items arrive, and stops once the consumer does.
+    """
+
+    def __init__(self, max_queued: int) -> None:
+        """Initialize the buffer.
+
+        Args:
+            max_queued: Number of items to buffer ahead of the consumer.
+        """
+        self._queue: queue.Queue[t.Any] = queue.Queue(max_queued)
+        self._stopped = threading.Event()
+
+    def fill(self, items: Iterable[_T]) -> None:
+        """Put items on the buffer, then the end of the items or the error they raised.
+
+        Called from the producer thread. Returns early if the consumer stopped.
+
+        Args:
+            items: The items to buffer.
+        """
+        try:
+            for item in items:
+                if not self._put(item):
+                    return  # the consumer stopped early
+        except BaseException as e:  # noqa: BLE001
+            self._put(e)
+        else:
+            self._put(_DONE)
+
+    def drain(self) -> Iterator[_T]:
+        """Take items off the buffer until the end of the items.
+
+        Yields:
+            Each item, in order.
+
+        Raises:
+            Exception: Any error raised while producing the items.
+        """
+        try:
+            while (item := self._queue.get()) is not _DONE:
+                if isinstance(item, BaseException):
+                    raise item
+
+                yield item
+        finally:
+            self._stopped.set()
+
+    def _put(self, item: t.Any) -> bool:  # noqa: ANN401
+        while not self._stopped.is_set():
+            try:
+                self._queue.put(item, timeout=_POLL_SECONDS)
+            except queue.Full:
+                continue
+
+            return True
+
+        return False
+
+
+def prefetch(items: Iterable[_T], max_queued: int, name: str) -> Iterator[_T]:
+    """Iterate items on a background thread, up to ``max_queued`` items ahead.
+
+    The producer thread fetches (and parses) the next pages while the caller is
+    still processing and emitting earlier records.
+
+    Args:
+        items: The items to prefetch, e.g. from ``request_pages``.
+        max_queued: Number of items to buffer ahead.
+        name: Name of the producer thread.
+
+    Yields:
+        Each item, in order.
+    """
+    buffer: PrefetchBuffer[_T] = PrefetchBuffer(max_queued)
+
+    # Daemon thread, so a failed sync is not kept alive by a blocked producer
+    threading.Thread(target=buffer.fill, args=(items,), name=name, daemon=True).start()
+
+    yield from buffer.drain()
@@ -0,0 +1,118 @@
+"""Planning the pages of full-table queries up front, to fetch them concurrently."""
+
+from __future__ import annotations
+
+import collections
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from concurrent.futures import Future
+
+    from singer_sdk.helpers.types import Context
+
+    from tap_quickbooks.client import QuickBooksStream
+
+
+class PlannedPage(NamedTuple):
+    """Page of a planned query."""
+
+    # 1-based offset of the first record of the page
+    start_position: int
+    max_results: int
+
+
+class PagePlanner:
+    """Fetch the pages of a full-table query concurrently.
+
+    The records are counted with ``SELECT COUNT(*)`` first, so every page offset is
+    known up front. Up to ``max_workers`` pages are then fetched at once (sharing
+    the realm's request budget) and re-sequenced, so records are emitted in query
+    order, with at most ``max_workers`` pages held in memory. Pages are requested at
+    a fixed size, ordered by ``Id`` so their offsets stay consistent.
+
+    With the ``asyncio`` HTTP engine, pages are fetched by coroutines on the tap's
+    event loop instead of worker threads.
+    """
+
+    def __init__(self, stream: QuickBooksStream, max_workers: int) -> None:
+        """Initialize the planner.
+
+        Args:
+            stream: The full-table stream.
+            max_workers: Number of pages to fetch at once.
+        """
+        self._stream = stream
+        self._max_workers = max_workers
+
+    def get_records(self, context: Context | None) -> Iterator[dict]:
+        """Return the records of a partition of the stream.
+
+        Args:
+            context: The stream context.
+
+        Yields:
+            Each record, in query order.
+        """
+        page_size = self._stream.page_size
+        total = self._stream.count_records(context)
+        planned = range(1, total + 1, page_size)
+        positions = iter(planned)
+
+        self._stream.logger.info(
+            "Fetching %d records of '%s' in %d pages, %d at a time",
+            total,
+            self._stream.name,
+            len(planned),
+            self._max_workers,
+        )
+
+        event_loop = self._stream.event_loop
+        # Threads are only started by the first page submitted to the executor
+        executor = ThreadPoolExecutor(
+            self._max_workers,
+            thread_name_prefix=f"{self._stream.name}-page",
+        )
+        pending: collections.deque[Future[list[dict]]] = collections.deque()
+        records: list[dict] = []
+
+        def submit(position: int) -> None:
+            page = PlannedPage(position, page_size)
+
+            if event_loop:
+                pending.append(event_loop.submit(self._stream.async_request_page(context, page)))
+            else:
+                pending.append(executor.submit(self._stream.request_page, context, page))
+
+        try:
+            for position in itertools.islice(positions, self._max_workers):
+                submit(position)
+
+            while pending:
+                records = pending.popleft().result()
+
+                for position in itertools.islice(positions, 1):
+                    submit(position)
+
+                yield from records
+        finally:
+            for future in pending:
+                future.cancel()
+
+            executor.shutdown(cancel_futures=True)
+
+        # Records created since they were counted follow the planned pages
+        position = 1 + len(planned) * page_size
+
+        while len(records) >= page_size:
+            page = PlannedPage(position, page_size)
+
+            if event_loop:
+                records = event_loop.submit(self._stream.async_request_page(context, page)).result()
+            else:
+                records = self._stream.request_page(context, page)
+
+            position += page_size
+            yield from records
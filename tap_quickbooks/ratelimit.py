@@ -0,0 +1,387 @@
+"""Request rate limiting for the QuickBooks API."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import datetime
+import email.utils
+import json
+import logging
+import tempfile
+import threading
+import time
+import typing as t
+from pathlib import Path
+
+from singer_sdk.exceptions import RetriableAPIError
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+if t.TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+    from types import TracebackType
+
+    import requests
+    from typing_extensions import Self
+
+# https://developer.intuit.com/app/developer/qbo/docs/learn/rest-api-features#limits-and-throttles
+DEFAULT_REQUESTS_PER_MINUTE = 500
+DEFAULT_MAX_CONCURRENT_REQUESTS = 10
+
+# Fault codes QuickBooks returns when a realm or app is throttled
+THROTTLE_FAULT_CODES = frozenset({"3001", "003001"})
+
+# Pause after a throttled response without a ``Retry-After`` header (the limit window)
+DEFAULT_THROTTLE_SECONDS = 60.0
+
+# How often a request waiting for a slot checks whether another process released one
+_POLL_SECONDS = 0.05
+
+logger = logging.getLogger(__name__)
+
+
+class ThrottledAPIError(RetriableAPIError):
+    """The request was throttled, and the realm's request budget paused."""
+
+
+class _BucketState(t.TypedDict):
+    tokens: float
+    updated: float
+    paused_until: float
+
+
+class _Bucket:
+    """Token bucket state, kept in memory."""
+
+    def __init__(self, capacity: float) -> None:
+        self._state = _BucketState(tokens=capacity, updated=time.time(), paused_until=0.0)
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator[_BucketState]:
+        with self._lock:
+            yield self._state
+
+
+class _SharedBucket(_Bucket):
+    """Token bucket state, kept in a lock file shared by processes on this host."""
+
+    def __init__(self, capacity: float, path: Path) -> None:
+        super().__init__(capacity)
+        self._path = path
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator[_BucketState]:
+        with self._lock, self._path.open("a+", encoding="utf-8") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)  # released when the file is closed
+            f.seek(0)
+
+            try:
+                data = json.loads(f.read())
+                state = _BucketState(
+                    tokens=float(data["tokens"]),
+                    updated=float(data["updated"]),
+                    paused_until=float(data["paused_until"]),
+                )
+            except (KeyError, TypeError, ValueError):
+                state = self._state.copy()  # new or corrupt lock file
+
+            yield state
+
+            f.seek(0)
+            f.truncate()
+            f.write(json.dumps(state))
+
+
+class _SharedSlots:
+    """Request slots, kept as lock files shared by processes on this host.
+
+    A slot is held by locking its file, so the slots of a process that dies are
+    released with its open files.
+    """
+
+    def __init__(self, count: int, path: Path) -> None:
+        self._paths = [path.with_name(f"{path.name}.{i}") for i in range(count)]
+        self._held: list[t.IO[str]] = []
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        for path in self._paths:
+            f = path.open("a", encoding="utf-8")
+
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                f.close()
+                continue
+
+            with self._lock:
+                self._held.append(f)
+
+            return True
+
+        return False
+
+    def release(self) -> None:
+        with self._lock:
+            f = self._held.pop()
+
+        f.close()  # releases the lock
+
+
+class RequestBudget:
+    """Token bucket and concurrency limit shared by all requests to a realm.
+
+    The bucket is paused when QuickBooks throttles a request, so every stream of the
+    realm waits out the throttle instead of backing off on its own.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = DEFAULT_REQUESTS_PER_MINUTE,
+        max_concurrent_requests: int = DEFAULT_MAX_CONCURRENT_REQUESTS,
+        lock_file: Path | None = None,
+    ) -> None:
+        """Initialize the request budget.
+
+        Args:
+            requests_per_minute: Sustained number of requests allowed per minute.
+            max_concurrent_requests: Number of requests allowed in flight at once.
+            lock_file: File to share the token bucket and request slots through with
+                other processes.
+        """
+        self._rate = requests_per_minute / 60
+        self._capacity = float(max_concurrent_requests)
+        self._bucket = (
+            _SharedBucket(self._capacity, lock_file) if lock_file else _Bucket(self._capacity)
+        )
+        self._slots = _SharedSlots(max_concurrent_requests, lock_file) if lock_file else None
+        self._semaphore = threading.BoundedSemaphore(max_concurrent_requests)
+        self._waiters: set[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+        self._waiters_lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a request slot and a token are available."""
+        self._semaphore.acquire()
+        try:
+            while self._slots and not self._slots.try_acquire():
+                time.sleep(_POLL_SECONDS)
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+        try:
+            while (wait := self._take_token()) > 0:
+                time.sleep(wait)
+        except BaseException:
+            self.release()
+            raise
+
+    async def acquire_async(self) -> None:
+        """Wait until a request slot and a token are available, without blocking the loop."""
+        await self._wait_for_slot()
+
+        try:
+            # Sleep until the bucket refills (or the pause ends), not in polling steps
+            while True:
+                wait = self._take_token()
+
+                if wait <= 0:
+                    break
+
+                await asyncio.sleep(wait)
+        except BaseException:
+            self.release()
+            raise
+
+    def release(self) -> None:
+        """Release a request slot."""
+        if self._slots:
+            self._slots.release()
+
+        self._semaphore.release()
+
+        # Wake the coroutines waiting for a slot, whichever loop they run on
+        with self._waiters_lock:
+            for loop, released in self._waiters:
+                loop.call_soon_threadsafe(released.set)
+
+    def _try_acquire_slot(self) -> bool:
+        if not self._semaphore.acquire(blocking=False):
+            return False
+
+        if self._slots and not self._slots.try_acquire():
+            self._semaphore.release()
+            return False
+
+        return True
+
+    async def _wait_for_slot(self) -> None:
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+
+        with self._waiters_lock:
+            self._waiters.add(waiter)
+
+        try:
+            # Slots released by other processes are not signalled, so only wait so long
+            timeout = _POLL_SECONDS if self._slots else None
+
+            while not self._try_acquire_slot():
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(waiter[1].wait(), timeout)
+
+                waiter[1].clear()
+        finally:
+            with self._waiters_lock:
+                self._waiters.discard(waiter)
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for a while, then resume from an empty bucket.
+
+        Args:
+            seconds: Number of seconds to pause for.
+        """
+        with self._bucket.transaction() as state:
+            paused_until = max(state["paused_until"], time.time() + seconds)
+            state["paused_until"] = paused_until
+            state["updated"] = paused_until
+            state["tokens"] = 0.0
+
+    def _take_token(self) -> float:
+        """Take a token, or return how long to wait before trying again."""
+        with self._bucket.transaction() as state:
+            now = time.time()
+            wait = state["paused_until"] - now
+
+            if wait > 0:
+                return wait
+
+            elapsed = max(0.0, now - state["updated"])
+            state["tokens"] = min(self._capacity, state["tokens"] + elapsed * self._rate)
+            state["updated"] = now
+
+            if state["tokens"] >= 1:
+                state["tokens"] -= 1
+                return 0.0
+
+            return (1 - state["tokens"]) / self._rate
+
+    def __enter__(self) -> Self:
+        """Acquire a request slot.
+
+        Returns:
+            The request budget.
+        """
+        self.acquire()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Release the request slot."""
+        self.release()
+
+    async def __aenter__(self) -> Self:
+        """Wait for a request slot.
+
+        Returns:
+            The request budget.
+        """
+        await self.acquire_async()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Release the request slot."""
+        self.release()
+
+
+def create_request_budget(
+    realm_id: str,
+    requests_per_minute: int = DEFAULT_REQUESTS_PER_MINUTE,
+    max_concurrent_requests: int = DEFAULT_MAX_CONCURRENT_REQUESTS,
+    *,
+    shared: bool = False,
+) -> RequestBudget:
+    """Create the request budget of a realm.
+
+    Args:
+        realm_id: QuickBooks company/realm ID.
+        requests_per_minute: Sustained number of requests allowed per minute.
+        max_concurrent_requests: Number of requests allowed in flight at once.
+        shared: Whether to share the token bucket with other processes on this host.
+
+    Returns:
+        A request budget instance.
+    """
+    lock_file = None
+
+    if shared and fcntl is None:
+        logger.warning("File locking is not supported, not sharing the request budget")
+    elif shared:
+        lock_file = Path(tempfile.gettempdir()) / f"tap-quickbooks-{realm_id}.ratelimit"
+
+    return RequestBudget(requests_per_minute, max_concurrent_requests, lock_file)
+
+
+def get_throttle_seconds(
+    response: requests.Response,
+    get_payload: Callable[[requests.Response], t.Any],
+) -> float | None:
+    """Return how long to wait before retrying a throttled response.
+
+    Args:
+        response: HTTP response object.
+        get_payload: Function returning the decoded body of a response, e.g. the
+            payload cached on the response by the stream.
+
+    Returns:
+        The ``Retry-After`` delay (or a default one), or ``None`` if the response was
+        not throttled.
+    """
+    if response.status_code < 400:  # noqa: PLR2004
+        return None
+
+    if response.status_code != 429 and not _has_throttle_fault(response, get_payload):  # noqa: PLR2004
+        return None
+
+    retry_after = response.headers.get("Retry-After")
+
+    if not retry_after:
+        return DEFAULT_THROTTLE_SECONDS
+
+    if retry_after.isdigit():
+        return float(retry_after)
+
+    try:
+        retry_at = email.utils.parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return DEFAULT_THROTTLE_SECONDS
+
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+
+    return max(0.0, (retry_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+
+
+def _has_throttle_fault(
+    response: requests.Response,
+    get_payload: Callable[[requests.Response], t.Any],
+) -> bool:
+    try:
+        fault = get_payload(response).get("Fault", {})
+    except (AttributeError, ValueError):
+        return False
+
+    return any(error.get("code") in THROTTLE_FAULT_CODES for error in fault.get("Error", []))
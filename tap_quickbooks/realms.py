@@ -0,0 +1,56 @@
+"""Syncing several QuickBooks companies (realms) in one tap run."""
+
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+# Every company-scoped API URL contains the realm ID
+_REALM_URL_PATTERN = re.compile(r"/v3/company/([^/?#]+)")
+
+
+def get_realm_credentials(config: Mapping[str, Any]) -> dict[str, dict]:
+    """Return the OAuth credentials of each realm to sync, by realm ID.
+
+    Credentials of a realm in ``realms`` are merged over the top-level
+    ``oauth_credentials``, so a shared client ID and secret only need setting once.
+
+    Args:
+        config: The tap config.
+
+    Returns:
+        The OAuth credentials of each realm.
+
+    Raises:
+        ValueError: If the config sets neither ``realm_id`` nor ``realms``.
+    """
+    default_credentials = config.get("oauth_credentials") or {}
+    realms = config.get("realms")
+
+    if realms:
+        return {
+            realm["realm_id"]: {**default_credentials, **realm.get("oauth_credentials", {})}
+            for realm in realms
+        }
+
+    if config.get("realm_id"):
+        return {config["realm_id"]: default_credentials}
+
+    msg = "Insufficient config to sync a company. Must set one of 'realm_id' or 'realms'."
+    raise ValueError(msg)
+
+
+def parse_realm_id(url: str | None) -> str | None:
+    """Return the realm ID of a company-scoped API URL.
+
+    Args:
+        url: A QuickBooks API URL, e.g. ``.../v3/company/<realm_id>/query``.
+
+    Returns:
+        The realm ID, or ``None`` if the URL is not company-scoped.
+    """
+    match = _REALM_URL_PATTERN.search(url or "")
+    return match.group(1) if match else None
@@ -0,0 +1,199 @@
+"""Reconciliation of hard-deleted records, by comparing the IDs of each sync."""
+
+from __future__ import annotations
+
+import array
+import hashlib
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import os
+    from collections.abc import Iterable, Iterator
+
+# Number of IDs checked for existence per query
+ID_CHECK_BATCH_SIZE = 100
+
+_INTEGER_FORMAT = b"q"
+_STRING_FORMAT = b"s"
+
+
+class IdSet:
+    """Sorted IDs of the records of a stream.
+
+    QuickBooks IDs are numeric strings (bar a few, e.g. ``TaxCode`` IDs like
+    ``TAX``), so they are kept as a sorted array of 64-bit integers, 8 bytes an
+    ID, when they all are integers, and as a sorted list of strings otherwise.
+    """
+
+    def __init__(self, ids: Iterable[str] = ()) -> None:
+        """Initialize the set.
+
+        Args:
+            ids: The IDs, in any order.
+        """
+        strings = list(ids)
+        self._ids: array.array[int] | list[str]
+
+        if all(_is_integer(value) for value in strings):
+            self._ids = array.array("q", sorted(int(value) for value in strings))
+        else:
+            self._ids = sorted(set(strings))
+
+    def __len__(self) -> int:
+        """Return the number of IDs."""
+        return len(self._ids)
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the IDs, in order."""
+        return (str(value) for value in self._ids)
+
+    def difference(self, other: IdSet) -> list[str]:
+        """Return the IDs missing from another set.
+
+        Args:
+            other: The other set.
+
+        Returns:
+            The IDs in this set and not in the other, in order.
+        """
+        if isinstance(self._ids, list) or isinstance(other._ids, list):
+            return sorted(set(self) - set(other))
+
+        # Walk both sorted arrays at once, rather than building sets of them
+        missing = []
+        others = iter(other._ids)
+        current = next(others, None)
+
+        for value in self._ids:
+            while current is not None and current < value:
+                current = next(others, None)
+
+            if current != value:
+                missing.append(str(value))
+
+        return missing
+
+    def to_bytes(self) -> bytes:
+        """Return the set, serialized.
+
+        Returns:
+            The format of the IDs, followed by the IDs.
+        """
+        if isinstance(self._ids, array.array):
+            return _INTEGER_FORMAT + self._ids.tobytes()
+
+        return _STRING_FORMAT + "\n".join(self._ids).encode()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> IdSet:
+        """Return a set serialized by ``to_bytes``.
+
+        Args:
+            data: The serialized set.
+
+        Returns:
+            The set.
+        """
+        id_set = cls()
+        id_format, content = data[:1], data[1:]
+
+        if id_format == _INTEGER_FORMAT:
+            id_set._ids = array.array("q")
+            id_set._ids.frombytes(content)
+        else:
+            id_set._ids = content.decode().split("\n") if content else []
+
+        return id_set
+
+
+class IdSnapshots:
+    """The IDs of each stream and realm at each sync, kept in a directory.
+
+    Each snapshot is named by its hash, which the stream keeps in state, so a sync
+    is compared against the IDs of the last sync its state was committed for, and
+    deletes found by a failed sync are found again by the next.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        """Initialize the snapshots.
+
+        Args:
+            directory: Directory to keep the snapshots in.
+        """
+        self.directory = directory
+
+    def load(self, realm_id: str, stream_name: str, digest: str) -> IdSet | None:
+        """Return a snapshot of the IDs of a stream.
+
+        Args:
+            realm_id: QuickBooks company/realm ID.
+            stream_name: The stream name.
+            digest: The hash of the snapshot.
+
+        Returns:
+            The IDs, or ``None`` if the snapshot does not exist.
+        """
+        try:
+            data = self._get_path(realm_id, stream_name, digest).read_bytes()
+        except FileNotFoundError:
+            return None
+
+        return IdSet.from_bytes(data)
+
+    def save(self, realm_id: str, stream_name: str, ids: IdSet) -> str:
+        """Save a snapshot of the IDs of a stream.
+
+        Args:
+            realm_id: QuickBooks company/realm ID.
+            stream_name: The stream name.
+            ids: The IDs.
+
+        Returns:
+            The hash of the snapshot.
+        """
+        data = ids.to_bytes()
+        digest = hashlib.sha256(data).hexdigest()[:16]
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        with tempfile.NamedTemporaryFile("wb", dir=self.directory, delete=False) as f:
+            f.write(data)
+
+        Path(f.name).replace(self._get_path(realm_id, stream_name, digest))
+
+        return digest
+
+    def prune(self, realm_id: str, stream_name: str, keep: Iterable[str | None]) -> None:
+        """Delete the snapshots of a stream that are no longer needed.
+
+        Args:
+            realm_id: QuickBooks company/realm ID.
+            stream_name: The stream name.
+            keep: The hashes of the snapshots to keep.
+        """
+        kept = {self._get_path(realm_id, stream_name, digest) for digest in keep if digest}
+
+        for path in self.directory.glob(f"{realm_id}-{stream_name}-*.ids"):
+            if path not in kept:
+                path.unlink(missing_ok=True)
+
+    def _get_path(self, realm_id: str, stream_name: str, digest: str) -> Path:
+        return self.directory / f"{realm_id}-{stream_name}-{digest}.ids"
+
+
+def get_id_snapshots(directory: str | os.PathLike[str]) -> IdSnapshots:
+    """Return the ID snapshots kept in a directory.
+
+    Args:
+        directory: Directory to keep the snapshots in.
+
+    Returns:
+        The ID snapshots.
+    """
+    return IdSnapshots(Path(directory).expanduser())
+
+
+def _is_integer(value: str) -> bool:
+    # Without leading zeros or signs, so IDs read back exactly as they were
+    return value.isdigit() and (value == "0" or not value.startswith("0"))
@@ -0,0 +1,461 @@
+"""Report streams, flattening QuickBooks ``/reports`` responses into records."""
+
+from __future__ import annotations
+
+import datetime
+import decimal
+import re
+import sys
+from typing import TYPE_CHECKING, Any, ClassVar
+from urllib.parse import parse_qs, urlsplit
+
+from singer_sdk.pagination import BaseAPIPaginator, SinglePagePaginator
+
+from tap_quickbooks.client import (
+    MINOR_VERSION,
+    QuickBooksStream,
+    get_response_payload,
+    parse_timestamp,
+)
+
+if sys.version_info >= (3, 12):
+    from typing import override
+else:
+    from typing_extensions import override
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    import requests
+    from singer_sdk.helpers.types import Context
+
+# QuickBooks truncates reports at this many cells
+# https://developer.intuit.com/app/developer/qbo/docs/api/accounting/report-entities/generalledger
+REPORT_MAX_CELLS = 400_000
+
+_SIZE_FAULT_PATTERN = re.compile(r"too large|too many|exceed", re.IGNORECASE)
+
+ReportRange = tuple[datetime.date, datetime.date]
+
+
+def walk_rows(rows: dict) -> Iterator[tuple[list[str], dict]]:
+    """Walk a report's ``Rows/Row`` tree depth-first, yielding each data row.
+
+    The tree is walked with an explicit stack of iterators, so no part of it is
+    copied and arbitrarily deep sections cannot exhaust the recursion limit.
+
+    Args:
+        rows: The ``Rows`` object of a report or section.
+
+    Yields:
+        The names of the sections containing the row, and the row. The section list
+        is reused between rows, so copy it to keep it.
+    """
+    sections: list[str] = []
+    stack: list[Iterator[dict]] = [iter(rows.get("Row", ()))]
+
+    while stack:
+        row = next(stack[-1], None)
+
+        if row is None:
+            stack.pop()
+
+            if sections:
+                sections.pop()
+
+            continue
+
+        if "Rows" in row:
+            header = row.get("Header", {}).get("ColData", [{}])
+            sections.append(header[0].get("value", ""))
+            stack.append(iter(row["Rows"].get("Row", ())))
+        elif "ColData" in row:
+            yield sections, row
+
+
+def count_cells(rows: dict) -> int:
+    """Count the cells of a report's ``Rows/Row`` tree, including headers and summaries.
+
+    Args:
+        rows: The ``Rows`` object of a report.
+
+    Returns:
+        The number of cells.
+    """
+    cells = 0
+    stack = [rows]
+
+    while stack:
+        for row in stack.pop().get("Row", ()):
+            cells += len(row.get("ColData", ()))
+            cells += len(row.get("Header", {}).get("ColData", ()))
+            cells += len(row.get("Summary", {}).get("ColData", ()))
+
+            if "Rows" in row:
+                stack.append(row["Rows"])
+
+    return cells
+
+
+def get_report_range(response: requests.Response) -> ReportRange | None:
+    """Return the period a report response was requested for.
+
+    Args:
+        response: HTTP response object.
+
+    Returns:
+        The first and last (inclusive) dates, or ``None`` if no period was requested.
+    """
+    if response.request is None:
+        return None
+
+    params = parse_qs(urlsplit(response.request.url or "").query)
+
+    if "start_date" not in params or "end_date" not in params:
+        return None
+
+    return (
+        datetime.date.fromisoformat(params["start_date"][0]),
+        datetime.date.fromisoformat(params["end_date"][0]),
+    )
+
+
+def is_report_truncated(response: requests.Response) -> bool:
+    """Check whether a report was truncated, or refused, for being too large.
+
+    Args:
+        response: HTTP response object.
+
+    Returns:
+        True if the report hit the QuickBooks size limit.
+    """
+    try:
+        report = get_response_payload(response)
+    except ValueError:
+        return False
+
+    if response.status_code == 400:  # noqa: PLR2004
+        errors = report.get("Fault", {}).get("Error", [])
+        return any(
+            _SIZE_FAULT_PATTERN.search(f"{error.get('Message', '')} {error.get('Detail', '')}")
+            for error in errors
+        )
+
+    return count_cells(report.get("Rows", {})) >= REPORT_MAX_CELLS
+
+
+def should_bisect(response: requests.Response) -> bool:
+    """Check whether a report response should be requested again in two halves.
+
+    Args:
+        response: HTTP response object.
+
+    Returns:
+        True if the report was too large and its period spans more than a day.
+    """
+    report_range = get_report_range(response)
+
+    if report_range is None or report_range[0] >= report_range[1]:
+        return False
+
+    return is_report_truncated(response)
+
+
+class ReportRangePaginator(BaseAPIPaginator[ReportRange | None]):
+    """Paginator bisecting the period of truncated reports.
+
+    Each token is the period of the next request. A truncated response is
+    discarded, and its period requested again as two halves, earliest first, so
+    records are still emitted in date order.
+    """
+
+    def __init__(self) -> None:
+        """Initialize paginator."""
+        super().__init__(None)
+        self._pending: list[ReportRange] = []
+
+    @override
+    def get_next(self, response: requests.Response) -> ReportRange | None:
+        """Get the period of the next request.
+
+        Args:
+            response: HTTP response object.
+
+        Returns:
+            The next period, or ``None`` if every period has been requested.
+        """
+        report_range = get_report_range(response)
+
+        if report_range and should_bisect(response):
+            start, end = report_range
+            middle = start + (end - start) // 2
+            self._pending.append((middle + datetime.timedelta(days=1), end))
+            self._pending.append((start, middle))
+
+        return self._pending.pop() if self._pending else None
+
+    @override
+    def continue_if_empty(self, response: requests.Response) -> bool:
+        """Keep going after a truncated, or empty, period.
+
+        Args:
+            response: HTTP response object.
+
+        Returns:
+            True, as later periods may still have records.
+        """
+        return True
+
+
+def parse_number(value: str | None) -> decimal.Decimal | None:
+    """Parse a report amount.
+
+    Args:
+        value: The amount, e.g. ``"-1234.56"``, or an empty string.
+
+    Returns:
+        The amount, or ``None`` if the cell is empty or not a number.
+    """
+    if not value:
+        return None
+
+    try:
+        return decimal.Decimal(value)
+    except decimal.InvalidOperation:
+        return None
+
+
+class QuickBooksReportStream(QuickBooksStream):
+    """QuickBooks report stream.
+
+    Summary reports (e.g. profit and loss) emit one record per account with its
+    ``Total``, and per-period amounts when ``period_property`` is set. Columnar
+    reports (e.g. general ledger) emit one record per row, keyed by column title.
+    Both carry the names of their enclosing sections as ``Categories``.
+    """
+
+    replication_key = None
+    primary_keys = ()
+    cdc_enabled = False
+
+    # Reports are not queried, so their size cannot be counted up front
+    page_planner = None
+
+    # Reports change as transactions are posted, so are always requested
+    response_cache = None
+
+    # Reports have no records to reconcile deletes of
+    id_snapshots = None
+
+    # Reports are opt-in, so syncing without a catalog only syncs entities
+    selected_by_default = False
+
+    # Name of the report endpoint, e.g. ``ProfitAndLoss``
+    report_name: ClassVar[str]
+
+    # Additional report query parameters
+    report_params: ClassVar[dict[str, str]] = {}
+
+    # Whether rows are emitted with a property per column, or as summary records
+    columnar: ClassVar[bool] = False
+
+    # Property per-period amounts are emitted under, when reports summarize by period
+    period_property: ClassVar[str | None] = None
+
+    # Property of the first, untitled column
+    first_column: ClassVar[str] = "Account"
+
+    # Properties of columns whose title does not match them
+    column_aliases: ClassVar[dict[str, str]] = {}
+
+    # Length of the date windows the report is requested in, to bound response sizes
+    window_months: ClassVar[int | None] = None
+
+    # Whether periods the report is truncated for are split in two and requested again
+    bisect_truncated: ClassVar[bool] = False
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the stream.
+
+        Args:
+            args: Stream positional arguments.
+            kwargs: Stream keyword arguments.
+        """
+        super().__init__(*args, **kwargs)
+        self.path = f"/reports/{self.report_name}"
+
+    @override
+    @property
+    def date_windows(self) -> list[dict] | None:
+        """Return the date windows the report is requested in.
+
+        Returns:
+            A list of window contexts, or ``None`` if the report is requested at once.
+        """
+        if not self.window_months:
+            return None
+
+        return self.get_date_windows(self.window_months)
+
+    @override
+    def get_new_paginator(self) -> BaseAPIPaginator:
+        """Create a new pagination helper instance.
+
+        Returns:
+            A paginator bisecting truncated periods, or a single page paginator.
+        """
+        if self.bisect_truncated:
+            return ReportRangePaginator()
+
+        return SinglePagePaginator()
+
+    @override
+    def get_url_params(
+        self,
+        context: Context | None,
+        next_page_token: Any | None,
+    ) -> dict[str, Any]:
+        """Return a dictionary of values to be used in URL parameterization.
+
+        Args:
+            context: The stream context.
+            next_page_token: The period to request, when bisecting a truncated report.
+
+        Returns:
+            A dictionary of URL query parameters.
+        """
+        start_date, end_date = next_page_token or self.get_report_dates(context)
+
+        return {
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            **self.report_params,
+            "minorversion": MINOR_VERSION,
+        }
+
+    def get_report_dates(self, context: Context | None) -> tuple[datetime.date, datetime.date]:
+        """Return the first and last (inclusive) dates of a report request.
+
+        Args:
+            context: The stream context.
+
+        Returns:
+            The start and end dates.
+        """
+        if context and "window_start" in context:
+            start = datetime.date.fromisoformat(context["window_start"])
+            end = datetime.date.fromisoformat(context["window_end"]) - datetime.timedelta(days=1)
+            return start, end
+
+        start = parse_timestamp(self.config["start_date"]).date()
+        end = datetime.datetime.now(datetime.timezone.utc).date()
+
+        return start, end
+
+    @override
+    def validate_response(self, response: requests.Response) -> None:
+        """Validate HTTP response, accepting reports refused for being too large.
+
+        Args:
+            response: A :class:`requests.Response` object.
+        """
+        if self.bisect_truncated and should_bisect(response):
+            return
+
+        super().validate_response(response)
+
+    @override
+    def parse_response(self, response: requests.Response) -> Iterable[dict]:
+        """Parse the response and return an iterator of result records.
+
+        Args:
+            response: The HTTP ``requests.Response`` object.
+
+        Yields:
+            Each record from the source.
+        """
+        if self.bisect_truncated and should_bisect(response):
+            start, end = get_report_range(response)  # type: ignore[misc]
+            self.log(
+                "Report '%s' for %s to %s is too large, requesting it in halves",
+                self.name,
+                start,
+                end,
+            )
+            return
+
+        report = get_response_payload(response)
+        columns = report.get("Columns", {}).get("Column", [])
+        titles = [column.get("ColTitle", "") for column in columns]
+        make_record = self._make_columnar_record if self.columnar else self._make_summary_record
+
+        ragged_rows = 0
+
+        for sections, row in walk_rows(report.get("Rows", {})):
+            cells = row["ColData"]
+
+            # Pad rows missing trailing cells, or drop cells beyond the last column
+            if len(cells) != len(titles):
+                ragged_rows += 1
+                cells = cells[: len(titles)] + [{}] * (len(titles) - len(cells))
+
+            record = make_record(titles, cells)
+            record["Categories"] = list(sections)
+            yield record
+
+        if ragged_rows:
+            self.logger.warning(
+                "Report '%s' had %d rows not matching its %d columns, padded or truncated them",
+                self.name,
+                ragged_rows,
+                len(titles),
+            )
+
+    def _make_columnar_record(self, titles: list[str], cells: list[dict]) -> dict:
+        properties = self.schema["properties"]
+        record: dict[str, Any] = {}
+
+        for title, cell in zip(titles, cells, strict=True):
+            name = self.get_column_property(title)
+            value = cell.get("value")
+
+            if "number" in properties.get(name, {}).get("type", ()):
+                record[name] = parse_number(value)
+            else:
+                record[name] = value
+
+            if cell.get("id"):
+                record[f"{name}Id"] = cell["id"]
+
+        return record
+
+    def _make_summary_record(self, titles: list[str], cells: list[dict]) -> dict:
+        record: dict[str, Any] = {self.first_column: cells[0].get("value")}
+        periods = []
+
+        for title, cell in zip(titles[1:], cells[1:], strict=True):
+            amount = parse_number(cell.get("value"))
+
+            if title == "Total" or not self.period_property:
+                record["Total"] = amount
+            else:
+                periods.append({"Period": title, "Total": amount})
+
+        if self.period_property:
+            record[self.period_property] = periods
+
+        return record
+
+    def get_column_property(self, title: str) -> str:
+        """Return the record property of a report column.
+
+        Args:
+            title: The column title, e.g. ``Transaction Type``.
+
+        Returns:
+            The property name, e.g. ``TransactionType``.
+        """
+        if not title:
+            return self.first_column
+
+        return self.column_aliases.get(title, title.replace(" ", ""))
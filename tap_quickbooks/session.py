@@ -0,0 +1,73 @@
+"""HTTP session shared by all streams, pooling connections to the QuickBooks API."""
+
+from __future__ import annotations
+
+import typing as t
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Hosts to keep a connection pool open for (e.g. the API and OAuth endpoints)
+POOL_CONNECTIONS = 4
+
+
+class ConnectionStats(t.NamedTuple):
+    """Requests sent to a host, and connections opened to send them."""
+
+    requests: int
+    connections: int
+
+    @property
+    def reused(self) -> int:
+        """Return the number of requests sent over an already open connection."""
+        return max(0, self.requests - self.connections)
+
+
+def create_session(pool_maxsize: int) -> requests.Session:
+    """Create a keep-alive session.
+
+    Args:
+        pool_maxsize: Number of connections to keep open per host, which should cover
+            the requests allowed in flight at once.
+
+    Returns:
+        The session.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    return session
+
+
+def get_connection_stats(session: requests.Session) -> dict[str, ConnectionStats]:
+    """Return the connection reuse statistics of a session.
+
+    Args:
+        session: A session created by :func:`create_session`.
+
+    Returns:
+        The requests sent and connections opened, by host.
+    """
+    stats: dict[str, ConnectionStats] = {}
+
+    for adapter in set(session.adapters.values()):
+        if not isinstance(adapter, HTTPAdapter):
+            continue
+
+        pools = adapter.poolmanager.pools
+
+        for key in pools.keys():  # noqa: SIM118 - pool containers are not iterable
+            pool = pools.get(key)
+
+            if pool is None:
+                continue
+
+            previous = stats.get(pool.host, ConnectionStats(0, 0))
+            stats[pool.host] = ConnectionStats(
+                previous.requests + pool.num_requests,
+                previous.connections + pool.num_connections,
+            )
+
+    return stats
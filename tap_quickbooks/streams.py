@@ -2,7 +2,19 @@
 
 from __future__ import annotations
 
+import sys
+from typing import TYPE_CHECKING, Any, ClassVar
+
 from tap_quickbooks.client import QuickBooksStream
+from tap_quickbooks.reports import QuickBooksReportStream
+
+if sys.version_info >= (3, 12):
+    from typing import override
+else:
+    from typing_extensions import override
+
+if TYPE_CHECKING:
+    from singer_sdk.helpers.types import Context
 
 
 class AccountsStream(QuickBooksStream):
@@ -48,6 +60,7 @@ class ClassesStream(QuickBooksStream):
     path = "/query"
     primary_keys = ("Id",)
     replication_key = "MetaData.LastUpdatedTime"
+    batched = True
 
 
 class CompanyCurrencyStream(QuickBooksStream):
@@ -57,6 +70,8 @@ class CompanyCurrencyStream(QuickBooksStream):
     path = "/query"
     primary_keys = ("Id",)
     replication_key = "MetaData.LastUpdatedTime"
+    cdc_enabled = False
+    batched = True
 
 
 class CompanyInfoStream(QuickBooksStream):
@@ -66,6 +81,7 @@ class CompanyInfoStream(QuickBooksStream):
     path = "/query"
     primary_keys = ("Id",)
     replication_key = None  # Full table replication
+    batched = True
 
 
 class CreditMemosStream(QuickBooksStream):
@@ -93,6 +109,8 @@ class CustomerTypesStream(QuickBooksStream):
     path = "/query"
     primary_keys = ("Id",)
     replication_key = "MetaData.LastUpdatedTime"
+    cdc_enabled = False
+    batched = True
 
 
 class DepartmentsStream(QuickBooksStream):
@@ -102,6 +120,7 @@ class DepartmentsStream(QuickBooksStream):
     path = "/query"
     primary_keys = ("Id",)
     replication_key = "MetaData.LastUpdatedTime"
+    batched = True
 
 
 class EmployeesStream(QuickBooksStream):
@@ -165,6 +184,7 @@ class PaymentMethodsStream(QuickBooksStream):
     path = "/query"
     primary_keys = ("Id",)
     replication_key = "MetaData.LastUpdatedTime"
+    batched = True
 
 
 class PreferencesStream(QuickBooksStream):
@@ -174,6 +194,7 @@ class PreferencesStream(QuickBooksStream):
     path = "/query"
     primary_keys = ("Id",)
     replication_key = None  # Full table replication
+    batched = True
 
 
 class PurchasesStream(QuickBooksStream):
@@ -210,6 +231,7 @@ class TaxCodesStream(QuickBooksStream):
     path = "/query"
     primary_keys = ("Id",)
     replication_key = None  # Full table replication per original tap
+    batched = True
 
 
 class TaxRatesStream(QuickBooksStream):
@@ -219,6 +241,7 @@ class TaxRatesStream(QuickBooksStream):
     path = "/query"
     primary_keys = ("Id",)
     replication_key = None  # Full table replication per original tap
+    batched = True
 
 
 class TermsStream(QuickBooksStream):
@@ -228,6 +251,7 @@ class TermsStream(QuickBooksStream):
     path = "/query"
     primary_keys = ("Id",)
     replication_key = "MetaData.LastUpdatedTime"
+    batched = True
 
 
 class TimeActivitiesStream(QuickBooksStream):
@@ -264,3 +288,158 @@ class VendorCreditsStream(QuickBooksStream):
     path = "/query"
     primary_keys = ("Id",)
     replication_key = "MetaData.LastUpdatedTime"
+
+
+# https://developer.intuit.com/app/developer/qbo/docs/api/accounting/report-entities/generalledger
+GENERAL_LEDGER_COLUMNS = (
+    "tx_date,txn_type,doc_num,is_adj,create_date,create_by,last_mod_date,last_mod_by,name,"
+    "cust_name,vend_name,emp_name,dept_name,item_name,memo,quantity,rate,account_num,"
+    "account_name,split_acc,inv_date,is_ar_paid,is_ap_paid,is_cleared,chk_print_state,"
+    "debt_amt,credit_amt,nat_open_bal,subt_nat_amount,tax_code,tax_amount,net_amount,"
+    "klass_name"
+)
+
+
+class ProfitAndLossReportStream(QuickBooksReportStream):
+    """ProfitAndLoss report stream."""
+
+    name = "ProfitAndLossReport"
+    report_name = "ProfitAndLoss"
+
+
+class ProfitAndLossDetailReportStream(QuickBooksReportStream):
+    """ProfitAndLossDetail report stream."""
+
+    name = "ProfitAndLossDetailReport"
+    report_name = "ProfitAndLossDetail"
+    report_params: ClassVar[dict[str, str]] = {
+        "columns": (
+            "tx_date,txn_type,doc_num,create_date,create_by,last_mod_date,last_mod_by,name,"
+            "dept_name,klass_name,memo,split_acc,debt_amt,credit_amt,pmt_mthd,"
+            "subt_nat_amount,rbal_nat_amount,tax_code,tax_amount,net_amount"
+        ),
+    }
+    columnar = True
+    column_aliases: ClassVar[dict[str, str]] = {"Memo/Description": "Memo"}
+    window_months = 1
+
+
+class BalanceSheetReportStream(QuickBooksReportStream):
+    """BalanceSheet report stream."""
+
+    name = "BalanceSheetReport"
+    report_name = "BalanceSheet"
+
+
+class MonthlyBalanceSheetReportStream(QuickBooksReportStream):
+    """Monthly BalanceSheet report stream."""
+
+    name = "MonthlyBalanceSheetReport"
+    report_name = "BalanceSheet"
+    report_params: ClassVar[dict[str, str]] = {"summarize_column_by": "Month"}
+    period_property = "MonthlyTotal"
+
+
+class CashFlowReportStream(QuickBooksReportStream):
+    """CashFlow report stream."""
+
+    name = "CashFlowReport"
+    report_name = "CashFlow"
+
+
+class MonthlyCashFlowReportStream(QuickBooksReportStream):
+    """Monthly CashFlow report stream."""
+
+    name = "MonthlyCashFlowReport"
+    report_name = "CashFlow"
+    report_params: ClassVar[dict[str, str]] = {"summarize_column_by": "Month"}
+    period_property = "MonthlyTotal"
+
+
+class DailyCashFlowReportStream(QuickBooksReportStream):
+    """Daily CashFlow report stream."""
+
+    name = "DailyCashFlowReport"
+    report_name = "CashFlow"
+    report_params: ClassVar[dict[str, str]] = {"summarize_column_by": "Days"}
+    period_property = "DailyTotal"
+    window_months = 1
+
+
+class ARAgingSummaryReportStream(QuickBooksReportStream):
+    """AgedReceivables report stream."""
+
+    name = "ARAgingSummaryReport"
+    report_name = "AgedReceivables"
+    columnar = True
+    first_column = "Customer"
+
+    @override
+    def get_url_params(
+        self,
+        context: Context | None,
+        next_page_token: Any | None,
+    ) -> dict[str, Any]:
+        """Return a dictionary of values to be used in URL parameterization.
+
+        Args:
+            context: The stream context.
+            next_page_token: Unused, as reports are not paged.
+
+        Returns:
+            A dictionary of URL query parameters.
+        """
+        params = super().get_url_params(context, next_page_token)
+
+        # Aging is reported as of a single date
+        params["report_date"] = params.pop("end_date")
+        del params["start_date"]
+
+        return params
+
+
+class GeneralLedgerAccrualReportStream(QuickBooksReportStream):
+    """Accrual GeneralLedger report stream."""
+
+    name = "GeneralLedgerAccrualReport"
+    report_name = "GeneralLedger"
+    report_params: ClassVar[dict[str, str]] = {
+        "accounting_method": "Accrual",
+        "columns": GENERAL_LEDGER_COLUMNS,
+    }
+    columnar = True
+    column_aliases: ClassVar[dict[str, str]] = {"Memo/Description": "Memo"}
+    window_months = 1
+    bisect_truncated = True
+
+
+class GeneralLedgerCashReportStream(QuickBooksReportStream):
+    """Cash GeneralLedger report stream."""
+
+    name = "GeneralLedgerCashReport"
+    report_name = "GeneralLedger"
+    report_params: ClassVar[dict[str, str]] = {
+        "accounting_method": "Cash",
+        "columns": GENERAL_LEDGER_COLUMNS,
+    }
+    columnar = True
+    column_aliases: ClassVar[dict[str, str]] = {"Memo/Description": "Memo"}
+    window_months = 1
+    bisect_truncated = True
+
+
+class TransactionListReportStream(QuickBooksReportStream):
+    """TransactionList report stream."""
+
+    name = "TransactionListReport"
+    report_name = "TransactionList"
+    report_params: ClassVar[dict[str, str]] = {
+        "columns": (
+            "tx_date,txn_type,doc_num,is_no_post,name,memo,account_name,other_account,"
+            "klass_name,dept_name,subt_nat_amount"
+        ),
+    }
+    columnar = True
+    column_aliases: ClassVar[dict[str, str]] = {"Memo/Description": "Memo"}
+    window_months = 1
+    bisect_truncated = True
@@ -3,17 +3,50 @@
 from __future__ import annotations
 
 import sys
+import threading
+from functools import cached_property
+from typing import TYPE_CHECKING, Any
 
 from singer_sdk import Tap
 from singer_sdk import typing as th  # JSON schema typing helpers
 
 from tap_quickbooks import streams
+from tap_quickbooks.auth import create_authenticator
+from tap_quickbooks.batch import BatchQuery
+from tap_quickbooks.boundary import DEFAULT_BOUNDARY_INDEX_SIZE
+from tap_quickbooks.cache import DEFAULT_RESPONSE_CACHE_TTL
+from tap_quickbooks.cdc import ChangeDataCapture
+from tap_quickbooks.columnar import DEFAULT_ROW_GROUP_SIZE
+from tap_quickbooks.concurrency import StreamPrefetcher
+from tap_quickbooks.decoding import JSON_DECODERS, NUMERIC_PRECISIONS
+from tap_quickbooks.metrics import (
+    METRICS_FORMATS,
+    Metric,
+    log_profile,
+    log_tap_metric,
+    write_profiles,
+)
+from tap_quickbooks.pagesize import MAX_PAGE_SIZE
+from tap_quickbooks.ratelimit import (
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_REQUESTS_PER_MINUTE,
+    create_request_budget,
+)
+from tap_quickbooks.realms import get_realm_credentials
+from tap_quickbooks.session import ConnectionStats, create_session, get_connection_stats
+from tap_quickbooks.transport import HTTP_ENGINES, EventLoop
 
 if sys.version_info >= (3, 12):
     from typing import override
 else:
     from typing_extensions import override
 
+if TYPE_CHECKING:
+    import requests
+
+    from tap_quickbooks.auth import QuickBooksAuthenticator
+    from tap_quickbooks.ratelimit import RequestBudget
+
 
 REFRESH_TOKEN_PROPERTY = th.Property(
     "refresh_token",
@@ -70,14 +103,68 @@ class TapQuickBooks(Tap):
                     REFRESH_TOKEN_PROPERTY,
                 ),
             ),
-            required=True,
+            description=(
+                "QuickBooks OAuth2 credentials. Required unless every realm in 'realms' "
+                "sets its own."
+            ),
         ),
         th.Property(
             "realm_id",
             th.StringType(nullable=False),
-            required=True,
             title="Realm ID",
-            description="QuickBooks company/realm ID",
+            description="QuickBooks company/realm ID. Required unless 'realms' is set.",
+        ),
+        th.Property(
+            "realms",
+            th.ArrayType(
+                th.ObjectType(
+                    th.Property(
+                        "realm_id",
+                        th.StringType(nullable=False),
+                        required=True,
+                        title="Realm ID",
+                        description="QuickBooks company/realm ID",
+                    ),
+                    th.Property(
+                        "oauth_credentials",
+                        th.ObjectType(
+                            th.Property("client_id", th.StringType, title="Client ID"),
+                            th.Property(
+                                "client_secret",
+                                th.StringType,
+                                secret=True,
+                                title="Client Secret",
+                            ),
+                            th.Property(
+                                "refresh_token",
+                                th.StringType,
+                                secret=True,
+                                title="Refresh Token",
+                            ),
+                            th.Property(
+                                "refresh_proxy_url",
+                                th.StringType,
+                                title="Refresh Proxy URL",
+                            ),
+                            th.Property(
+                                "refresh_proxy_url_auth",
+                                th.StringType,
+                                secret=True,
+                                title="Refresh Proxy URL Auth",
+                            ),
+                        ),
+                        description=(
+                            "OAuth2 credentials of the realm, merged over the top-level "
+                            "'oauth_credentials'"
+                        ),
+                    ),
+                ),
+            ),
+            title="Realms",
+            description=(
+                "QuickBooks companies to sync in one run, instead of 'realm_id'. Every "
+                "stream is partitioned by realm, and records carry a 'realm_id'."
+            ),
         ),
         th.Property(
             "start_date",
@@ -99,8 +186,310 @@ class TapQuickBooks(Tap):
             default=False,
             description="Whether to use the QuickBooks sandbox environment",
         ),
+        th.Property(
+            "api_url",
+            th.URIType,
+            title="API URL",
+            description=(
+                "Root URL of the QuickBooks API, overriding the production or sandbox URL "
+                "(e.g. for a proxy or a mock server)"
+            ),
+        ),
+        th.Property(
+            "page_size",
+            th.IntegerType(nullable=False),
+            default=MAX_PAGE_SIZE,
+            title="Page Size",
+            description="Number of records to request per page (max 1000)",
+        ),
+        th.Property(
+            "adaptive_page_size",
+            th.BooleanType(nullable=False),
+            default=True,
+            title="Adaptive Page Size",
+            description=(
+                "Shrink the page size when responses are slow, large or time out, and grow "
+                "it back up to 'page_size' when they are fast. Streams whose responses are "
+                "cached ('response_cache_dir') always request 'page_size' records"
+            ),
+        ),
+        th.Property(
+            "json_decoder",
+            th.StringType(nullable=False),
+            allowed_values=list(JSON_DECODERS),
+            default="auto",
+            title="JSON Decoder",
+            description=(
+                "Library to decode responses with: 'orjson' or 'msgspec' (when installed, "
+                "e.g. with the fast-json extra), "
+                "'json', or 'auto' to pick the fastest installed library able to provide "
+                "'numeric_precision'. Libraries that are not installed fall back to 'json'"
+            ),
+        ),
+        th.Property(
+            "numeric_precision",
+            th.StringType(nullable=False),
+            allowed_values=list(NUMERIC_PRECISIONS),
+            default="decimal",
+            title="Numeric Precision",
+            description=(
+                "How numbers with a fraction are decoded: 'decimal' (exact Decimal values), "
+                "'money' (Decimal for amounts, balances, prices and rates, native floats "
+                "otherwise) or 'float' (native floats)"
+            ),
+        ),
+        th.Property(
+            "max_concurrent_streams",
+            th.IntegerType(nullable=False),
+            default=1,
+            title="Max Concurrent Streams",
+            description=(
+                "Number of streams to fetch concurrently, ahead of the stream being emitted "
+                "(1 fetches streams one at a time)"
+            ),
+        ),
+        th.Property(
+            "max_requests_per_minute",
+            th.IntegerType(nullable=False),
+            default=DEFAULT_REQUESTS_PER_MINUTE,
+            title="Max Requests Per Minute",
+            description="Request budget per minute, shared by all streams of a realm",
+        ),
+        th.Property(
+            "max_concurrent_requests",
+            th.IntegerType(nullable=False),
+            default=DEFAULT_MAX_CONCURRENT_REQUESTS,
+            title="Max Concurrent Requests",
+            description="Number of requests in flight at once, shared by all streams of a realm",
+        ),
+        th.Property(
+            "share_request_budget",
+            th.BooleanType(nullable=False),
+            default=False,
+            title="Share Request Budget",
+            description=(
+                "Share the per-minute request budget and concurrent request limit of a realm "
+                "with other tap processes on this host, through lock files in the temporary "
+                "directory"
+            ),
+        ),
+        th.Property(
+            "token_cache_dir",
+            th.StringType,
+            title="Token Cache Directory",
+            description=(
+                "Directory to cache access tokens and rotated refresh tokens in, so runs and "
+                "processes syncing the same realm reuse them (tokens are not cached if unset)"
+            ),
+        ),
+        th.Property(
+            "response_cache_dir",
+            th.StringType,
+            title="Response Cache Directory",
+            description=(
+                "Directory to cache the query responses of full-table streams (CompanyInfo, "
+                "Preferences, TaxCode and TaxRate) in, so runs within 'response_cache_ttl' "
+                "reuse them instead of sending requests (responses are not cached if unset)"
+            ),
+        ),
+        th.Property(
+            "response_cache_ttl",
+            th.IntegerType(nullable=False),
+            default=DEFAULT_RESPONSE_CACHE_TTL,
+            title="Response Cache TTL",
+            description="Number of seconds cached responses are reused for",
+        ),
+        th.Property(
+            "skip_unchanged_streams",
+            th.BooleanType(nullable=False),
+            default=False,
+            title="Skip Unchanged Streams",
+            description=(
+                "Skip emitting the records of cached full-table streams when their content "
+                "hash matches the one kept in state by the last sync (requires "
+                "'response_cache_dir')"
+            ),
+        ),
+        th.Property(
+            "reconcile_deletes",
+            th.ArrayType(th.StringType),
+            title="Reconcile Deletes",
+            description=(
+                "Streams to find hard-deleted records of, by comparing the IDs of every "
+                "record with those of the last sync (requires 'reconcile_deletes_dir'). "
+                "Deleted records are emitted with a 'status' of 'Deleted'."
+            ),
+        ),
+        th.Property(
+            "reconcile_deletes_dir",
+            th.StringType,
+            title="Reconcile Deletes Directory",
+            description=(
+                "Directory to keep the IDs of each stream in 'reconcile_deletes' in, between syncs"
+            ),
+        ),
+        th.Property(
+            "use_cdc",
+            th.BooleanType(nullable=False),
+            default=False,
+            title="Use Change Data Capture",
+            description=(
+                "Fetch changes for incremental streams with a single Change Data Capture "
+                "request when their bookmark is within the last 30 days. Deleted records "
+                "are emitted with a 'status' of 'Deleted'."
+            ),
+        ),
+        th.Property(
+            "use_batch_api",
+            th.BooleanType(nullable=False),
+            default=False,
+            title="Use Batch API",
+            description=(
+                "Query small reference streams (Term, PaymentMethod, Class, etc.) together "
+                "with Batch API requests instead of one request per stream"
+            ),
+        ),
+        th.Property(
+            "keyset_pagination",
+            th.BooleanType(nullable=False),
+            default=False,
+            title="Keyset Pagination",
+            description=(
+                "Page incremental streams from the last 'MetaData.LastUpdatedTime' seen "
+                "instead of deep STARTPOSITION offsets"
+            ),
+        ),
+        th.Property(
+            "boundary_index_size",
+            th.IntegerType(nullable=False),
+            default=DEFAULT_BOUNDARY_INDEX_SIZE,
+            title="Boundary Index Size",
+            description=(
+                "Number of records updated at the bookmark timestamp to remember in state, "
+                "by 'Id' and 'SyncToken', so the next sync does not emit them again (0 "
+                "emits them again)"
+            ),
+        ),
+        th.Property(
+            "partition_by",
+            th.StringType(nullable=True),
+            allowed_values=["MetaData.LastUpdatedTime", "TxnDate"],
+            title="Partition By",
+            description=(
+                "Split incremental streams into calendar-aligned date windows on this field, "
+                "each with its own bookmark. Entities without a 'TxnDate' are windowed by "
+                "'MetaData.LastUpdatedTime'."
+            ),
+        ),
+        th.Property(
+            "partition_window_months",
+            th.IntegerType(nullable=False),
+            default=1,
+            title="Partition Window Months",
+            description="Length of each date window in months",
+        ),
+        th.Property(
+            "max_concurrent_partitions",
+            th.IntegerType(nullable=False),
+            default=1,
+            title="Max Concurrent Partitions",
+            description=(
+                "Number of partitions (realms and date windows) of a stream to fetch "
+                "concurrently (1 fetches partitions one at a time)"
+            ),
+        ),
+        th.Property(
+            "max_concurrent_pages",
+            th.IntegerType(nullable=False),
+            default=1,
+            title="Max Concurrent Pages",
+            description=(
+                "Number of pages of full-table streams to fetch concurrently, planned from a "
+                "'SELECT COUNT(*)' query (1 fetches pages one at a time)"
+            ),
+        ),
+        th.Property(
+            "prefetch_pages",
+            th.IntegerType(nullable=False),
+            default=0,
+            title="Prefetch Pages",
+            description=(
+                "Number of pages to fetch ahead on a background thread while earlier "
+                "records are emitted (0 fetches each page once the previous one has been "
+                "emitted)"
+            ),
+        ),
+        th.Property(
+            "http_engine",
+            th.StringType(nullable=False),
+            allowed_values=list(HTTP_ENGINES),
+            default="requests",
+            title="HTTP Engine",
+            description=(
+                "How requests are sent: 'requests' (a thread per request in flight) or "
+                "'asyncio' (every stream, realm and partition's requests in flight from one "
+                "event loop, requires the asyncio extra)"
+            ),
+        ),
+        th.Property(
+            "batch_row_group_size",
+            th.IntegerType(nullable=False),
+            default=DEFAULT_ROW_GROUP_SIZE,
+            title="Batch Row Group Size",
+            description=(
+                "Number of records per row group of Parquet batch files, converted and "
+                "written at a time (requires the parquet extra)"
+            ),
+        ),
+        th.Property(
+            "batch_spool_dir",
+            th.StringType,
+            title="Batch Spool Directory",
+            description=(
+                "Local directory Parquet batch files for remote storage (e.g. S3) are "
+                "written to before they are uploaded, defaults to the system temporary "
+                "directory"
+            ),
+        ),
+        th.Property(
+            "metrics_file",
+            th.StringType,
+            title="Metrics File",
+            description=(
+                "File to write a summary of the time each stream spent requesting, "
+                "decoding, extracting, post-processing and emitting records to at the end "
+                "of the sync, with its response bytes, pages and retries"
+            ),
+        ),
+        th.Property(
+            "metrics_format",
+            th.StringType(nullable=False),
+            allowed_values=list(METRICS_FORMATS),
+            default="json",
+            title="Metrics Format",
+            description=(
+                "Format of the metrics file: 'json', or 'prometheus' for the node exporter "
+                "textfile collector"
+            ),
+        ),
     ).to_dict()
 
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the tap.
+
+        Args:
+            args: Tap positional arguments.
+            kwargs: Tap keyword arguments.
+        """
+        super().__init__(*args, **kwargs)
+
+        # Authenticators and request budgets are shared by the streams of this tap
+        # only, which may request them from worker threads
+        self._authenticators: dict[str, QuickBooksAuthenticator] = {}
+        self._authenticators_lock = threading.Lock()
+        self._request_budgets: dict[str, RequestBudget] = {}
+        self._request_budgets_lock = threading.Lock()
+
     @override
     def discover_streams(self) -> list[streams.QuickBooksStream]:
         """Return a list of discovered streams.
@@ -138,8 +527,236 @@ class TapQuickBooks(Tap):
             streams.TransfersStream(self),
             streams.VendorsStream(self),
             streams.VendorCreditsStream(self),
+            streams.ProfitAndLossReportStream(self),
+            streams.ProfitAndLossDetailReportStream(self),
+            streams.BalanceSheetReportStream(self),
+            streams.MonthlyBalanceSheetReportStream(self),
+            streams.CashFlowReportStream(self),
+            streams.MonthlyCashFlowReportStream(self),
+            streams.DailyCashFlowReportStream(self),
+            streams.ARAgingSummaryReportStream(self),
+            streams.GeneralLedgerAccrualReportStream(self),
+            streams.GeneralLedgerCashReportStream(self),
+            streams.TransactionListReportStream(self),
+        ]
+
+    @cached_property
+    def realm_contexts(self) -> dict[str, dict | None]:
+        """Return the partition context of each realm to sync.
+
+        Returns:
+            The realm partition context (``None`` when syncing a single realm), by
+            realm ID.
+        """
+        realm_ids = list(get_realm_credentials(self.config))
+
+        if not self.config.get("realms"):
+            return dict.fromkeys(realm_ids)
+
+        return {realm_id: {"realm_id": realm_id} for realm_id in realm_ids}
+
+    def get_authenticator(self, realm_id: str) -> QuickBooksAuthenticator:
+        """Return the authenticator shared by all streams syncing a realm.
+
+        Args:
+            realm_id: QuickBooks company/realm ID.
+
+        Returns:
+            The authenticator of the realm.
+        """
+        with self._authenticators_lock:
+            if realm_id not in self._authenticators:
+                self._authenticators[realm_id] = create_authenticator(
+                    realm_id,
+                    get_realm_credentials(self.config)[realm_id],
+                    self.config.get("token_cache_dir"),
+                )
+
+            return self._authenticators[realm_id]
+
+    def get_request_budget(self, realm_id: str) -> RequestBudget:
+        """Return the request budget shared by all streams syncing a realm.
+
+        Args:
+            realm_id: QuickBooks company/realm ID.
+
+        Returns:
+            The request budget of the realm.
+        """
+        with self._request_budgets_lock:
+            if realm_id not in self._request_budgets:
+                self._request_budgets[realm_id] = create_request_budget(
+                    realm_id,
+                    requests_per_minute=self.config.get(
+                        "max_requests_per_minute", DEFAULT_REQUESTS_PER_MINUTE
+                    ),
+                    max_concurrent_requests=self.config.get(
+                        "max_concurrent_requests", DEFAULT_MAX_CONCURRENT_REQUESTS
+                    ),
+                    shared=self.config.get("share_request_budget", False),
+                )
+
+            return self._request_budgets[realm_id]
+
+    @cached_property
+    def requests_session(self) -> requests.Session:
+        """Return the HTTP session shared by all streams.
+
+        All realms are served from the same host, so one pool is sized to hold a
+        connection for every request the realms' budgets allow in flight at once.
+
+        Returns:
+            A keep-alive session.
+        """
+        max_concurrent_requests = self.config.get(
+            "max_concurrent_requests", DEFAULT_MAX_CONCURRENT_REQUESTS
+        )
+        return create_session(max_concurrent_requests * len(self.realm_contexts))
+
+    @cached_property
+    def event_loop(self) -> EventLoop | None:
+        """Return the event loop shared by all streams, when using the asyncio engine.
+
+        Returns:
+            An event loop with a keep-alive transport, or ``None`` unless
+            ``http_engine`` is ``asyncio``.
+        """
+        if self.config.get("http_engine", "requests") != "asyncio":
+            return None
+
+        max_concurrent_requests = self.config.get(
+            "max_concurrent_requests", DEFAULT_MAX_CONCURRENT_REQUESTS
+        )
+        return EventLoop(
+            max_concurrent_requests * len(self.realm_contexts),
+            name=f"{self.name}-loop",
+        )
+
+    @cached_property
+    def change_data_capture(self) -> dict[str, ChangeDataCapture]:
+        """Return the Change Data Capture fetcher shared by all streams of each realm.
+
+        Returns:
+            A change data capture instance, by realm ID.
+        """
+        quickbooks_streams = self._get_quickbooks_streams()
+
+        return {
+            realm_id: ChangeDataCapture(quickbooks_streams, context)
+            for realm_id, context in self.realm_contexts.items()
+        }
+
+    @cached_property
+    def batch_query(self) -> dict[str, BatchQuery]:
+        """Return the Batch API query shared by all batched streams of each realm.
+
+        Returns:
+            A batch query instance, by realm ID.
+        """
+        quickbooks_streams = self._get_quickbooks_streams()
+
+        return {
+            realm_id: BatchQuery(quickbooks_streams, context)
+            for realm_id, context in self.realm_contexts.items()
+        }
+
+    def _get_quickbooks_streams(self) -> list[streams.QuickBooksStream]:
+        return [
+            stream
+            for stream in self.streams.values()
+            if isinstance(stream, streams.QuickBooksStream)
         ]
 
+    @cached_property
+    def stream_prefetcher(self) -> StreamPrefetcher | None:
+        """Return the prefetcher fetching the selected streams concurrently.
+
+        Returns:
+            A prefetcher instance, or ``None`` if streams are fetched one at a time.
+        """
+        max_workers = self.config.get("max_concurrent_streams", 1)
+
+        if max_workers <= 1:
+            return None
+
+        selected_streams = [stream for stream in self._get_quickbooks_streams() if stream.selected]
+
+        return StreamPrefetcher(selected_streams, max_workers)
+
+    @cached_property
+    def _unsynced_streams(self) -> set[str]:
+        # Child streams are synced by their parents
+        return {
+            stream.name
+            for stream in self.streams.values()
+            if (stream.selected or stream.has_selected_descendents)
+            and not stream.parent_stream_type
+        }
+
+    def stream_synced(self, stream: streams.QuickBooksStream) -> None:
+        """Mark a stream as synced, and finish the sync once every stream has.
+
+        Args:
+            stream: The stream whose state was finalized.
+        """
+        if stream.name not in self._unsynced_streams:
+            return
+
+        self._unsynced_streams.remove(stream.name)
+
+        if not self._unsynced_streams:
+            self.finish_sync()
+
+    def finish_sync(self) -> None:
+        """Log the connections and hot path metrics of the sync, and close the event loop."""
+        self._log_connection_stats()
+        self._log_stream_profiles()
+
+        if self.event_loop:
+            self.event_loop.close()
+
+    def _log_connection_stats(self) -> None:
+        connection_stats = get_connection_stats(self.requests_session)
+
+        if self.event_loop:
+            for host, stats in self.event_loop.transport.stats.items():
+                previous = connection_stats.get(host, ConnectionStats(0, 0))
+                connection_stats[host] = ConnectionStats(
+                    previous.requests + stats.requests,
+                    previous.connections + stats.connections,
+                )
+
+        for host, stats in connection_stats.items():
+            self.logger.info(
+                "Sent %d requests to %s over %d connections (%d reused)",
+                stats.requests,
+                host,
+                stats.connections,
+                stats.reused,
+            )
+            log_tap_metric(
+                self,
+                Metric.HTTP_CONNECTIONS,
+                stats.connections,
+                metric_type="counter",
+                host=host,
+                requests=stats.requests,
+                reused=stats.reused,
+            )
+
+    def _log_stream_profiles(self) -> None:
+        synced_streams = [stream for stream in self._get_quickbooks_streams() if stream.selected]
+
+        for stream in synced_streams:
+            log_profile(stream, stream.profile)
+
+        if metrics_file := self.config.get("metrics_file"):
+            write_profiles(
+                {stream.name: stream.profile for stream in synced_streams},
+                metrics_file,
+                self.config.get("metrics_format", "json"),
+            )
+
 
 if __name__ == "__main__":
     TapQuickBooks.cli()
@@ -0,0 +1,230 @@
+"""Asyncio HTTP transport, keeping many requests in flight from one event loop."""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import threading
+import typing as t
+import urllib.parse
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from tap_quickbooks.session import ConnectionStats
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - optional dependency
+    httpx = None  # type: ignore[assignment]
+
+if t.TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Coroutine, Iterator
+    from concurrent.futures import Future
+
+_T = t.TypeVar("_T")
+
+HTTP_ENGINES = ("requests", "asyncio")
+
+_DONE = object()
+
+
+class AsyncTransport:
+    """Send requests over keep-alive connections pooled by ``httpx``.
+
+    Requests are prepared (and authenticated) by ``requests`` as usual, and the
+    responses are returned as ``requests.Response`` objects, so paginators, response
+    validation and record parsing work the same with either transport. Each request
+    in flight costs a coroutine and a socket rather than a thread. Proxies and CA
+    bundles are read from the environment, and redirects are followed, as by
+    ``requests``.
+    """
+
+    def __init__(self, pool_maxsize: int) -> None:
+        """Initialize the transport.
+
+        Args:
+            pool_maxsize: Number of idle connections to keep open per host.
+
+        Raises:
+            ImportError: If httpx is not installed.
+        """
+        if httpx is None:
+            msg = "The asyncio engine requires httpx, install tap-quickbooks[asyncio]"
+            raise ImportError(msg)
+
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=None, max_keepalive_connections=pool_maxsize),
+            follow_redirects=True,
+        )
+        self._requests: collections.Counter[str] = collections.Counter()
+        self._connections: collections.Counter[str] = collections.Counter()
+
+    @property
+    def stats(self) -> dict[str, ConnectionStats]:
+        """Return the requests sent and connections opened, by host."""
+        return {
+            host: ConnectionStats(self._requests[host], self._connections[host])
+            for host in self._requests
+        }
+
+    async def send(
+        self,
+        request: requests.PreparedRequest,
+        timeout: float | None = None,
+    ) -> requests.Response:
+        """Send a request.
+
+        Args:
+            request: The prepared request.
+            timeout: Seconds to wait to connect, and for each read of the response.
+
+        Returns:
+            The response, with its body read and decompressed.
+
+        Raises:
+            requests.exceptions.Timeout: If the response did not arrive in time.
+            requests.exceptions.ConnectionError: If the connection failed.
+        """
+        url = request.url or ""
+        host = urllib.parse.urlsplit(url).hostname or ""
+
+        async def trace(event: str, _info: dict) -> None:
+            if event == "connection.connect_tcp.complete":
+                self._connections[host] += 1
+
+        try:
+            response = await self._client.request(
+                request.method or "GET",
+                url,
+                headers=dict(request.headers),
+                content=request.body,
+                timeout=timeout,
+                extensions={"trace": trace},
+            )
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(e, request=request) from e
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(e, request=request) from e
+
+        self._requests[host] += 1
+
+        return _to_requests_response(request, response)
+
+    async def close(self) -> None:
+        """Close the pooled connections."""
+        await self._client.aclose()
+
+
+def _to_requests_response(
+    request: requests.PreparedRequest,
+    response: httpx.Response,
+) -> requests.Response:
+    headers: CaseInsensitiveDict = CaseInsensitiveDict()
+
+    for name, value in response.headers.multi_items():
+        headers[name] = f"{headers[name]}, {value}" if name in headers else value
+
+    converted = requests.Response()
+    converted.status_code = response.status_code
+    converted.reason = response.reason_phrase
+    converted.headers = headers
+    converted._content = response.content  # noqa: SLF001
+    converted.encoding = requests.utils.get_encoding_from_headers(headers)
+    converted.url = str(response.url)
+    converted.elapsed = response.elapsed
+    converted.request = request
+
+    return converted
+
+
+class EventLoop:
+    """Event loop running on a background thread, shared by all streams of the tap.
+
+    Streams sync on their own threads, as the SDK expects, and hand their requests
+    to the loop, which keeps the requests of every stream, realm and partition in
+    flight at once.
+    """
+
+    def __init__(self, pool_maxsize: int, name: str = "tap-quickbooks-loop") -> None:
+        """Start the event loop.
+
+        Args:
+            pool_maxsize: Number of idle connections to keep open per host.
+            name: Name of the loop thread.
+        """
+        self.transport = AsyncTransport(pool_maxsize)
+        self._loop = asyncio.new_event_loop()
+
+        # Daemon thread, so a failed sync is not kept alive by the loop
+        self._thread = threading.Thread(target=self._loop.run_forever, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, coroutine: Coroutine[t.Any, t.Any, _T]) -> Future[_T]:
+        """Run a coroutine on the loop.
+
+        Args:
+            coroutine: The coroutine.
+
+        Returns:
+            A future of its result.
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    def iterate(
+        self,
+        pages: AsyncIterator[list[_T]],
+        max_queued: int,
+        semaphore: asyncio.Semaphore | None = None,
+    ) -> Iterator[_T]:
+        """Fetch pages on the loop, up to ``max_queued`` pages ahead of the caller.
+
+        Fetching starts straight away, so pages can be prefetched before the caller
+        starts iterating the records.
+
+        Args:
+            pages: The pages to fetch, e.g. from ``async_request_pages``.
+            max_queued: Number of pages to buffer ahead.
+            semaphore: Semaphore limiting how many iterators fetch, or hold fetched
+                pages, at once. It is held until the caller has iterated the records.
+
+        Returns:
+            An iterator of the records of each page, in order.
+        """
+        buffer: asyncio.Queue[t.Any] = asyncio.Queue(max_queued)
+
+        async def produce() -> None:
+            try:
+                if semaphore:
+                    await semaphore.acquire()
+
+                async for page in pages:
+                    await buffer.put(page)
+            except Exception as e:  # noqa: BLE001
+                await buffer.put(e)
+            else:
+                await buffer.put(_DONE)
+
+        producer = self.submit(produce())
+
+        def consume() -> Iterator[_T]:
+            try:
+                while (page := self.submit(buffer.get()).result()) is not _DONE:
+                    if isinstance(page, BaseException):
+                        raise page
+
+                    yield from page
+            finally:
+                producer.cancel()  # the consumer stopped early
+
+                if semaphore:
+                    self._loop.call_soon_threadsafe(semaphore.release)
+
+        return consume()
+
+    def close(self) -> None:
+        """Close the transport's connections and stop the loop."""
+        self.submit(self.transport.close()).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
@@ -0,0 +1 @@
+"""Offline throughput benchmarks against a local mock QuickBooks server."""
@@ -0,0 +1,7 @@
+"""Run the benchmarks: ``python -m tests.benchmarks --help``."""
+
+import sys
+
+from tests.benchmarks.harness import main
+
+sys.exit(main())
@@ -0,0 +1,315 @@
+"""Benchmark full syncs of each stream against a local mock QuickBooks server.
+
+Each stream is synced by its own ``tap-quickbooks`` process, so peak memory is
+measured per stream, while the mock server runs in this process. Throughput and
+memory depend on the machine, so regressions are measured against a baseline
+revision of the tap synced in the same run, rather than against stored numbers.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import dataclasses
+import json
+import math
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from tap_quickbooks.reports import QuickBooksReportStream
+from tap_quickbooks.tap import TapQuickBooks
+from tests.benchmarks.runner import PEAK_RSS_PREFIX
+from tests.benchmarks.server import MockQuickBooks
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+ROOT_DIR = Path(__file__).parents[2]
+RUNNER_PATH = Path(__file__).with_name("runner.py")
+
+# Regressions tolerated before a comparison fails, as a fraction of the baseline
+DEFAULT_TOLERANCE = 0.25
+
+_METRIC_PREFIX = "METRIC: "
+
+
+@dataclasses.dataclass
+class Result:
+    """Measurements of a full sync of a stream."""
+
+    stream: str
+    records: int
+    seconds: float
+    cpu_seconds: float
+    requests: int
+    response_mb: float
+    latency_p50_ms: float
+    latency_p95_ms: float
+    peak_rss_mb: float
+
+    @property
+    def records_per_second(self) -> float:
+        """Return the sync throughput."""
+        return self.records / self.seconds if self.seconds else 0.0
+
+    @property
+    def requests_per_1k_records(self) -> float:
+        """Return the number of requests sent per thousand records."""
+        return 1000 * self.requests / self.records if self.records else 0.0
+
+    def as_dict(self) -> dict:
+        """Return the measurements, and the rates derived from them."""
+        return {
+            **dataclasses.asdict(self),
+            "records_per_second": round(self.records_per_second, 1),
+            "requests_per_1k_records": round(self.requests_per_1k_records, 2),
+        }
+
+
+def get_config(mock: MockQuickBooks, overrides: dict | None = None) -> dict:
+    """Return the config of a tap syncing from the mock server."""
+    return {
+        "oauth_credentials": {
+            "refresh_token": "benchmark",
+            "refresh_proxy_url": f"{mock.url}/token",
+        },
+        "realm_id": "benchmark",
+        "start_date": "2024-01-01T00:00:00Z",
+        "api_url": mock.url,
+        **(overrides or {}),
+    }
+
+
+def get_query_streams(config: dict) -> list[str]:
+    """Return the names of the streams synced with queries (not reports)."""
+    tap = TapQuickBooks(config=config, setup_mapper=False)
+    return [
+        name
+        for name, stream in tap.streams.items()
+        if not isinstance(stream, QuickBooksReportStream)
+    ]
+
+
+def get_catalog(config: dict, stream_name: str) -> dict:
+    """Return the discovered catalog, with only one stream selected."""
+    catalog = TapQuickBooks(config=config, setup_mapper=False).catalog_dict
+
+    for entry in catalog["streams"]:
+        for metadata in entry["metadata"]:
+            if metadata["breadcrumb"] == []:
+                metadata["metadata"]["selected"] = entry["tap_stream_id"] == stream_name
+
+    return catalog
+
+
+def run_benchmark(
+    mock: MockQuickBooks,
+    config: dict,
+    stream_name: str,
+    source_dir: Path = ROOT_DIR,
+) -> Result:
+    """Run a full sync of a stream in a new tap process, and measure it.
+
+    The tap is imported from ``source_dir``, e.g. a checkout of a baseline revision.
+    """
+    mock.warm(stream_name, config.get("page_size", 1000))
+    mock.reset()
+
+    with tempfile.TemporaryDirectory() as directory:
+        config_path = Path(directory, "config.json")
+        catalog_path = Path(directory, "catalog.json")
+        config_path.write_text(json.dumps(config))
+        catalog_path.write_text(json.dumps(get_catalog(config, stream_name)))
+
+        with Path(directory, "stderr.log").open("w+") as stderr:
+            started = time.perf_counter()
+            process = subprocess.Popen(  # noqa: S603
+                [
+                    sys.executable,
+                    str(RUNNER_PATH),
+                    "--config",
+                    str(config_path),
+                    "--catalog",
+                    str(catalog_path),
+                ],
+                stdout=subprocess.PIPE,
+                stderr=stderr,
+                cwd=source_dir,
+                env={**os.environ, "PYTHONPATH": str(source_dir)},
+            )
+            stdout = process.stdout or ()
+            records = sum(1 for line in stdout if b'"type":"RECORD"' in line)
+            _, status, usage = os.wait4(process.pid, 0)  # CPU time of the tap alone
+            seconds = time.perf_counter() - started
+            process.returncode = os.waitstatus_to_exitcode(status)
+
+            stderr.seek(0)
+            log = stderr.read()
+
+    if process.returncode:
+        msg = f"Sync of '{stream_name}' failed with exit code {process.returncode}:\n{log}"
+        raise RuntimeError(msg)
+
+    durations = sorted(
+        1000 * metric["value"]
+        for metric in _read_metrics(log)
+        if metric["metric"] == "http_request_duration"
+    )
+    rss_bytes = next(
+        int(line.removeprefix(PEAK_RSS_PREFIX))
+        for line in log.splitlines()
+        if line.startswith(PEAK_RSS_PREFIX)
+    )
+
+    return Result(
+        stream=stream_name,
+        records=records,
+        seconds=round(seconds, 3),
+        cpu_seconds=round(usage.ru_utime + usage.ru_stime, 3),
+        requests=sum(mock.requests.values()),
+        response_mb=round(sum(mock.response_bytes.values()) / 2**20, 2),
+        latency_p50_ms=round(statistics.median(durations), 1) if durations else 0.0,
+        latency_p95_ms=round(_percentile(durations, 0.95), 1) if durations else 0.0,
+        peak_rss_mb=round(rss_bytes / 2**20, 1),
+    )
+
+
+@contextlib.contextmanager
+def checkout(revision: str) -> Iterator[Path]:
+    """Check out a revision of the tap in a temporary git worktree."""
+    with tempfile.TemporaryDirectory() as directory:
+        subprocess.run(  # noqa: S603
+            ["git", "worktree", "add", "--detach", directory, revision],  # noqa: S607
+            cwd=ROOT_DIR,
+            check=True,
+            capture_output=True,
+        )
+
+        try:
+            yield Path(directory)
+        finally:
+            subprocess.run(  # noqa: S603
+                ["git", "worktree", "remove", "--force", directory],  # noqa: S607
+                cwd=ROOT_DIR,
+                check=False,
+                capture_output=True,
+            )
+
+
+def compare(results: list[Result], baseline: list[Result], tolerance: float) -> list[str]:
+    """Return the regressions of results against those of a baseline revision."""
+    expected_results = {result.stream: result for result in baseline}
+    regressions = []
+
+    for result in results:
+        expected = expected_results.get(result.stream)
+
+        if not expected:
+            continue
+
+        if result.records_per_second < expected.records_per_second * (1 - tolerance):
+            regressions.append(
+                f"{result.stream}: {result.records_per_second:.0f} records/s, "
+                f"baseline {expected.records_per_second:.0f}"
+            )
+
+        if result.peak_rss_mb > expected.peak_rss_mb * (1 + tolerance):
+            regressions.append(
+                f"{result.stream}: {result.peak_rss_mb:.0f} MB peak RSS, "
+                f"baseline {expected.peak_rss_mb:.0f}"
+            )
+
+        if result.requests > expected.requests:
+            regressions.append(
+                f"{result.stream}: {result.requests} requests, baseline {expected.requests}"
+            )
+
+    return regressions
+
+
+def print_results(results: list[Result]) -> None:
+    """Print a table of results."""
+    header = (
+        f"{'stream':<18}{'records':>9}{'seconds':>9}{'rec/s':>9}{'req/1k':>8}"
+        f"{'MB in':>8}{'p50 ms':>8}{'p95 ms':>8}{'RSS MB':>8}"
+    )
+    print(header)  # noqa: T201
+
+    for r in results:
+        print(  # noqa: T201
+            f"{r.stream:<18}{r.records:>9}{r.seconds:>9.2f}{r.records_per_second:>9.0f}"
+            f"{r.requests_per_1k_records:>8.2f}{r.response_mb:>8.1f}{r.latency_p50_ms:>8.1f}"
+            f"{r.latency_p95_ms:>8.1f}{r.peak_rss_mb:>8.1f}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the benchmarks, and compare them against a baseline revision.
+
+    Returns:
+        1 if a stream regressed against the baseline revision, otherwise 0.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=10_000, help="Records per stream")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per response")
+    parser.add_argument("--line-items", type=int, default=3, help="Lines per transaction")
+    parser.add_argument("--streams", nargs="*", help="Streams to sync (default: all queried)")
+    parser.add_argument("--config", type=json.loads, default={}, help="Tap config overrides")
+    parser.add_argument("--baseline", help="Git revision to compare against, e.g. main")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    results: list[Result] = []
+    baseline: list[Result] = []
+
+    with contextlib.ExitStack() as stack:
+        mock = stack.enter_context(MockQuickBooks(args.records, args.latency, args.line_items))
+        baseline_dir = stack.enter_context(checkout(args.baseline)) if args.baseline else None
+        config = get_config(mock, args.config)
+
+        # Each stream is synced by both revisions in turn, so they share the machine's
+        # conditions at the time
+        for stream_name in args.streams or get_query_streams(config):
+            if baseline_dir:
+                baseline.append(run_benchmark(mock, config, stream_name, baseline_dir))
+
+            results.append(run_benchmark(mock, config, stream_name))
+
+    if args.json:
+        output = {
+            "results": [result.as_dict() for result in results],
+            "baseline": [result.as_dict() for result in baseline],
+        }
+        print(json.dumps(output, indent=2))  # noqa: T201
+    else:
+        print_results(results)
+
+        if baseline:
+            print(f"\nBaseline ({args.baseline}):")  # noqa: T201
+            print_results(baseline)
+
+    regressions = compare(results, baseline, args.tolerance)
+
+    for regression in regressions:
+        print(f"Regression: {regression}", file=sys.stderr)  # noqa: T201
+
+    return 1 if regressions else 0
+
+
+def _read_metrics(log: str) -> list[dict]:
+    return [
+        json.loads(line.split(_METRIC_PREFIX, 1)[1])
+        for line in log.splitlines()
+        if _METRIC_PREFIX in line
+    ]
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    return values[min(len(values) - 1, math.ceil(fraction * len(values)) - 1)]
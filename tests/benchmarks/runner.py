@@ -0,0 +1,37 @@
+"""Run the tap, and report its peak memory on exit.
+
+``ru_maxrss`` of a child process carries over the high-water mark of the process
+that spawned it on Linux, so the tap reports its own instead.
+"""
+
+import atexit
+import resource
+import runpy
+import sys
+from pathlib import Path
+
+PEAK_RSS_PREFIX = "PEAK_RSS_BYTES: "
+
+
+def get_peak_rss() -> int:
+    """Return the peak resident memory of this process, in bytes."""
+    status = Path("/proc/self/status")
+
+    if status.exists():
+        for line in status.read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) * 1024
+
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def _report_peak_rss() -> None:
+    print(f"{PEAK_RSS_PREFIX}{get_peak_rss()}", file=sys.stderr)  # noqa: T201
+
+
+if __name__ == "__main__":
+    atexit.register(_report_peak_rss)
+    sys.argv[0] = "tap-quickbooks"
+    runpy.run_module("tap_quickbooks", run_name="__main__")
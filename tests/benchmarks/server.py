@@ -0,0 +1,254 @@
+"""Local mock of the QuickBooks query API, serving synthetic schema-conformant records."""
+
+from __future__ import annotations
+
+import datetime
+import functools
+import json
+import math
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+from urllib.parse import parse_qs, urlparse
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+SCHEMAS_DIR = Path(__file__).parents[2] / "tap_quickbooks" / "schemas"
+
+# Records are updated one second apart from this time
+BASE_TIME = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone(datetime.timedelta(hours=-7)))
+
+_QUERY_PATTERN = re.compile(
+    r"SELECT (?P<projection>.+?) FROM (?P<entity>\w+)"
+    r"(?: WHERE (?P<where>.+?))?"
+    r"(?: ORDERBY (?P<order_by>.+?))?"
+    r"(?: STARTPOSITION (?P<start_position>\d+))?"
+    r"(?: MAXRESULTS (?P<max_results>\d+))?$"
+)
+_SINCE_PATTERN = re.compile(r"MetaData\.LastUpdatedTime >= '([^']+)'")
+_UNTIL_PATTERN = re.compile(r"MetaData\.LastUpdatedTime < '([^']+)'")
+
+_LINE = {
+    "Id": "1",
+    "LineNum": 1,
+    "Description": "Synthetic line",
+    "Amount": 125.5,
+    "DetailType": "SalesItemLineDetail",
+    "SalesItemLineDetail": {
+        "ItemRef": {"value": "1", "name": "Services"},
+        "UnitPrice": 25.1,
+        "Qty": 5,
+        "TaxCodeRef": {"value": "NON"},
+    },
+}
+
+
+def load_schema(entity: str) -> dict:
+    """Return the JSON schema of an entity."""
+    return json.loads((SCHEMAS_DIR / f"{entity}.json").read_text())
+
+
+def generate_value(name: str, schema: dict, index: int, line_items: int) -> Any:  # noqa: ANN401
+    """Return a synthetic value for a property schema."""
+    types = schema.get("type", [])
+    types = {types} if isinstance(types, str) else set(types)
+
+    if "object" in types:
+        return {
+            key: generate_value(key, value, index, line_items)
+            for key, value in schema.get("properties", {}).items()
+        }
+
+    if "array" in types:
+        return [{**_LINE, "Id": str(i), "LineNum": i} for i in range(1, line_items + 1)]
+
+    return _generate_scalar(name, schema, types, index)
+
+
+def _generate_scalar(name: str, schema: dict, types: set[str], index: int) -> Any:  # noqa: ANN401
+    if "number" in types:
+        return round((index % 1000) * 1.25 + 0.1, 2)
+
+    if "integer" in types:
+        return index
+
+    if "boolean" in types:
+        return index % 2 == 0
+
+    if schema.get("format") == "date-time":
+        return (BASE_TIME + datetime.timedelta(seconds=index)).isoformat()
+
+    if name.endswith("Date"):
+        return (BASE_TIME + datetime.timedelta(seconds=index)).date().isoformat()
+
+    return f"{name} {index}"
+
+
+def generate_record(schema: dict, index: int, line_items: int = 3) -> dict:
+    """Return a synthetic record, as QuickBooks returns it, with the 1-based ``index``.
+
+    Flattened properties (e.g. ``MetaData.LastUpdatedTime``) are nested in their
+    parent object, and records are updated one second apart.
+    """
+    record: dict = {}
+
+    for name, property_schema in schema["properties"].items():
+        if name in {"realm_id", "status", "domain", "sparse"}:
+            continue
+
+        parent, _, child = name.partition(".")
+
+        if child:
+            value = generate_value(child, property_schema, index, line_items)
+            record.setdefault(parent, {})[child] = value
+        else:
+            record[name] = generate_value(name, property_schema, index, line_items)
+
+    record["Id"] = str(index)
+    record.setdefault("MetaData", {})["LastUpdatedTime"] = (
+        BASE_TIME + datetime.timedelta(seconds=index)
+    ).isoformat()
+
+    return record
+
+
+class MockQuickBooks:
+    """Serve ``records`` synthetic records of every entity, after ``latency`` seconds.
+
+    Serves the ``/v3/company/{realm}/query`` endpoint (including ``COUNT(*)`` and
+    ``LastUpdatedTime`` bounds), and a ``/token`` endpoint for the refresh proxy.
+    Pages are rendered once and cached, so the server does little work per request.
+    """
+
+    def __init__(self, records: int, latency: float = 0.0, line_items: int = 3) -> None:
+        """Initialize the server, without starting it.
+
+        Args:
+            records: Number of records of every entity.
+            latency: Seconds to wait before each query response.
+            line_items: Number of line items of every record.
+        """
+        self.records = records
+        self.latency = latency
+        self.line_items = line_items
+        self.requests: Counter[str] = Counter()
+        self.response_bytes: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        """Return the root URL of the server."""
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def __enter__(self) -> Self:
+        """Start serving requests on a background thread."""
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Stop the server."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset(self) -> None:
+        """Reset the request counters."""
+        with self._lock:
+            self.requests.clear()
+            self.response_bytes.clear()
+
+    def warm(self, entity: str, page_size: int) -> None:
+        """Render the pages of a full sync of an entity ahead of time."""
+        for start_position in range(1, self.records + 1, page_size):
+            self.render_page(entity, start_position, page_size)
+
+    @functools.cache  # noqa: B019 - one server per benchmark run
+    def render_page(self, entity: str, start_position: int, max_results: int) -> bytes:
+        """Return the response body of a page of records."""
+        schema = load_schema(entity)
+        stop = min(start_position + max_results, self.records + 1)
+        records = [
+            generate_record(schema, index, self.line_items) for index in range(start_position, stop)
+        ]
+        body = {"QueryResponse": {entity: records} if records else {}}
+
+        return json.dumps(body).encode()
+
+    def query(self, query: str) -> bytes:
+        """Return the response body of a query."""
+        match = _QUERY_PATTERN.match(query)
+
+        if not match:
+            return json.dumps({"Fault": {"Error": [{"code": "4000"}]}}).encode()
+
+        entity = match["entity"]
+        where = match["where"] or ""
+        first, last = 1, self.records
+
+        if since := _SINCE_PATTERN.search(where):
+            first = max(first, self._get_index(since[1]))
+
+        if until := _UNTIL_PATTERN.search(where):
+            last = min(last, self._get_index(until[1]) - 1)
+
+        count = max(0, last - first + 1)
+
+        if match["projection"] == "COUNT(*)":
+            return json.dumps({"QueryResponse": {"totalCount": count}}).encode()
+
+        start_position = first + int(match["start_position"] or 1) - 1
+        max_results = min(int(match["max_results"] or 100), last - start_position + 1)
+
+        if max_results <= 0:
+            return json.dumps({"QueryResponse": {}}).encode()
+
+        return self.render_page(entity, start_position, max_results)
+
+    @staticmethod
+    def _get_index(timestamp: str) -> int:
+        """Return the index of the first record updated at or after a timestamp."""
+        parsed = datetime.datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+        return math.ceil((parsed - BASE_TIME).total_seconds())
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:
+                url = urlparse(self.path)
+                query = parse_qs(url.query).get("query", [""])[0]
+                entity = query.split(" FROM ")[1].split(" ")[0] if " FROM " in query else ""
+                body = mock.query(query)
+
+                if mock.latency:
+                    time.sleep(mock.latency)
+
+                with mock._lock:  # noqa: SLF001
+                    mock.requests[entity] += 1
+                    mock.response_bytes[entity] += len(body)
+
+                self._send(body)
+
+            def do_POST(self) -> None:
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                self._send(json.dumps({"access_token": "token", "expires_in": 3600}).encode())
+
+            def _send(self, body: bytes) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        return Handler
@@ -0,0 +1,45 @@
+"""Smoke tests of the benchmark harness and mock server."""
+
+from __future__ import annotations
+
+import dataclasses
+import math
+from typing import TYPE_CHECKING
+
+import jsonschema
+import pytest
+
+from tests.benchmarks.harness import compare, get_config, get_query_streams, run_benchmark
+from tests.benchmarks.server import MockQuickBooks, generate_record, load_schema
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+RECORDS = 250
+
+
+@pytest.fixture(scope="module")
+def mock() -> Iterator[MockQuickBooks]:
+    """Return a mock server shared by the tests of the module."""
+    with MockQuickBooks(records=RECORDS) as mock:
+        yield mock
+
+
+def test_generated_records_conform_to_schemas(mock: MockQuickBooks) -> None:
+    """Test that generated records are valid against their stream schema."""
+    for stream_name in get_query_streams(get_config(mock)):
+        schema = load_schema(stream_name)
+        jsonschema.validate(generate_record(schema, 1), schema)
+
+
+def test_benchmark_syncs_all_records(mock: MockQuickBooks) -> None:
+    """Test that a benchmark run syncs every record and is compared with its baseline."""
+    page_size = 100
+    result = run_benchmark(mock, get_config(mock, {"page_size": page_size}), "Invoice")
+
+    assert result.records == RECORDS
+    assert result.requests == math.ceil(RECORDS / page_size)
+    assert result.peak_rss_mb > 0
+
+    baseline = dataclasses.replace(result, requests=2)
+    assert compare([result], [baseline], tolerance=0.25) == ["Invoice: 3 requests, baseline 2"]
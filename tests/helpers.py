@@ -0,0 +1,77 @@
+"""Helpers shared by the behavioral tests."""
+
+from __future__ import annotations
+
+import datetime
+import json
+from typing import TYPE_CHECKING, Any, cast
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+from tap_quickbooks.tap import TapQuickBooks
+
+if TYPE_CHECKING:
+    from tap_quickbooks.client import QuickBooksStream
+
+# Status, headers and body returned by ``responses`` callbacks
+CallbackResponse = tuple[int, dict[str, str], str]
+
+CONFIG: dict[str, Any] = {
+    "oauth_credentials": {
+        "client_id": "test_client_id",
+        "client_secret": "test_client_secret",
+        "refresh_token": "test_refresh_token",
+    },
+    "realm_id": "test_realm_id",
+    "start_date": datetime.datetime.now(datetime.timezone.utc).strftime(r"%Y-%m-%dT%H:%M:%SZ"),
+    "sandbox": True,
+}
+
+QUERY_URL = "https://sandbox-quickbooks.api.intuit.com/v3/company/test_realm_id/query"
+TOKEN_URL = "https://oauth.platform.intuit.com/oauth2/v1/tokens/bearer"  # noqa: S105
+
+
+def make_response(body: dict) -> requests.Response:
+    """Build a ``requests.Response`` with a JSON body."""
+    response = requests.Response()
+    response.status_code = 200
+    response._content = json.dumps(body).encode()  # noqa: SLF001
+    return response
+
+
+def get_stream(name: str, config: dict[str, Any] | None = None) -> QuickBooksStream:
+    """Return the discovered stream with the given name."""
+    return get_tap_stream(TapQuickBooks(config=config or CONFIG), name)
+
+
+def get_tap_stream(tap: TapQuickBooks, name: str) -> QuickBooksStream:
+    """Return the stream of a tap with the given name."""
+    return cast("QuickBooksStream", tap.streams[name])
+
+
+def select_streams(tap: TapQuickBooks, *names: str) -> None:
+    """Select only the named streams of a tap."""
+    for stream in tap.streams.values():
+        stream.selected = stream.name in names
+
+
+def read_messages(output: str) -> list[dict]:
+    """Parse Singer messages written to stdout."""
+    return [json.loads(line) for line in output.splitlines() if line]
+
+
+def get_query_params(request: requests.PreparedRequest) -> dict[str, list[str]]:
+    """Return the query string parameters of a request."""
+    return parse_qs(urlparse(request.url or "").query)
+
+
+def query_callback(request: requests.PreparedRequest) -> CallbackResponse:
+    """Return one page of records for the entity named in the query."""
+    query = get_query_params(request)["query"][0]
+    entity = query.split(" FROM ")[1].split(" ")[0]
+    records = [
+        {"Id": str(i), "MetaData": {"LastUpdatedTime": f"2024-01-0{i}T00:00:00Z"}}
+        for i in range(1, 4)
+    ]
+    return 200, {}, json.dumps({"QueryResponse": {entity: records}})
@@ -1,15 +1,28 @@
 """Behavioral tests for authentication."""
 
+from __future__ import annotations
+
 import datetime
 import json
-from typing import Any
+import threading
+from typing import TYPE_CHECKING, Any
 
 import pytest
+import requests
 import responses
 
-from tap_quickbooks.auth import ProxyQuickBooksAuthenticator, QuickBooksAuthenticator
+from tap_quickbooks.auth import (
+    AUTH_ENDPOINT,
+    ProxyQuickBooksAuthenticator,
+    QuickBooksAuthenticator,
+    TokenCache,
+)
 from tap_quickbooks.client import QuickBooksStream
 from tap_quickbooks.tap import TapQuickBooks
+from tests.helpers import get_tap_stream
+
+if TYPE_CHECKING:
+    from pathlib import Path
 
 # Proxy OAuth configuration (nested settings)
 PROXY_CONFIG: dict[str, Any] = {
@@ -37,7 +50,7 @@ STANDARD_CONFIG: dict[str, Any] = {
 
 
 @responses.activate
-def test_proxy_oauth_uses_correct_authenticator():
+def test_proxy_oauth_uses_correct_authenticator() -> None:
     """Test that proxy config uses ProxyQuickBooksAuthenticator."""
     # Mock proxy endpoint
     responses.add(
@@ -59,7 +72,7 @@ def test_proxy_oauth_uses_correct_authenticator():
 
 
 @responses.activate
-def test_proxy_oauth_request_format():
+def test_proxy_oauth_request_format() -> None:
     """Test that proxy OAuth makes correctly formatted HTTP requests."""
     # Mock proxy endpoint
     responses.add(
@@ -76,6 +89,7 @@ def test_proxy_oauth_request_format():
 
     # Trigger token refresh
     authenticator = stream.authenticator
+    assert isinstance(authenticator, ProxyQuickBooksAuthenticator)
     authenticator.update_access_token()
 
     # Verify request was made
@@ -98,7 +112,7 @@ def test_proxy_oauth_request_format():
 
 
 @responses.activate
-def test_standard_oauth_uses_correct_authenticator():
+def test_standard_oauth_uses_correct_authenticator() -> None:
     """Test that standard config uses QuickBooksAuthenticator."""
     # Mock standard QuickBooks endpoint
     responses.add(
@@ -117,7 +131,7 @@ def test_standard_oauth_uses_correct_authenticator():
     )
 
 
-def test_invalid_oauth_config_raises_validation_error():
+def test_invalid_oauth_config_raises_validation_error() -> None:
     """Test that incomplete OAuth configuration raises ConfigValidationError during schema validation."""
     from singer_sdk.exceptions import ConfigValidationError
 
@@ -137,9 +151,8 @@ def test_invalid_oauth_config_raises_validation_error():
         TapQuickBooks(config=invalid_config)
 
 
-def test_invalid_oauth_config_raises_value_error_when_validation_skipped():
+def test_invalid_oauth_config_raises_value_error_when_validation_skipped() -> None:
     """Test that incomplete OAuth configuration raises ValueError when schema validation is skipped."""
-
     # Config with oauth_credentials but missing required fields for both modes
     invalid_config = {
         "oauth_credentials": {
@@ -154,4 +167,94 @@ def test_invalid_oauth_config_raises_value_error_when_validation_skipped():
     # Schema validation should fail during tap initialization
     with pytest.raises(ValueError):
         tap = TapQuickBooks(config=invalid_config, validate_config=False)
-        tap.sync_all()
\ No newline at end of file
+        tap.sync_all()
+
+
+def make_authenticator(token_cache: TokenCache | None = None) -> QuickBooksAuthenticator:
+    """Return a standard OAuth authenticator."""
+    return QuickBooksAuthenticator(
+        **STANDARD_CONFIG["oauth_credentials"],
+        token_cache=token_cache,
+        auth_endpoint=AUTH_ENDPOINT,
+    )
+
+
+def authenticate(authenticator: QuickBooksAuthenticator) -> str:
+    """Authenticate a request, returning its Authorization header."""
+    request = requests.Request("GET", "https://quickbooks.api.intuit.com/v3/company/1").prepare()
+    return authenticator.authenticate_request(request).headers["Authorization"]
+
+
+@responses.activate
+def test_concurrent_requests_refresh_the_token_once() -> None:
+    """Test that threads authenticating at once share a single token refresh."""
+    responses.post(AUTH_ENDPOINT, json={"access_token": "token", "expires_in": 3600})
+
+    authenticator = make_authenticator()
+    threads = [threading.Thread(target=authenticate, args=(authenticator,)) for _ in range(8)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    assert len(responses.calls) == 1
+    assert authenticator.last_refreshed is not None
+
+    # Tokens are refreshed ahead of their expiry
+    authenticator.last_refreshed -= datetime.timedelta(seconds=3500)
+    authenticate(authenticator)
+
+    assert len(responses.calls) == 1 + 1
+
+
+@responses.activate
+def test_token_cache_reuses_tokens_and_rotated_refresh_token(tmp_path: Path) -> None:
+    """Test that cached tokens are reused by later runs, with the rotated refresh token."""
+    responses.post(
+        AUTH_ENDPOINT,
+        json={"access_token": "token_1", "refresh_token": "rotated_1", "expires_in": 3600},
+    )
+    responses.post(
+        AUTH_ENDPOINT,
+        json={"access_token": "token_2", "refresh_token": "rotated_2", "expires_in": 3600},
+    )
+    token_cache = TokenCache(tmp_path / "tokens.json")
+
+    assert authenticate(make_authenticator(token_cache)) == "Bearer token_1"
+    assert authenticate(make_authenticator(token_cache)) == "Bearer token_1"
+    assert len(responses.calls) == 1
+
+    # Expire the cached access token, as if the next run were an hour later
+    with token_cache.transaction() as tokens:
+        tokens["last_refreshed"] -= 3600
+
+    assert authenticate(make_authenticator(token_cache)) == "Bearer token_2"
+    assert "refresh_token=rotated_1" in str(responses.calls[1].request.body)
+    assert json.loads(token_cache.path.read_text())["refresh_token"] == "rotated_2"
+
+
+@responses.activate
+def test_failed_refresh_does_not_update_the_token_cache(tmp_path: Path) -> None:
+    """Test that a failed token refresh raises, leaving the cached tokens as they were."""
+    responses.post(AUTH_ENDPOINT, status=400, json={"error": "invalid_grant"})
+    token_cache = TokenCache(tmp_path / "tokens.json")
+
+    with pytest.raises(RuntimeError, match="Failed to update access token"):
+        authenticate(make_authenticator(token_cache))
+
+    with token_cache.transaction() as tokens:
+        assert not tokens
+
+
+def test_authenticators_are_shared_by_the_streams_of_a_tap() -> None:
+    """Test that streams share their tap's authenticator, which other taps do not."""
+    tap = TapQuickBooks(config=STANDARD_CONFIG)
+    authenticator = tap.get_authenticator("test_realm_id")
+
+    assert get_tap_stream(tap, "Invoice").authenticator is authenticator
+    assert get_tap_stream(tap, "Bill").authenticator is authenticator
+
+    other_tap = TapQuickBooks(config=STANDARD_CONFIG)
+    assert other_tap.get_authenticator("test_realm_id") is not authenticator
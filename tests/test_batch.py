@@ -0,0 +1,64 @@
+"""Behavioral tests for Batch API requests."""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+import responses
+
+from tap_quickbooks.tap import TapQuickBooks
+from tests.helpers import (
+    CONFIG,
+    QUERY_URL,
+    TOKEN_URL,
+    query_callback,
+    read_messages,
+    select_streams,
+)
+
+if TYPE_CHECKING:
+    import pytest
+
+
+@responses.activate
+def test_batch_api_queries_reference_streams_together(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that batched streams are queried with a single Batch API request."""
+    responses.post(TOKEN_URL, json={"access_token": "token", "expires_in": 3600})
+    batch = responses.post(
+        "https://sandbox-quickbooks.api.intuit.com/v3/company/test_realm_id/batch",
+        json={
+            "BatchItemResponse": [
+                {
+                    "bId": "Term",
+                    "QueryResponse": {
+                        "Term": [
+                            {"Id": "1", "MetaData": {"LastUpdatedTime": "2024-01-01T00:00:00Z"}}
+                        ]
+                    },
+                },
+                {"bId": "TaxCode", "QueryResponse": {"TaxCode": [{"Id": "2"}]}},
+            ]
+        },
+    )
+    query = responses.add_callback(responses.GET, QUERY_URL, callback=query_callback)
+
+    tap = TapQuickBooks(config={**CONFIG, "use_batch_api": True})
+    select_streams(tap, "Term", "TaxCode", "Invoice")
+    tap.sync_all()
+
+    records = [m for m in read_messages(capsys.readouterr().out) if m["type"] == "RECORD"]
+
+    assert batch.call_count == 1
+    items = json.loads(batch.calls[0].request.body)["BatchItemRequest"]
+    assert sorted(item["bId"] for item in items) == ["TaxCode", "Term"]
+
+    # Only the non-batched stream is queried on its own
+    assert query.call_count == 1
+    assert {(m["stream"], m["record"]["Id"]) for m in records} == {
+        ("Term", "1"),
+        ("TaxCode", "2"),
+        ("Invoice", "1"),
+        ("Invoice", "2"),
+        ("Invoice", "3"),
+    }
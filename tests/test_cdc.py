@@ -0,0 +1,104 @@
+"""Behavioral tests for Change Data Capture requests."""
+
+from __future__ import annotations
+
+import datetime
+from typing import TYPE_CHECKING
+
+import responses
+
+from tap_quickbooks.tap import TapQuickBooks
+from tests.helpers import (
+    CONFIG,
+    QUERY_URL,
+    TOKEN_URL,
+    get_query_params,
+    query_callback,
+    read_messages,
+    select_streams,
+)
+
+if TYPE_CHECKING:
+    import pytest
+
+
+@responses.activate
+def test_cdc_fans_out_changes_to_streams(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that CDC fetches changes for all streams with a single request."""
+    now = datetime.datetime.now(datetime.timezone.utc)
+    updated = (now - datetime.timedelta(days=1)).strftime(r"%Y-%m-%dT%H:%M:%SZ")
+    start_date = (now - datetime.timedelta(days=7)).strftime(r"%Y-%m-%dT%H:%M:%SZ")
+
+    responses.post(TOKEN_URL, json={"access_token": "token", "expires_in": 3600})
+    cdc = responses.get(
+        "https://sandbox-quickbooks.api.intuit.com/v3/company/test_realm_id/cdc",
+        json={
+            "CDCResponse": [
+                {
+                    "QueryResponse": [
+                        {"Invoice": [{"Id": "1", "MetaData": {"LastUpdatedTime": updated}}]},
+                        {
+                            "Bill": [
+                                {
+                                    "Id": "2",
+                                    "status": "Deleted",
+                                    "MetaData": {"LastUpdatedTime": updated},
+                                }
+                            ]
+                        },
+                    ]
+                }
+            ]
+        },
+    )
+    query = responses.get(QUERY_URL)
+
+    tap = TapQuickBooks(config={**CONFIG, "start_date": start_date, "use_cdc": True})
+    select_streams(tap, "Invoice", "Bill")
+    tap.sync_all()
+
+    records = [m for m in read_messages(capsys.readouterr().out) if m["type"] == "RECORD"]
+
+    assert cdc.call_count == 1
+    assert query.call_count == 0
+    assert sorted(get_query_params(cdc.calls[0].request)["entities"][0].split(",")) == [
+        "Bill",
+        "Invoice",
+    ]
+    assert {(m["stream"], m["record"]["Id"], m["record"].get("status")) for m in records} == {
+        ("Invoice", "1", None),
+        ("Bill", "2", "Deleted"),
+    }
+
+
+@responses.activate
+def test_truncated_cdc_response_falls_back_to_queries(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that all streams are queried when the CDC response reaches its total limit."""
+    now = datetime.datetime.now(datetime.timezone.utc)
+    updated = (now - datetime.timedelta(days=1)).strftime(r"%Y-%m-%dT%H:%M:%SZ")
+    start_date = (now - datetime.timedelta(days=7)).strftime(r"%Y-%m-%dT%H:%M:%SZ")
+
+    def changes(count: int) -> list[dict]:
+        return [{"Id": str(i), "MetaData": {"LastUpdatedTime": updated}} for i in range(count)]
+
+    responses.post(TOKEN_URL, json={"access_token": "token", "expires_in": 3600})
+    responses.get(
+        "https://sandbox-quickbooks.api.intuit.com/v3/company/test_realm_id/cdc",
+        json={
+            "CDCResponse": [
+                {"QueryResponse": [{"Invoice": changes(600)}, {"Bill": changes(400)}]},
+            ]
+        },
+    )
+    query = responses.add_callback(responses.GET, QUERY_URL, callback=query_callback)
+
+    tap = TapQuickBooks(config={**CONFIG, "start_date": start_date, "use_cdc": True})
+    select_streams(tap, "Invoice", "Bill")
+    tap.sync_all()
+
+    records = [m for m in read_messages(capsys.readouterr().out) if m["type"] == "RECORD"]
+
+    # Each stream is queried once for its three records
+    streams = ("Invoice", "Bill")
+    assert query.call_count == len(streams)
+    assert len(records) == 3 * len(streams)
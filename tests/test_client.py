@@ -0,0 +1,338 @@
+"""Behavioral tests for the QuickBooks REST client."""
+
+from __future__ import annotations
+
+import datetime
+import decimal
+import gzip
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Any, cast
+
+import responses
+
+from tap_quickbooks.client import (
+    KeysetToken,
+    QuickBooksKeysetPaginator,
+    QuickBooksPaginator,
+    get_response_payload,
+)
+from tap_quickbooks.decoding import get_decoder
+from tap_quickbooks.metrics import Metric, StreamProfile, write_profiles
+from tap_quickbooks.session import ConnectionStats, get_connection_stats
+from tap_quickbooks.tap import TapQuickBooks
+from tests.helpers import (
+    CONFIG,
+    QUERY_URL,
+    TOKEN_URL,
+    get_stream,
+    get_tap_stream,
+    make_response,
+    query_callback,
+    select_streams,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+    import requests
+    from requests.adapters import HTTPAdapter
+
+
+def test_response_payload_is_decoded_once() -> None:
+    """Test that the paginator and record parser share a single decoded payload."""
+    response = make_response(
+        {"QueryResponse": {"Invoice": [{"Id": "1", "TotalAmt": 1.1}], "maxResults": 1}}
+    )
+
+    decode_calls = 0
+    original_json = response.json
+
+    def counting_json(**kwargs: Any) -> Any:  # noqa: ANN401
+        nonlocal decode_calls
+        decode_calls += 1
+        return original_json(**kwargs)
+
+    response.json = counting_json  # type: ignore[method-assign]
+
+    stream = get_stream("Invoice")
+    paginator = stream.get_new_paginator()
+    assert isinstance(paginator, QuickBooksPaginator)
+
+    assert paginator.has_more(response) is False
+    records = list(stream.parse_response(response))
+
+    assert decode_calls == 1
+    assert get_response_payload(response) is get_response_payload(response)
+    assert records == [{"Id": "1", "TotalAmt": decimal.Decimal("1.1")}]
+
+
+def test_paginator_counts_entity_records_only() -> None:
+    """Test that the paginator only counts records under the stream entity key."""
+    response = make_response(
+        {"QueryResponse": {"Invoice": [{"Id": "1"}], "Other": [{}, {}], "maxResults": 1}}
+    )
+
+    assert QuickBooksPaginator(page_size=2, entity="Invoice").has_more(response) is False
+    assert QuickBooksPaginator(page_size=1, entity="Invoice").has_more(response) is True
+
+
+def test_keyset_paginator_resumes_from_last_updated_time() -> None:
+    """Test that keyset pagination resumes after the last timestamp and its ties."""
+
+    def page(*timestamps: str) -> requests.Response:
+        return make_response(
+            {
+                "QueryResponse": {
+                    "JournalEntry": [{"MetaData": {"LastUpdatedTime": ts}} for ts in timestamps]
+                }
+            }
+        )
+
+    paginator = QuickBooksKeysetPaginator(page_size=3, entity="JournalEntry")
+
+    paginator.advance(page("2024-01-01T00:00:00Z", "2024-01-02T00:00:00Z", "2024-01-02T00:00:00Z"))
+    assert paginator.current_value == KeysetToken("2024-01-02T00:00:00Z", 2)
+
+    # A full page sharing the previous timestamp skips past all of its ties
+    paginator.advance(page("2024-01-02T00:00:00Z", "2024-01-02T00:00:00Z", "2024-01-02T00:00:00Z"))
+    assert paginator.current_value == KeysetToken("2024-01-02T00:00:00Z", 5)
+
+    paginator.advance(page("2024-01-03T00:00:00Z"))
+    assert paginator.finished
+
+
+def test_keyset_pagination_query() -> None:
+    """Test that keyset pages filter on the last timestamp instead of a deep offset."""
+    stream = get_stream("JournalEntry", {**CONFIG, "keyset_pagination": True})
+    assert isinstance(stream.get_new_paginator(), QuickBooksKeysetPaginator)
+
+    params = stream.get_url_params(None, KeysetToken("2024-01-02T00:00:00Z", 2))
+
+    assert params["query"] == (
+        "SELECT * FROM JournalEntry WHERE MetaData.LastUpdatedTime >= '2024-01-02T00:00:00+00:00'"
+        " ORDERBY MetaData.LastUpdatedTime, Id STARTPOSITION 3 MAXRESULTS 1000"
+    )
+
+
+@responses.activate
+def test_adaptive_page_size() -> None:
+    """Test that the page size shrinks on slow or timed out pages and grows back."""
+    responses.post(TOKEN_URL, json={"access_token": "token", "expires_in": 3600})
+    stream = get_stream("Invoice")
+    paginator = stream.get_new_paginator()
+
+    first_page = make_response({"QueryResponse": {}})
+    first_page.request = stream.prepare_request(None, None)
+    assert "MAXRESULTS+1000" in (first_page.request.url or "")
+
+    first_page.elapsed = datetime.timedelta(seconds=60)
+    stream.page_sizer.observe(first_page)
+
+    # The paginator advances by the size of the page it requested
+    assert paginator.get_next(first_page) == 1 + 1000
+    assert "STARTPOSITION 1001 MAXRESULTS 500" in stream.get_url_params(None, 1001)["query"]
+
+    request = stream.prepare_request(None, 1501)
+    stream.page_sizer.timed_out(request)
+    assert "MAXRESULTS+250" in (request.url or "")
+    assert stream.page_sizer.reason == "timeout"
+
+    fast = make_response({"QueryResponse": {}})
+    fast.elapsed = datetime.timedelta(seconds=1)
+    stream.page_sizer.observe(fast)
+    assert "MAXRESULTS 500" in stream.get_url_params(None, 1751)["query"]
+    assert stream.page_sizer.reason == "fast response"
+
+
+def test_query_selects_catalog_properties() -> None:
+    """Test that the query only selects catalog-selected properties and required keys."""
+    catalog = TapQuickBooks(config=CONFIG).catalog_dict
+
+    for entry in catalog["streams"]:
+        for metadata in entry["metadata"]:
+            if not metadata["breadcrumb"]:
+                metadata["metadata"]["selected"] = entry["tap_stream_id"] == "Invoice"
+            else:
+                metadata["metadata"]["selected"] = metadata["breadcrumb"][-1] in {
+                    "DocNumber",
+                    "TotalAmt",
+                }
+
+    stream = get_tap_stream(TapQuickBooks(config=CONFIG, catalog=catalog), "Invoice")
+    query = stream.get_url_params(None, None)["query"]
+
+    assert query.startswith("SELECT Id, DocNumber, TotalAmt, MetaData FROM Invoice ")
+    assert (
+        get_stream("Invoice")
+        .get_url_params(None, None)["query"]
+        .startswith("SELECT * FROM Invoice ")
+    )
+
+
+@responses.activate
+def test_sync_writes_hot_path_metrics(capsys: pytest.CaptureFixture[str], tmp_path: Path) -> None:
+    """Test that streams time their hot path and count their traffic in the metrics file."""
+    body = json.dumps({"Fault": {"Error": [{"code": "003001"}]}})
+    responses.post(TOKEN_URL, json={"access_token": "token", "expires_in": 3600})
+    responses.get(QUERY_URL, status=429, headers={"Retry-After": "0"}, body=body)
+    responses.add_callback(responses.GET, QUERY_URL, callback=query_callback)
+
+    metrics_file = tmp_path / "metrics.json"
+    tap = TapQuickBooks(config={**CONFIG, "metrics_file": str(metrics_file)})
+    select_streams(tap, "Invoice")
+    tap.sync_all()
+    capsys.readouterr()
+
+    summary = json.loads(metrics_file.read_text())["streams"]["Invoice"]
+    spans = summary["spans"]
+
+    assert {name: span["count"] for name, span in spans.items()} == {
+        "request": 2,
+        "decode": 1,
+        "extract": 4,  # three records, then the end of the page
+        "post_process": 3,
+        "emit": 3,
+    }
+    assert all(span["seconds"] > 0 for span in spans.values())
+    assert summary["counters"]["page_count"] == 1
+    assert summary["counters"]["retry_count"] == 1
+    assert summary["counters"]["response_bytes"] > len(body)
+
+    profile = StreamProfile()
+    profile.increment(Metric.PAGE_COUNT, 2)
+    write_profiles({"Invoice": profile}, metrics_file, "prometheus")
+
+    assert 'tap_quickbooks_pages_total{stream="Invoice"} 2\n' in metrics_file.read_text()
+
+
+class GzipJSONHandler(BaseHTTPRequestHandler):
+    """Keep-alive handler returning a gzipped JSON body."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        """Return the request's Accept-Encoding header, gzipped."""
+        body = gzip.compress(
+            json.dumps({"accept_encoding": self.headers["Accept-Encoding"]}).encode()
+        )
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: Any) -> None:
+        """Keep the test output quiet."""
+
+
+def test_streams_share_a_keep_alive_session() -> None:
+    """Test that streams reuse pooled connections and request gzipped responses."""
+    max_concurrent_requests = 4
+    tap = TapQuickBooks(config={**CONFIG, "max_concurrent_requests": max_concurrent_requests})
+    invoice = get_tap_stream(tap, "Invoice")
+    session = invoice.requests_session
+    adapter = cast("HTTPAdapter", session.get_adapter("https://"))
+
+    assert session is get_tap_stream(tap, "Customer").requests_session
+    assert adapter.poolmanager.connection_pool_kw["maxsize"] == max_concurrent_requests
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), GzipJSONHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/"
+
+    try:
+        bodies = [session.get(url, headers=invoice.http_headers).json() for _ in range(3)]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert bodies == [{"accept_encoding": "gzip"}] * 3
+    assert get_connection_stats(session) == {"127.0.0.1": ConnectionStats(3, 1)}
+    assert get_connection_stats(session)["127.0.0.1"].reused == len(bodies) - 1
+
+
+def test_decoders_keep_money_exact() -> None:
+    """Test that every decoder keeps amounts exact, and other numbers as configured."""
+    content = (
+        b'{"TotalAmt": 10.10, "Line": [{"Amount": 0.1, '
+        b'"SalesItemLineDetail": {"Qty": 1.5, "UnitPrice": 0.3}}]}'
+    )
+
+    for name in ("auto", "json", "orjson"):
+        payload = get_decoder(name, "money")(content)
+        detail = payload["Line"][0]["SalesItemLineDetail"]
+
+        assert payload["TotalAmt"] == decimal.Decimal("10.10")
+        assert payload["Line"][0]["Amount"] == decimal.Decimal("0.1")
+        assert detail["UnitPrice"] == decimal.Decimal("0.3")
+        assert type(detail["Qty"]) is float
+
+        assert get_decoder(name, "decimal")(content)["TotalAmt"] == decimal.Decimal("10.10")
+        assert type(get_decoder(name, "float")(content)["TotalAmt"]) is float
+
+
+def test_missing_decoder_falls_back_to_json(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a decoder library that is not installed falls back to the json module."""
+    monkeypatch.setitem(sys.modules, "msgspec", None)
+
+    assert get_decoder("msgspec", "float")(b'{"Qty": 1.5}') == {"Qty": 1.5}
+
+    stream = get_stream("Invoice", {**CONFIG, "json_decoder": "msgspec"})
+
+    assert stream.decoder(b'{"Qty": 1.5}') == {"Qty": decimal.Decimal("1.5")}
+
+
+def test_auto_decoder_falls_back_to_json_without_the_fast_json_extra(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that the auto decoder uses the json module when msgspec and orjson are missing."""
+    monkeypatch.setitem(sys.modules, "msgspec", None)
+    monkeypatch.setitem(sys.modules, "orjson", None)
+
+    assert get_decoder("auto", "float")(b'{"Qty": 1.5}') == {"Qty": 1.5}
+    assert get_decoder("orjson", "money")(b'{"Qty": 1.5, "TotalAmt": 2.5}') == {
+        "Qty": 1.5,
+        "TotalAmt": decimal.Decimal("2.5"),
+    }
+
+
+def test_conformer_flattens_prunes_and_coerces_records() -> None:
+    """Test that the conformer emits selected, flattened and conformed properties."""
+    catalog = TapQuickBooks(config=CONFIG).catalog_dict
+
+    for entry in catalog["streams"]:
+        for metadata in entry["metadata"]:
+            if metadata["breadcrumb"] == ["properties", "PrivateNote"]:
+                metadata["metadata"]["selected"] = False
+
+    stream = TapQuickBooks(config=CONFIG, catalog=catalog).streams["Invoice"]
+    record = stream.post_process(
+        {
+            "Id": "1",
+            "PrivateNote": "Deselected",
+            "TotalAmt": decimal.Decimal("10.50"),
+            "Balance": float("nan"),
+            "Line": [{"Amount": decimal.Decimal("10.50")}],
+            "MetaData": {
+                "CreateTime": "2024-01-01T00:00:00Z",
+                "LastModifiedByRef": {"value": "Unmapped"},
+                "LastUpdatedTime": "2024-01-02",
+            },
+            "sparse": False,
+        }
+    )
+
+    assert record == {
+        "Id": "1",
+        "TotalAmt": decimal.Decimal("10.50"),
+        "Balance": None,
+        "Line": [{"Amount": decimal.Decimal("10.50")}],
+        "MetaData": {"CreateTime": "2024-01-01T00:00:00Z", "LastUpdatedTime": "2024-01-02"},
+        "MetaData.CreateTime": "2024-01-01T00:00:00Z",
+        "MetaData.LastUpdatedTime": "2024-01-02",
+    }
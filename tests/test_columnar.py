@@ -0,0 +1,74 @@
+"""Behavioral tests for Parquet BATCH messages."""
+
+from __future__ import annotations
+
+import decimal
+import json
+from typing import TYPE_CHECKING
+from urllib.parse import unquote, urlparse
+
+import pytest
+import responses
+
+from tap_quickbooks.tap import TapQuickBooks
+from tests.helpers import CONFIG, QUERY_URL, TOKEN_URL, read_messages, select_streams
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import requests
+
+    from tests.helpers import CallbackResponse
+
+
+@responses.activate
+def test_parquet_batches_are_written_in_row_groups(
+    capsys: pytest.CaptureFixture[str], tmp_path: Path
+) -> None:
+    """Test that Parquet batches follow the stream schema and hold row groups of records."""
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    def callback(_request: requests.PreparedRequest) -> CallbackResponse:
+        records = [
+            {
+                "Id": str(i),
+                "TotalAmt": 10.005 * i,
+                "Line": [{"Amount": 1.5}],
+                "MetaData": {"LastUpdatedTime": f"2024-01-0{i}T00:00:00Z"},
+            }
+            for i in range(1, 6)
+        ]
+        return 200, {}, json.dumps({"QueryResponse": {"Invoice": records}})
+
+    responses.post(TOKEN_URL, json={"access_token": "token", "expires_in": 3600})
+    responses.add_callback(responses.GET, QUERY_URL, callback=callback)
+
+    tap = TapQuickBooks(
+        config={
+            **CONFIG,
+            "batch_config": {
+                "encoding": {"format": "parquet"},
+                "storage": {"root": str(tmp_path), "prefix": "test-"},
+                "batch_size": 3,
+            },
+            "batch_row_group_size": 2,
+        }
+    )
+    select_streams(tap, "Invoice")
+    tap.sync_all()
+
+    batches = [m for m in read_messages(capsys.readouterr().out) if m["type"] == "BATCH"]
+    files = [pq.ParquetFile(unquote(urlparse(m["manifest"][0]).path)) for m in batches]
+
+    assert [m["encoding"]["format"] for m in batches] == ["parquet", "parquet"]
+    assert [f.metadata.num_rows for f in files] == [3, 2]
+    assert [f.metadata.num_row_groups for f in files] == [2, 1]
+
+    table = files[0].read()
+    schema = table.schema
+
+    assert str(schema.field("TotalAmt").type) == "decimal128(38, 10)"
+    assert str(schema.field("Line").type) == "string"
+    assert table.column("TotalAmt").to_pylist()[1] == decimal.Decimal("20.01")
+    assert json.loads(table.column("Line").to_pylist()[0]) == [{"Amount": 1.5}]
+    assert table.column("MetaData.LastUpdatedTime").to_pylist()[2] == "2024-01-03T00:00:00Z"
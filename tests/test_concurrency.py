@@ -0,0 +1,292 @@
+"""Behavioral tests for fetching streams, pages and records concurrently."""
+
+from __future__ import annotations
+
+import gzip
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Any, NoReturn
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import responses
+
+from tap_quickbooks.client import QuickBooksStream
+from tap_quickbooks.pipeline import prefetch
+from tap_quickbooks.tap import TapQuickBooks
+from tests.helpers import (
+    CONFIG,
+    QUERY_URL,
+    TOKEN_URL,
+    get_query_params,
+    get_tap_stream,
+    query_callback,
+    read_messages,
+    select_streams,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    import requests
+    from singer_sdk.helpers.types import Context
+
+    from tap_quickbooks.planning import PlannedPage
+    from tests.helpers import CallbackResponse
+
+
+@responses.activate
+def test_concurrent_sync_keeps_stream_output_ordered(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that streams fetched on worker threads are emitted one after another."""
+    threads = set()
+
+    def callback(request: requests.PreparedRequest) -> CallbackResponse:
+        threads.add(threading.current_thread().name)
+        return query_callback(request)
+
+    responses.post(TOKEN_URL, json={"access_token": "token", "expires_in": 3600})
+    responses.add_callback(responses.GET, QUERY_URL, callback=callback)
+
+    tap = TapQuickBooks(config={**CONFIG, "max_concurrent_streams": 3})
+    select_streams(tap, "Invoice", "Bill", "Customer")
+    tap.sync_all()
+
+    messages = read_messages(capsys.readouterr().out)
+    streams = [m["stream"] for m in messages if m["type"] == "RECORD"]
+
+    assert all(name.startswith("stream-prefetch-") for name in threads)
+    assert streams == ["Bill"] * 3 + ["Customer"] * 3 + ["Invoice"] * 3
+
+    for name in ("Invoice", "Bill", "Customer"):
+        stream_messages = [m for m in messages if m.get("stream") == name]
+        assert stream_messages[0]["type"] == "SCHEMA"
+        assert [m["record"]["Id"] for m in stream_messages[1:]] == ["1", "2", "3"]
+
+    state = [m for m in messages if m["type"] == "STATE"][-1]["value"]
+    for name in ("Invoice", "Bill", "Customer"):
+        bookmark = state["bookmarks"][name]
+        assert bookmark["replication_key_value"] == "2024-01-03T00:00:00Z"
+
+
+def test_sync_finishes_once_every_selected_stream_has_synced(
+    capsys: pytest.CaptureFixture[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that the end-of-sync teardown runs once, whatever order streams sync in."""
+    tap = TapQuickBooks(config=CONFIG)
+    select_streams(tap, "Invoice", "Bill")
+    finished = []
+    monkeypatch.setattr(tap, "finish_sync", lambda: finished.append(True))
+
+    tap.streams["Invoice"].finalize_state_progress_markers()
+    tap.streams["Invoice"].finalize_state_progress_markers()
+    assert not finished
+
+    tap.streams["Bill"].finalize_state_progress_markers()
+    tap.streams["Customer"].finalize_state_progress_markers()
+    capsys.readouterr()
+
+    assert finished == [True]
+
+
+def test_prefetch_stays_a_bounded_number_of_records_ahead() -> None:
+    """Test that prefetched records are produced on another thread, in order and bounded."""
+    produced = []
+
+    def produce() -> Iterator[int]:
+        for i in range(10):
+            produced.append(threading.current_thread().name)
+            yield i
+
+    max_queued = 2
+    records = prefetch(produce(), max_queued, "producer")
+
+    assert next(records) == 0
+    time.sleep(0.05)
+    assert len(produced) <= max_queued + 2  # one consumed and one waiting to be queued
+    assert list(records) == list(range(1, 10))
+    assert set(produced) == {"producer"}
+
+    def fail() -> Iterator[int]:
+        yield 1
+        msg = "Connection reset"
+        raise ConnectionError(msg)
+
+    records = prefetch(fail(), 2, "producer")
+
+    assert next(records) == 1
+    with pytest.raises(ConnectionError):
+        next(records)
+
+
+@responses.activate
+def test_pipelined_sync_fetches_pages_on_a_background_thread(
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Test that pipelined streams request pages from their pipeline thread."""
+    threads = []
+
+    def callback(request: requests.PreparedRequest) -> CallbackResponse:
+        threads.append(threading.current_thread().name)
+        return query_callback(request)
+
+    responses.post(TOKEN_URL, json={"access_token": "token", "expires_in": 3600})
+    responses.add_callback(responses.GET, QUERY_URL, callback=callback)
+
+    tap = TapQuickBooks(config={**CONFIG, "prefetch_pages": 2})
+    select_streams(tap, "Invoice")
+    tap.sync_all()
+
+    records = [m for m in read_messages(capsys.readouterr().out) if m["type"] == "RECORD"]
+
+    assert [r["record"]["Id"] for r in records] == ["1", "2", "3"]
+    assert threads == ["Invoice-pipeline"]
+
+
+@responses.activate
+def test_full_table_pages_are_planned_and_fetched_concurrently(
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Test that full-table pages are counted, fetched concurrently and emitted in order."""
+    queries = []
+
+    def callback(request: requests.PreparedRequest) -> CallbackResponse:
+        query = get_query_params(request)["query"][0]
+        queries.append(query)
+
+        if query.startswith("SELECT COUNT(*)"):
+            return 200, {}, json.dumps({"QueryResponse": {"totalCount": 5}})
+
+        start_position = int(query.split(" STARTPOSITION ")[1].split(" ")[0])
+        time.sleep(0.1 if start_position == 1 else 0)  # the first page arrives last
+        records = [{"Id": str(i)} for i in range(start_position, min(start_position + 2, 6))]
+        return 200, {}, json.dumps({"QueryResponse": {"TaxCode": records}})
+
+    responses.post(TOKEN_URL, json={"access_token": "token", "expires_in": 3600})
+    responses.add_callback(responses.GET, QUERY_URL, callback=callback)
+
+    tap = TapQuickBooks(config={**CONFIG, "page_size": 2, "max_concurrent_pages": 3})
+    select_streams(tap, "TaxCode")
+    tap.sync_all()
+
+    records = [m for m in read_messages(capsys.readouterr().out) if m["type"] == "RECORD"]
+
+    assert [r["record"]["Id"] for r in records] == ["1", "2", "3", "4", "5"]
+    assert queries[0] == "SELECT COUNT(*) FROM TaxCode"
+    assert sorted(queries[1:]) == [
+        "SELECT * FROM TaxCode ORDERBY Id STARTPOSITION 1 MAXRESULTS 2",
+        "SELECT * FROM TaxCode ORDERBY Id STARTPOSITION 3 MAXRESULTS 2",
+        "SELECT * FROM TaxCode ORDERBY Id STARTPOSITION 5 MAXRESULTS 2",
+    ]
+
+
+def test_planned_pages_created_since_the_count_are_fetched_on_the_event_loop(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that with the asyncio engine, pages beyond the counted ones come from the loop."""
+    pytest.importorskip("httpx")
+    tap = TapQuickBooks(
+        config={**CONFIG, "http_engine": "asyncio", "page_size": 2, "max_concurrent_pages": 2}
+    )
+    stream = get_tap_stream(tap, "TaxCode")
+    threads = []
+
+    async def request_page(_context: Context | None, page: PlannedPage) -> list[dict]:
+        threads.append(threading.current_thread().name)
+        stop = min(page.start_position + page.max_results, 6)
+        return [{"Id": str(i)} for i in range(page.start_position, stop)]
+
+    def fail(_context: Context | None, _page: PlannedPage) -> NoReturn:
+        msg = "Pages must be requested from the event loop"
+        raise AssertionError(msg)
+
+    monkeypatch.setattr(stream, "count_records", lambda _context: 3)
+    monkeypatch.setattr(stream, "async_request_page", request_page)
+    monkeypatch.setattr(stream, "request_page", fail)
+    page_planner = stream.page_planner
+    assert page_planner is not None
+
+    records = list(page_planner.get_records(None))
+
+    assert [r["Id"] for r in records] == ["1", "2", "3", "4", "5"]
+    assert set(threads) == {"tap-quickbooks-loop"}
+
+
+class ChunkedQueryHandler(BaseHTTPRequestHandler):
+    """Keep-alive handler returning pages of two records, gzipped in chunks."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        """Return the page of records of the query."""
+        query = parse_qs(urlparse(self.path).query)["query"][0]
+        entity = query.split(" FROM ")[1].split(" ")[0]
+        start_position = int(query.split(" STARTPOSITION ")[1].split(" ")[0])
+        records = [
+            {"Id": str(i), "MetaData": {"LastUpdatedTime": f"2024-01-0{i}T00:00:00Z"}}
+            for i in range(start_position, min(start_position + 2, 4))
+        ]
+        body = gzip.compress(json.dumps({"QueryResponse": {entity: records}}).encode())
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Encoding", "gzip")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        for chunk in (body[:10], body[10:]):
+            self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, *args: Any) -> None:
+        """Keep the test output quiet."""
+
+
+@responses.activate
+def test_asyncio_engine_syncs_streams_from_one_event_loop(
+    capsys: pytest.CaptureFixture[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that the asyncio engine pages streams over kept-alive loop connections."""
+    pytest.importorskip("httpx")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ChunkedQueryHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    monkeypatch.setattr(
+        QuickBooksStream,
+        "get_company_url",
+        lambda _self, realm_id: f"{base}/v3/company/{realm_id}",
+    )
+    responses.post(TOKEN_URL, json={"access_token": "token", "expires_in": 3600})
+    responses.add_passthru(base)
+
+    tap = TapQuickBooks(
+        config={
+            **CONFIG,
+            "http_engine": "asyncio",
+            "page_size": 2,
+            "adaptive_page_size": False,
+            "max_concurrent_streams": 2,
+        }
+    )
+    select_streams(tap, "Invoice", "Customer")
+
+    try:
+        tap.sync_all()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    messages = read_messages(capsys.readouterr().out)
+    streams = ("Invoice", "Customer")
+
+    for name in streams:
+        records = [m for m in messages if m["type"] == "RECORD" and m["stream"] == name]
+        assert [r["record"]["Id"] for r in records] == ["1", "2", "3"]
+
+    # Two pages of each stream, over at most a connection per stream
+    assert tap.event_loop is not None
+    stats = tap.event_loop.transport.stats["127.0.0.1"]
+    assert stats.requests == 2 * len(streams)
+    assert 1 <= stats.connections <= len(streams)
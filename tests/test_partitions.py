@@ -0,0 +1,183 @@
+"""Behavioral tests for partitioning streams by date window and realm."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import TYPE_CHECKING, cast
+from urllib.parse import parse_qs
+
+import responses
+
+from tap_quickbooks.partitions import PartitionPrefetcher
+from tap_quickbooks.tap import TapQuickBooks
+from tests.helpers import (
+    CONFIG,
+    QUERY_URL,
+    TOKEN_URL,
+    get_stream,
+    get_tap_stream,
+    query_callback,
+    read_messages,
+    select_streams,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Generator, Iterator
+
+    import pytest
+
+
+@responses.activate
+def test_partitioned_sync_queries_date_windows(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that windowed streams query each date window and bookmark it separately."""
+    responses.post(TOKEN_URL, json={"access_token": "token", "expires_in": 3600})
+    responses.add_callback(responses.GET, QUERY_URL, callback=query_callback)
+
+    config = {
+        **CONFIG,
+        "start_date": "2024-01-15T00:00:00Z",
+        "partition_by": "TxnDate",
+        "partition_window_months": 6,
+        "max_concurrent_partitions": 3,
+    }
+    tap = TapQuickBooks(config=config)
+    invoice, customer = get_tap_stream(tap, "Invoice"), get_tap_stream(tap, "Customer")
+    windows, customer_windows = invoice.partitions or [], customer.partitions or []
+
+    assert windows[:2] == [
+        {"window_start": "2024-01-01", "window_end": "2024-07-01"},
+        {"window_start": "2024-07-01", "window_end": "2025-01-01"},
+    ]
+    assert (
+        "AND TxnDate >= '2024-01-01' AND TxnDate < '2024-07-01' "
+        in invoice.get_url_params(windows[0], None)["query"]
+    )
+    assert (
+        "WHERE MetaData.LastUpdatedTime >= '2024-07-01T00:00:00+00:00' "
+        "AND MetaData.LastUpdatedTime < '2025-01-01T00:00:00+00:00' "
+    ) in customer.get_url_params(customer_windows[1], None)["query"]
+
+    select_streams(tap, "Invoice")
+    tap.sync_all()
+
+    messages = read_messages(capsys.readouterr().out)
+    records = [m for m in messages if m["type"] == "RECORD"]
+    state = [m for m in messages if m["type"] == "STATE"][-1]["value"]
+    partitions = state["bookmarks"]["Invoice"]["partitions"]
+
+    assert len(records) == 3 * len(windows)
+    assert [p["context"] for p in partitions] == windows
+    queries = [call for call in responses.calls if (call.request.url or "").startswith(QUERY_URL)]
+    assert len(queries) == len(windows)
+
+
+def test_closed_windows_are_not_queried_again() -> None:
+    """Test that windows synced after they ended are skipped on the replication key."""
+    config = {
+        **CONFIG,
+        "start_date": "2024-01-15T00:00:00Z",
+        "partition_by": "MetaData.LastUpdatedTime",
+        "partition_window_months": 6,
+    }
+    windows = TapQuickBooks(config=config).streams["Invoice"].partitions or []
+    bookmark = {
+        "replication_key": "MetaData.LastUpdatedTime",
+        "replication_key_value": "2025-03-01T00:00:00+00:00",
+    }
+    state = {
+        "bookmarks": {
+            "Invoice": {
+                "partitions": [
+                    {"context": windows[0]},
+                    {"context": windows[2], **bookmark},
+                ]
+            }
+        }
+    }
+
+    partitions = TapQuickBooks(config=config, state=state).streams["Invoice"].partitions
+
+    # The first window ended before the bookmark, the second was never synced
+    assert partitions == windows[1:]
+
+    # Windows on another field may still change
+    tap = TapQuickBooks(config={**config, "partition_by": "TxnDate"}, state=state)
+    assert tap.streams["Invoice"].partitions == windows
+
+
+def test_prefetched_partitions_are_bounded_and_stop_with_the_consumer(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that only as many partitions as workers are buffered, until they are emitted."""
+    stream = get_stream("Invoice")
+    started = []
+
+    def request_records(context: dict) -> Iterator[int]:
+        started.append(context["window"])
+        yield from range(3)
+
+    monkeypatch.setattr(stream, "partitions", [{"window": i} for i in range(4)])
+    monkeypatch.setattr(stream, "request_records", request_records)
+    prefetcher = PartitionPrefetcher(stream, max_workers=2)
+
+    assert list(prefetcher.get_records({"window": 0})) == [0, 1, 2]
+    time.sleep(0.05)
+    assert started == [0, 1, 2]  # the last waits for another partition to be emitted
+
+    # A consumer stopping early frees its worker for the next partition
+    records = cast("Generator[dict, None, None]", prefetcher.get_records({"window": 1}))
+    assert next(records) == 0
+    records.close()
+    time.sleep(0.05)
+    assert started == [0, 1, 2, 3]
+    assert list(prefetcher.get_records({"window": 2})) == [0, 1, 2]
+    assert list(prefetcher.get_records({"window": 3})) == [0, 1, 2]
+
+    for thread in threading.enumerate():
+        if thread.name.startswith("Invoice-partition-"):
+            thread.join(timeout=1)
+            assert not thread.is_alive()
+
+
+@responses.activate
+def test_multi_realm_sync_partitions_streams_by_realm(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test that every realm is synced with its own credentials and state partition."""
+    responses.post(TOKEN_URL, json={"access_token": "token", "expires_in": 3600})
+
+    for realm_id in ("realm_a", "realm_b"):
+        responses.add_callback(
+            responses.GET,
+            QUERY_URL.replace("test_realm_id", realm_id),
+            callback=query_callback,
+        )
+
+    config = {
+        **CONFIG,
+        "realms": [
+            {"realm_id": "realm_a", "oauth_credentials": {"refresh_token": "token_a"}},
+            {"realm_id": "realm_b", "oauth_credentials": {"refresh_token": "token_b"}},
+        ],
+        "max_concurrent_partitions": 2,
+    }
+    tap = TapQuickBooks(config=config)
+    select_streams(tap, "Invoice")
+    tap.sync_all()
+
+    messages = read_messages(capsys.readouterr().out)
+    schema = next(m for m in messages if m["type"] == "SCHEMA")
+    records = [m["record"] for m in messages if m["type"] == "RECORD"]
+    state = [m for m in messages if m["type"] == "STATE"][-1]["value"]
+    refresh_tokens = {
+        parse_qs(str(call.request.body))["refresh_token"][0]
+        for call in responses.calls
+        if call.request.url == TOKEN_URL
+    }
+
+    assert schema["key_properties"] == ["realm_id", "Id"]
+    assert [r["realm_id"] for r in records] == ["realm_a"] * 3 + ["realm_b"] * 3
+    assert [p["context"] for p in state["bookmarks"]["Invoice"]["partitions"]] == [
+        {"realm_id": "realm_a"},
+        {"realm_id": "realm_b"},
+    ]
+    assert refresh_tokens == {"token_a", "token_b"}
@@ -0,0 +1,131 @@
+"""Behavioral tests for request rate limiting."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from typing import TYPE_CHECKING
+
+import responses
+
+from tap_quickbooks.client import get_response_payload
+from tap_quickbooks.ratelimit import DEFAULT_THROTTLE_SECONDS, RequestBudget, get_throttle_seconds
+from tap_quickbooks.tap import TapQuickBooks
+from tests.helpers import (
+    CONFIG,
+    QUERY_URL,
+    TOKEN_URL,
+    get_tap_stream,
+    make_response,
+    query_callback,
+    read_messages,
+    select_streams,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+
+@responses.activate
+def test_throttled_request_pauses_budget_and_retries(
+    capsys: pytest.CaptureFixture[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that a throttled request pauses the realm budget for its Retry-After delay."""
+    responses.post(TOKEN_URL, json={"access_token": "token", "expires_in": 3600})
+    responses.get(
+        QUERY_URL,
+        status=429,
+        headers={"Retry-After": "0"},
+        json={"Fault": {"Error": [{"code": "003001", "Message": "ThrottleExceeded"}]}},
+    )
+    responses.add_callback(responses.GET, QUERY_URL, callback=query_callback)
+
+    tap = TapQuickBooks(config=CONFIG)
+    select_streams(tap, "Invoice")
+    budget = get_tap_stream(tap, "Invoice").get_request_budget("test_realm_id")
+    pauses: list[float] = []
+    monkeypatch.setattr(budget, "pause", pauses.append)
+    tap.sync_all()
+
+    records = [m for m in read_messages(capsys.readouterr().out) if m["type"] == "RECORD"]
+
+    assert pauses == [0.0]
+    assert [r["record"]["Id"] for r in records] == ["1", "2", "3"]
+
+
+def test_throttle_fault_is_read_from_the_decoded_payload(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a throttle fault is found in the payload decoded for the stream."""
+    response = make_response({"Fault": {"Error": [{"code": "3001"}]}})
+    response.status_code = 403
+    payload = get_response_payload(response)
+    monkeypatch.setattr(response, "json", None)
+
+    assert get_throttle_seconds(response, get_response_payload) == DEFAULT_THROTTLE_SECONDS
+    assert get_response_payload(response) is payload
+
+
+def test_request_budgets_are_shared_by_the_streams_of_a_tap() -> None:
+    """Test that taps in the same process keep their own request budgets and limits."""
+    first = TapQuickBooks(config={**CONFIG, "max_concurrent_requests": 1})
+    second = TapQuickBooks(config={**CONFIG, "max_concurrent_requests": 2})
+    budget = get_tap_stream(first, "Invoice").get_request_budget("test_realm_id")
+
+    assert get_tap_stream(first, "Bill").get_request_budget("test_realm_id") is budget
+    assert get_tap_stream(second, "Invoice").get_request_budget("test_realm_id") is not budget
+
+
+def test_shared_request_budget_coordinates_through_lock_file(tmp_path: Path) -> None:
+    """Test that request budgets sharing a lock file share tokens and pauses."""
+    lock_file = tmp_path / "realm.ratelimit"
+    first = RequestBudget(60, 2, lock_file)
+    second = RequestBudget(60, 2, lock_file)
+
+    with first, first:
+        pass
+
+    assert json.loads(lock_file.read_text())["tokens"] < 1
+
+    second.pause(30)
+
+    assert json.loads(lock_file.read_text())["paused_until"] >= time.time() + 29
+
+
+def test_shared_request_budget_limits_concurrent_requests_across_budgets(tmp_path: Path) -> None:
+    """Test that request budgets sharing a lock file share their request slots."""
+    lock_file = tmp_path / "realm.ratelimit"
+    first = RequestBudget(6000, 2, lock_file)
+    second = RequestBudget(6000, 2, lock_file)
+    acquired = threading.Event()
+
+    def acquire() -> None:
+        with second:
+            acquired.set()
+
+    with first, first:
+        thread = threading.Thread(target=acquire)
+        thread.start()
+
+        # Both slots are held through the other budget
+        assert not acquired.wait(0.3)
+
+    thread.join(1)
+    assert acquired.is_set()
+
+    async def acquire_async() -> None:
+        async with second:
+            pass
+
+    # Coroutines wait for a slot to be released, without blocking their loop
+    first.acquire()
+    first.acquire()
+    delay = 0.2
+    threading.Timer(delay, first.release).start()
+    start = time.monotonic()
+    asyncio.run(asyncio.wait_for(acquire_async(), 2))
+
+    assert time.monotonic() - start >= delay * 0.75
+    first.release()
@@ -0,0 +1,215 @@
+"""Behavioral tests for skipping unchanged records and reconciling deletes."""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any
+
+import responses
+
+from tap_quickbooks.client import parse_timestamp
+from tap_quickbooks.tap import TapQuickBooks
+from tests.helpers import (
+    CONFIG,
+    QUERY_URL,
+    TOKEN_URL,
+    get_query_params,
+    get_tap_stream,
+    query_callback,
+    read_messages,
+    select_streams,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+    import requests
+
+    from tests.helpers import CallbackResponse
+
+
+@responses.activate
+def test_full_table_responses_are_cached_across_runs(
+    capsys: pytest.CaptureFixture[str], tmp_path: Path
+) -> None:
+    """Test that cached full-table streams reuse responses, and skip unchanged records."""
+    responses.post(TOKEN_URL, json={"access_token": "token", "expires_in": 3600})
+    query = responses.add_callback(responses.GET, QUERY_URL, callback=query_callback)
+    config = {**CONFIG, "response_cache_dir": str(tmp_path), "skip_unchanged_streams": True}
+    streams = ("TaxCode", "Invoice")
+
+    def sync(state: dict | None = None) -> list[dict]:
+        tap = TapQuickBooks(config=config, state=state)
+        select_streams(tap, *streams)
+        tap.sync_all()
+        return read_messages(capsys.readouterr().out)
+
+    def get_tax_code_ids(messages: list[dict]) -> list[str]:
+        return [
+            m["record"]["Id"]
+            for m in messages
+            if m["type"] == "RECORD" and m["stream"] == "TaxCode"
+        ]
+
+    messages = sync()
+    state = [m for m in messages if m["type"] == "STATE"][-1]["value"]
+
+    assert get_tax_code_ids(messages) == ["1", "2", "3"]
+    assert query.call_count == len(streams)
+    assert state["bookmarks"]["TaxCode"]["content_hash"]
+
+    # Within the TTL, the full-table stream is served from the cache, so only
+    # the incremental stream is queried
+    call_count = query.call_count
+    messages = sync()
+
+    assert get_tax_code_ids(messages) == ["1", "2", "3"]
+    assert query.call_count == call_count + 1
+
+    # Streams forced to full table still have a replication key, and are not cached
+    tap = TapQuickBooks(config=config)
+    stream = get_tap_stream(tap, "Invoice")
+    stream.forced_replication_method = "FULL_TABLE"
+    assert stream.response_cache is None
+
+    # Cached queries include the page size, so it only adapts for uncached streams
+    assert stream.page_sizer.adaptive
+    assert not get_tap_stream(tap, "TaxCode").page_sizer.adaptive
+
+    # Unchanged since the state's sync, so no records are emitted
+    call_count = query.call_count
+    messages = sync(state)
+
+    assert {m["stream"] for m in messages if m["type"] == "RECORD"} == {"Invoice"}
+    assert query.call_count == call_count + 1
+
+
+@responses.activate
+def test_records_synced_at_the_bookmark_are_not_emitted_again(
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Test that record versions synced at the bookmark timestamp are skipped next sync."""
+    updated = {
+        "1": "2024-01-01T00:00:00Z",
+        "2": "2024-01-02T00:00:00Z",
+        "3": "2024-01-02T00:00:00Z",
+    }
+    versions = {"1": "0", "2": "0", "3": "0"}
+
+    def callback(_request: requests.PreparedRequest) -> CallbackResponse:
+        records = [
+            {
+                "Id": record_id,
+                "SyncToken": version,
+                "MetaData": {"LastUpdatedTime": updated[record_id]},
+            }
+            for record_id, version in versions.items()
+        ]
+        return 200, {}, json.dumps({"QueryResponse": {"Invoice": records}})
+
+    responses.post(TOKEN_URL, json={"access_token": "token", "expires_in": 3600})
+    responses.add_callback(responses.GET, QUERY_URL, callback=callback)
+
+    def sync(state: dict | None = None, replication_method: str | None = None) -> list[dict]:
+        tap = TapQuickBooks(config=CONFIG, state=state)
+        select_streams(tap, "Invoice")
+        tap.streams["Invoice"].forced_replication_method = replication_method
+        tap.sync_all()
+        return read_messages(capsys.readouterr().out)
+
+    messages = sync()
+    state = [m for m in messages if m["type"] == "STATE"][-1]["value"]
+
+    assert [m["record"]["Id"] for m in messages if m["type"] == "RECORD"] == ["1", "2", "3"]
+    assert state["bookmarks"]["Invoice"]["boundary_index"] == {
+        "timestamp": "2024-01-02T00:00:00+00:00",
+        "records": [["2", "0"], ["3", "0"]],
+    }
+
+    # Record 3 was updated again within the same second
+    versions["3"] = "1"
+    messages = sync(state)
+
+    assert [m["record"]["Id"] for m in messages if m["type"] == "RECORD"] == ["1", "3"]
+
+    # Streams forced to full table emit every record, whatever the index
+    messages = sync(state, "FULL_TABLE")
+
+    assert [m["record"]["Id"] for m in messages if m["type"] == "RECORD"] == ["1", "2", "3"]
+
+    # The index is ignored once the bookmark no longer matches it
+    state["bookmarks"]["Invoice"]["replication_key_value"] = "2023-12-31T00:00:00Z"
+    messages = sync(state)
+
+    assert [m["record"]["Id"] for m in messages if m["type"] == "RECORD"] == ["1", "2", "3"]
+
+
+@responses.activate
+def test_hard_deletes_are_reconciled_against_the_ids_of_the_last_sync(
+    capsys: pytest.CaptureFixture[str], tmp_path: Path
+) -> None:
+    """Test that IDs missing since the last sync are emitted as deleted, once confirmed."""
+    ids = ["1", "2", "3", "10"]
+    listed = list(ids)
+    version = "0"
+    queries = []
+
+    def callback(request: requests.PreparedRequest) -> CallbackResponse:
+        query = get_query_params(request)["query"][0]
+        queries.append(query)
+
+        records: list[dict[str, Any]]
+
+        if query.startswith("SELECT Id FROM Customer WHERE Active IN (true, false) AND Id IN"):
+            records = [{"Id": record_id} for record_id in ids if f"'{record_id}'" in query]
+        elif query.startswith("SELECT Id FROM Customer"):
+            records = [{"Id": record_id} for record_id in listed]
+        else:
+            metadata = {"LastUpdatedTime": CONFIG["start_date"]}
+            records = [{"Id": "1", "SyncToken": version, "MetaData": metadata}]
+
+        return 200, {}, json.dumps({"QueryResponse": {"Customer": records}})
+
+    responses.post(TOKEN_URL, json={"access_token": "token", "expires_in": 3600})
+    responses.add_callback(responses.GET, QUERY_URL, callback=callback)
+    config: dict[str, Any] = {
+        **CONFIG,
+        "reconcile_deletes": ["Customer"],
+        "reconcile_deletes_dir": str(tmp_path),
+    }
+
+    def sync(state: dict | None = None) -> list[dict]:
+        tap = TapQuickBooks(config=config, state=state)
+        select_streams(tap, "Customer")
+        tap.sync_all()
+        return read_messages(capsys.readouterr().out)
+
+    messages = sync()
+    state = [m for m in messages if m["type"] == "STATE"][-1]["value"]
+    digest = state["bookmarks"]["Customer"]["id_snapshots"]["test_realm_id"]
+
+    assert [m["record"]["Id"] for m in messages if m["type"] == "RECORD"] == ["1"]
+    assert "SELECT Id FROM Customer WHERE Active IN (true, false) ORDERBY Id" in queries[-1]
+
+    # Customer 2 is deleted, and 10 is missed as offsets shift mid-sync
+    ids.remove("2")
+    listed[:] = ["1", "3"]
+    version = "1"
+    bookmark = state["bookmarks"]["Customer"]["replication_key_value"]
+    messages = sync(state)
+    records = [m["record"] for m in messages if m["type"] == "RECORD"]
+    state = [m for m in messages if m["type"] == "STATE"][-1]["value"]
+
+    assert [(record["Id"], record.get("status")) for record in records] == [
+        ("1", None),
+        ("2", "Deleted"),
+    ]
+    assert parse_timestamp(records[1]["MetaData.LastUpdatedTime"]) == parse_timestamp(bookmark)
+    assert "Id IN ('2', '10')" in queries[-1]
+
+    # Only the snapshots of this sync and the last are kept
+    new_digest = state["bookmarks"]["Customer"]["id_snapshots"]["test_realm_id"]
+    snapshots = {path.name for path in tmp_path.iterdir()}
+
+    assert snapshots == {f"test_realm_id-Customer-{d}.ids" for d in (digest, new_digest)}
@@ -0,0 +1,181 @@
+"""Behavioral tests for report streams."""
+
+from __future__ import annotations
+
+import datetime
+import decimal
+import json
+from typing import TYPE_CHECKING
+
+import responses
+
+from tap_quickbooks.tap import TapQuickBooks
+from tests.helpers import CONFIG, QUERY_URL, TOKEN_URL, get_query_params, get_stream, make_response
+
+if TYPE_CHECKING:
+    import requests
+
+    from tests.helpers import CallbackResponse
+
+
+def test_report_rows_are_flattened_with_their_sections() -> None:
+    """Test that nested report sections are flattened into records with categories."""
+    report = {
+        "Columns": {"Column": [{"ColTitle": ""}, {"ColTitle": "Total"}]},
+        "Rows": {
+            "Row": [
+                {
+                    "type": "Section",
+                    "Header": {"ColData": [{"value": "Income"}, {"value": ""}]},
+                    "Rows": {
+                        "Row": [
+                            {"type": "Data", "ColData": [{"value": "Sales"}, {"value": "10.50"}]},
+                            {
+                                "type": "Section",
+                                "Header": {"ColData": [{"value": "Services"}, {"value": ""}]},
+                                "Rows": {
+                                    "Row": [
+                                        {
+                                            "type": "Data",
+                                            "ColData": [{"value": "Design"}, {"value": "5"}],
+                                        },
+                                    ]
+                                },
+                                "Summary": {"ColData": [{"value": "Total Services"}]},
+                            },
+                        ]
+                    },
+                    "Summary": {"ColData": [{"value": "Total Income"}, {"value": "15.50"}]},
+                },
+                {"type": "Data", "ColData": [{"value": "Other"}, {"value": ""}]},
+            ]
+        },
+    }
+
+    records = list(get_stream("ProfitAndLossReport").parse_response(make_response(report)))
+
+    assert records == [
+        {"Account": "Sales", "Total": decimal.Decimal("10.50"), "Categories": ["Income"]},
+        {"Account": "Design", "Total": 5, "Categories": ["Income", "Services"]},
+        {"Account": "Other", "Total": None, "Categories": []},
+    ]
+
+
+def test_ragged_report_rows_are_padded_or_truncated() -> None:
+    """Test that rows with missing or extra cells are fitted to the report columns."""
+    report = {
+        "Columns": {"Column": [{"ColTitle": ""}, {"ColTitle": "Total"}]},
+        "Rows": {
+            "Row": [
+                {"type": "Data", "ColData": [{"value": "Sales"}]},
+                {"type": "Data", "ColData": [{"value": "Design"}, {"value": "5"}, {"value": "1"}]},
+            ]
+        },
+    }
+
+    records = list(get_stream("ProfitAndLossReport").parse_response(make_response(report)))
+
+    assert records == [
+        {"Account": "Sales", "Total": None, "Categories": []},
+        {"Account": "Design", "Total": 5, "Categories": []},
+    ]
+
+
+def test_report_streams_are_not_selected_by_default() -> None:
+    """Test that syncing without a catalog syncs entity streams but not reports."""
+    tap = TapQuickBooks(config=CONFIG)
+
+    assert tap.streams["Invoice"].selected
+    assert not tap.streams["ProfitAndLossReport"].selected
+
+
+def test_columnar_report_is_requested_in_windows() -> None:
+    """Test that columnar reports are requested per window and keyed by column title."""
+    stream = get_stream("GeneralLedgerCashReport", {**CONFIG, "start_date": "2024-01-15T00:00:00Z"})
+    windows = stream.partitions or []
+    params = stream.get_url_params(windows[1], None)
+    report = {
+        "Columns": {
+            "Column": [
+                {"ColTitle": "Date"},
+                {"ColTitle": "Transaction Type"},
+                {"ColTitle": "Memo/Description"},
+            ]
+        },
+        "Rows": {
+            "Row": [
+                {
+                    "Header": {"ColData": [{"value": "Checking", "id": "35"}]},
+                    "Rows": {
+                        "Row": [
+                            {
+                                "ColData": [
+                                    {"value": "2024-02-01"},
+                                    {"value": "Deposit", "id": "7"},
+                                    {"value": "Opening"},
+                                ]
+                            }
+                        ]
+                    },
+                }
+            ]
+        },
+    }
+
+    assert windows[0] == {"window_start": "2024-01-01", "window_end": "2024-02-01"}
+    assert (params["start_date"], params["end_date"]) == ("2024-02-01", "2024-02-29")
+    assert params["accounting_method"] == "Cash"
+    assert list(stream.parse_response(make_response(report))) == [
+        {
+            "Date": "2024-02-01",
+            "TransactionType": "Deposit",
+            "TransactionTypeId": "7",
+            "Memo": "Opening",
+            "Categories": ["Checking"],
+        }
+    ]
+
+
+@responses.activate
+def test_truncated_report_is_requested_in_halves() -> None:
+    """Test that reports too large for their period are bisected, earliest half first."""
+    responses.post(TOKEN_URL, json={"access_token": "token", "expires_in": 3600})
+    report_url = QUERY_URL.replace("/query", "/reports/GeneralLedger")
+    periods = []
+
+    def report_callback(request: requests.PreparedRequest) -> CallbackResponse:
+        params = get_query_params(request)
+        start, end = params["start_date"][0], params["end_date"][0]
+        periods.append((start, end))
+        days = datetime.date.fromisoformat(end) - datetime.date.fromisoformat(start)
+
+        if days > datetime.timedelta(days=10):
+            fault = {"Error": [{"Message": "Report is too large", "code": "2020"}]}
+            return 400, {}, json.dumps({"Fault": fault})
+
+        report = {
+            "Columns": {"Column": [{"ColTitle": "Date"}]},
+            "Rows": {"Row": [{"ColData": [{"value": start}]}]},
+        }
+        return 200, {}, json.dumps(report)
+
+    responses.add_callback(responses.GET, report_url, callback=report_callback)
+
+    stream = get_stream("GeneralLedgerCashReport")
+    records = stream.request_records({"window_start": "2024-01-01", "window_end": "2024-02-01"})
+
+    assert [record["Date"] for record in records] == [
+        "2024-01-01",
+        "2024-01-09",
+        "2024-01-17",
+        "2024-01-25",
+    ]
+    assert periods == [
+        ("2024-01-01", "2024-01-31"),
+        ("2024-01-01", "2024-01-16"),
+        ("2024-01-01", "2024-01-08"),
+        ("2024-01-09", "2024-01-16"),
+        ("2024-01-17", "2024-01-31"),
+        ("2024-01-17", "2024-01-24"),
+        ("2024-01-25", "2024-01-31"),
+    ]